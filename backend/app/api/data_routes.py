@@ -7,19 +7,28 @@ Endpoints:
   GET  /api/data/files
   GET  /api/data/countries
   GET  /api/data/customers
+  GET  /api/data/customers/export
   GET  /api/data/plants
   GET  /api/data/logs
+  GET  /api/data/cache-stats
   POST /api/data/enrich-geo
+  POST /api/data/enrich-company
+  GET  /api/data/enrichment-status
 """
+from concurrent.futures import ThreadPoolExecutor
 from fastapi import APIRouter, Query, BackgroundTasks, HTTPException
+from fastapi.responses import StreamingResponse
 from typing import Optional
+import os
 import sys
+import tempfile
 import threading
 from pathlib import Path
 
 # Ensure the backend root is on the path so services resolve correctly
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
+from app.core.config import settings
 from app.services.data_service import data_service
 from app.services.load_job_service import (
     get_latest_job_id,
@@ -31,6 +40,12 @@ from app.utils.json_utils import df_to_json_safe, json_safe_sanitize
 
 router = APIRouter()
 
+# Upper bound for ?limit= on the paged /customers and /plants listings
+PAGE_LIMIT_MAX = 5000
+
+# Chunk size for streamed file downloads
+EXPORT_CHUNK_BYTES = 1024 * 1024
+
 # ── Progress tracking (job-id based, process-isolated) ───────────────────────
 _progress_lock = threading.Lock()
 
@@ -50,14 +65,10 @@ def load_data():
                 "async": True,
             }
 
-        # Release any API-process DB handle before worker attempts write access.
-        try:
-            data_service.close()
-            data_service.conn = None
-        except Exception:
-            pass
-
-        job_meta = start_load_job()
+        # The worker builds a new dataset version from the published one; drop to a
+        # read-only handle so it can read that file while this process keeps serving it.
+        # The handle goes back to read-write once the job ends, published or not.
+        job_meta = data_service.release_write_access(start_job=start_load_job)
         return {
             "success": True,
             "message": "Data loading started",
@@ -206,10 +217,34 @@ def get_customers(
     country: Optional[str] = Query(default="All"),
     equipment_type: Optional[str] = Query(default="All"),
     company_name: Optional[str] = Query(default="All"),
+    limit: Optional[int] = Query(default=None, ge=1, le=PAGE_LIMIT_MAX),
+    offset: int = Query(default=0, ge=0),
+    sort_by: Optional[str] = Query(default=None, description="Comma-separated columns; prefix '-' for descending"),
+    fields: Optional[str] = Query(default=None, description="Comma-separated columns to return"),
 ):
-    """Return filtered customer list from unified_companies view."""
+    """Return filtered customer list from unified_companies view.
+
+    With any of limit/offset/sort_by/fields the page is cut in SQL and ``total``
+    is the full filtered row count; without them the whole list is returned.
+    """
     import traceback
     try:
+        if limit is not None or offset or sort_by or fields:
+            try:
+                df, total = data_service.get_customer_page(
+                    equipment_type=equipment_type,
+                    country=country,
+                    region=region,
+                    company_name=company_name,
+                    limit=limit,
+                    offset=offset,
+                    sort_by=sort_by,
+                    fields=fields,
+                )
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            return {"customers": df_to_json_safe(df) if not df.empty else [], "total": total, "limit": limit, "offset": offset}
+
         df = data_service.get_customer_list(
             equipment_type=equipment_type,
             country=country,
@@ -220,11 +255,79 @@ def get_customers(
             return {"customers": [], "total": 0}
         clean = df_to_json_safe(df)
         return {"customers": clean, "total": len(clean)}
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"ERROR in /customers: {traceback.format_exc()}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/customers/export")
+def export_customers(
+    format: str = Query(default="xlsx", description="xlsx, csv or parquet"),
+    region: Optional[str] = Query(default="All"),
+    country: Optional[str] = Query(default="All"),
+    equipment_type: Optional[str] = Query(default="All"),
+    company_name: Optional[str] = Query(default="All"),
+    sort_by: Optional[str] = Query(default=None, description="Comma-separated columns; prefix '-' for descending"),
+    fields: Optional[str] = Query(default=None, description="Comma-separated columns to export"),
+):
+    """Download the filtered customer list (same filters as /customers) as a file.
+
+    The export is written to a temporary file by DuckDB / a write-only workbook and
+    streamed back in chunks, so memory use does not grow with the row count.
+    """
+    import traceback
+    format = (format or "").lower()
+    if format not in data_service.EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported export format: {format}")
+    media_type, suffix = data_service.EXPORT_FORMATS[format]
+
+    fd, tmp_name = tempfile.mkstemp(prefix="customers_export_", suffix=suffix)
+    os.close(fd)
+    target = Path(tmp_name)
+    try:
+        data_service.export_customers(
+            target,
+            format,
+            equipment_type=equipment_type,
+            country=country,
+            region=region,
+            company_name=company_name,
+            sort_by=sort_by,
+            fields=fields,
+        )
+    except ValueError as e:
+        target.unlink(missing_ok=True)
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        target.unlink(missing_ok=True)
+        print(f"ERROR in /customers/export: {traceback.format_exc()}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    return StreamingResponse(
+        _stream_and_remove(target),
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="customers{suffix}"',
+            "Content-Length": str(target.stat().st_size),
+        },
+    )
+
+
+def _stream_and_remove(path: Path):
+    """Yield a file in EXPORT_CHUNK_BYTES chunks and delete it once streamed (or abandoned)."""
+    try:
+        with open(path, "rb") as fh:
+            while True:
+                chunk = fh.read(EXPORT_CHUNK_BYTES)
+                if not chunk:
+                    break
+                yield chunk
+    finally:
+        path.unlink(missing_ok=True)
+
+
 # ── /api/data/plants ──────────────────────────────────────────────────────────
 
 @router.get("/plants")
@@ -233,10 +336,33 @@ def get_plants(
     country: Optional[str] = Query(default="All"),
     equipment_type: Optional[str] = Query(default="All"),
     company_name: Optional[str] = Query(default="All"),
+    limit: Optional[int] = Query(default=None, ge=1, le=PAGE_LIMIT_MAX),
+    offset: int = Query(default=0, ge=0),
+    sort_by: Optional[str] = Query(default=None, description="Comma-separated columns; prefix '-' for descending"),
+    fields: Optional[str] = Query(default=None, description="Comma-separated columns to return"),
 ):
-    """Return detailed plant data for the map and inventory table."""
+    """Return detailed plant data for the map and inventory table.
+
+    Paging parameters behave as for /customers.
+    """
     import traceback
     try:
+        if limit is not None or offset or sort_by or fields:
+            try:
+                df, total = data_service.get_plant_page(
+                    equipment_type=equipment_type,
+                    country=country,
+                    region=region,
+                    company_name=company_name,
+                    limit=limit,
+                    offset=offset,
+                    sort_by=sort_by,
+                    fields=fields,
+                )
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            return {"plants": df_to_json_safe(df) if not df.empty else [], "total": total, "limit": limit, "offset": offset}
+
         df = data_service.get_detailed_plant_data(
             equipment_type=equipment_type,
             country=country,
@@ -247,6 +373,8 @@ def get_plants(
             return {"plants": [], "total": 0}
         clean = df_to_json_safe(df)
         return {"plants": clean, "total": len(clean)}
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"ERROR in /plants: {traceback.format_exc()}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -258,15 +386,25 @@ def get_stats(
     country: Optional[str] = Query(default="All"),
     equipment_type: Optional[str] = Query(default="All"),
     company_name: Optional[str] = Query(default="All"),
+    include_records: bool = Query(default=False, description="Also return one page of the underlying plant records"),
+    records_limit: int = Query(default=1000, ge=1, le=PAGE_LIMIT_MAX),
+    records_offset: int = Query(default=0, ge=0),
 ):
-    """Return summary statistics (distributions) for the Statistics panel."""
+    """Return summary statistics (distributions) for the Statistics panel.
+
+    The summary carries counts, quartiles and pre-binned histograms only; raw
+    records are opt-in via ``include_records`` and paged with records_limit/offset.
+    """
     import traceback
     try:
         result = data_service.get_stats(
             region=region,
             country=country,
             equipment_type=equipment_type,
-            company_name=company_name
+            company_name=company_name,
+            include_records=include_records,
+            records_limit=records_limit,
+            records_offset=records_offset,
         )
         # Sanitize: numpy.int64 keys from value_counts().to_dict() break FastAPI JSON encoder
         return json_safe_sanitize(result)
@@ -293,13 +431,45 @@ def get_logs():
     return {"logs": data_service.get_logs()}
 
 
+# ── /api/data/cache-stats ─────────────────────────────────────────────────────
+
+@router.get("/cache-stats")
+def get_cache_stats():
+    """Return hit/miss/eviction counters for the in-process query cache."""
+    return {"query_cache": data_service.get_query_cache_stats()}
+
+
 # ── /api/data/enrich-geo ──────────────────────────────────────────────────────
 
 @router.post("/enrich-geo")
 def enrich_geo(background_tasks: BackgroundTasks):
+    return _start_enrichment("geo", background_tasks)
+
+
+# ── /api/data/enrich-company ──────────────────────────────────────────────────
+
+@router.post("/enrich-company")
+def enrich_company(background_tasks: BackgroundTasks):
+    return _start_enrichment("company", background_tasks)
+
+
+# ── /api/data/enrichment-status ───────────────────────────────────────────────
+
+@router.get("/enrichment-status")
+def get_enrichment_status():
+    """Enrichment queue entries per kind and status (pending / done / failed)."""
+    try:
+        return {"queue": data_service.get_enrichment_status()}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def _start_enrichment(kind: str, background_tasks: BackgroundTasks):
+    """Queue every company missing ``kind`` data, then work the queue in the background."""
     try:
-        background_tasks.add_task(data_service.enrich_geo_coordinates)
-        return {"success": True, "message": "Background enrichment started."}
+        queued = data_service.enqueue_enrichment(kind)
+        background_tasks.add_task(data_service.process_enrichment_queue, kind)
+        return {"success": True, "queued": queued, "message": "Background enrichment started."}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -388,8 +558,8 @@ def rematch_poor_matches(background_tasks: BackgroundTasks):
 
 def _do_rematch_poor():
     """Background task: find all BCG companies with no match or low score and retry with LLM + web search."""
-    import json, logging
-    from app.services.mapping_service import mapping_service, _build_llm_client
+    import logging
+    from app.services.mapping_service import REMATCH_RULES, mapping_service
     logger = logging.getLogger("rematch_poor")
 
     conn = data_service.get_conn()
@@ -399,18 +569,18 @@ def _do_rematch_poor():
 
     # Load CRM names
     try:
-        crm_names = conn.execute("SELECT DISTINCT name FROM crm_data WHERE name IS NOT NULL").df()['name'].tolist()
+        crm_names = data_service.execute_df("SELECT DISTINCT name FROM crm_data WHERE name IS NOT NULL")['name'].tolist()
     except Exception:
         crm_names = []
 
     # Find BCG companies not yet matched, or matched with score < 70
     try:
-        poor_bcg = conn.execute("""
+        poor_bcg = data_service.execute_df("""
             SELECT DISTINCT b.company_internal
             FROM bcg_installed_base b
             LEFT JOIN company_mappings m ON b.company_internal = m.bcg_name
             WHERE m.bcg_name IS NULL OR m.match_score < 70
-        """).df()['company_internal'].tolist()
+        """)['company_internal'].tolist()
     except Exception as e:
         logger.error(f"Error fetching poor BCG companies: {e}")
         return
@@ -421,76 +591,58 @@ def _do_rematch_poor():
 
     logger.info(f"Re-matching {len(poor_bcg)} poor/unmatched BCG companies")
 
-    client, model = _build_llm_client()
-    if not client:
+    if not mapping_service.resolver:
         logger.warning("No LLM client — falling back to fuzzy only")
 
+    names = [str(b) for b in poor_bcg if b and str(b).lower() != 'nan']
+    match_index = mapping_service.build_index(crm_names)
+    match_cache = data_service.load_match_cache(crm_names)
     new_mappings = []
-    for bcg_name in poor_bcg:
-        if not bcg_name or str(bcg_name).lower() == 'nan':
-            continue
 
-        # First try: aggressive fuzzy with lower threshold
-        result = mapping_service.find_best_match(bcg_name, crm_names, threshold=60)
+    # First try: aggressive fuzzy with lower threshold (ambiguous names go to the LLM in batches)
+    results = mapping_service.match_many(names, crm_names, threshold=60, index=match_index, cache=match_cache)
+    unmatched = []
+    for bcg_name in names:
+        result = results.get(bcg_name)
         if result:
             matched, score = result
             new_mappings.append((matched, bcg_name, float(score)))
             logger.info(f"Fuzzy rematch: '{bcg_name}' → '{matched}' ({score:.0f})")
-            continue
+        else:
+            unmatched.append(bcg_name)
+
+    # If fuzzy fails and LLM available, try web search + LLM, batched like the matcher
+    if mapping_service.resolver and unmatched:
+        with ThreadPoolExecutor(max_workers=max(1, settings.LLM_MATCH_CONCURRENCY)) as pool:
+            contexts = dict(zip(unmatched, pool.map(_web_search_company, unmatched)))
+        verdicts = mapping_service.resolver.resolve(
+            [(bcg_name, crm_names[:30]) for bcg_name in unmatched],
+            rules=REMATCH_RULES,
+            contexts=contexts,
+        )
+        for bcg_name in unmatched:
+            verdict = verdicts.get(bcg_name)
+            if verdict and verdict[1] >= 65:
+                matched, score = verdict
+                new_mappings.append((matched, bcg_name, score))
+                logger.info(f"LLM rematch: '{bcg_name}' → '{matched}' ({score:.0f})")
 
-        # If fuzzy fails and LLM available, try web search + LLM
-        if client:
-            try:
-                web_context = _web_search_company(bcg_name)
-                prompt = f"""You are a steel industry expert. Match this BCG company name to the correct CRM company.
-
-BCG company: "{bcg_name}"
-Web context about this company: {web_context}
-
-CRM candidates (first 30):
-{json.dumps(crm_names[:30], indent=2)}
-
-Rules:
-- ONLY match if you are >70% confident they are the SAME legal entity
-- Account for abbreviations, legal suffixes (GmbH/AG/S.A./Ltd), holding vs operating company
-- If the BCG company is a subsidiary/plant of a CRM company, match it
-
-Respond ONLY with JSON: {{"match_found": true/false, "matched_name": "<exact CRM string or null>", "confidence": <0-100>}}"""
-
-                completion = client.chat.completions.create(
-                    model=model,
-                    messages=[
-                        {"role": "system", "content": "You are a steel industry master data expert."},
-                        {"role": "user", "content": prompt},
-                    ],
-                    response_format={"type": "json_object"},
-                    temperature=0,
-                )
-                result = json.loads(completion.choices[0].message.content)
-                if result.get("match_found") and result.get("matched_name") and result.get("confidence", 0) >= 65:
-                    matched = result["matched_name"]
-                    score = float(result.get("confidence", 75))
-                    new_mappings.append((matched, bcg_name, score))
-                    logger.info(f"LLM rematch: '{bcg_name}' → '{matched}' ({score:.0f})")
-            except Exception as e:
-                logger.error(f"LLM rematch error for '{bcg_name}': {e}")
+    logger.info(f"Match cache: {match_cache.hits} hits, {match_cache.misses} misses")
+    data_service.save_match_cache(match_cache)
 
     if new_mappings:
         try:
-            conn.executemany(
-                """INSERT INTO company_mappings (crm_name, bcg_name, match_score)
-                   VALUES (?, ?, ?)
-                   ON CONFLICT (bcg_name) DO UPDATE SET crm_name=excluded.crm_name, match_score=excluded.match_score""",
-                new_mappings
-            )
+            data_service.replace_company_mappings(new_mappings)
             logger.info(f"Saved {len(new_mappings)} new/updated mappings")
-            # Invalidate fingerprint to force unified view rebuild
-            try:
-                conn.execute("DELETE FROM _meta WHERE key='data_fingerprint'")
-            except Exception:
-                pass
         except Exception as e:
             logger.error(f"Error saving rematch results: {e}")
+            return
+
+        # Re-aggregate only the companies whose mappings changed
+        try:
+            data_service.refresh_unified_view()
+        except Exception as e:
+            logger.error(f"Error refreshing unified view after rematch: {e}")
 
 
 def _web_search_company(company_name: str) -> str:
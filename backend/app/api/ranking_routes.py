@@ -436,10 +436,17 @@ def retrain_model(snapshot_id: str = Query(default="live_duckdb")):
 
 
 @router.post("/refresh-external-features")
-def refresh_external_features(max_company_count: int = Query(default=75, ge=10, le=250)):
-    """Refresh stable external feature snapshots used by ranking training/inference."""
+def refresh_external_features(
+    max_company_count: int = Query(default=75, ge=10, le=250),
+    force: bool = Query(default=False),
+):
+    """Refresh stable external feature snapshots used by ranking training/inference.
+
+    Skipped (status "unchanged") when the source tables are unchanged and the
+    snapshot is still fresh, unless force=true.
+    """
     try:
-        result = external_feature_service.refresh_snapshots(max_company_count=max_company_count)
+        result = external_feature_service.refresh_snapshots(max_company_count=max_company_count, force=force)
         ml_ranking_service.clear_cache()
         return result
     except Exception as e:
@@ -26,6 +26,15 @@ class Settings:
 
     # Alternative: Standard OpenAI
     OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
+    # Any OpenAI-compatible endpoint (e.g. a local fake server); empty = api.openai.com
+    OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL", "")
+    OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o")
+
+    # Batched LLM entity resolution (mapping_service.BatchEntityResolver): target names per
+    # request, requests in flight at once, and tries per name before it counts as unresolved
+    LLM_MATCH_BATCH_SIZE = int(os.getenv("LLM_MATCH_BATCH_SIZE", "20"))
+    LLM_MATCH_CONCURRENCY = int(os.getenv("LLM_MATCH_CONCURRENCY", "4"))
+    LLM_MATCH_MAX_ATTEMPTS = int(os.getenv("LLM_MATCH_MAX_ATTEMPTS", "3"))
 
     # Web Search API (for enrichment)
     BING_SEARCH_API_KEY = os.getenv("BING_SEARCH_API_KEY", "")
@@ -33,6 +42,37 @@ class Settings:
 
     # Database
     DB_PATH = DATA_DIR / "sales_app.db"
+    # How often API processes look for a newly published dataset version (utils/db_versions.py)
+    DATASET_VERSION_CHECK_SECONDS = float(os.getenv("DATASET_VERSION_CHECK_SECONDS", "1"))
+
+    # In-process query result cache (data_service)
+    QUERY_CACHE_MAX_ENTRIES = int(os.getenv("QUERY_CACHE_MAX_ENTRIES", "256"))
+    QUERY_CACHE_MAX_BYTES = int(os.getenv("QUERY_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+    QUERY_CACHE_TTL_SECONDS = int(os.getenv("QUERY_CACHE_TTL_SECONDS", "300"))
+
+    # Parquet copies of Excel sheets, keyed by workbook hash (see utils/ingest_cache.py)
+    INGEST_CACHE_DIR = DATA_DIR / "processed" / "ingest_cache"
+    # Ranking feature matrix snapshot, keyed by input fingerprints (see utils/feature_store.py)
+    FEATURE_STORE_PATH = DATA_DIR / "processed" / "feature_store" / "ranking_features.parquet"
+    # Processes used to parse/prepare workbook sheets in parallel (0 = CPU count, 1 = in-process),
+    # for workbooks of at least INGEST_PARALLEL_MIN_BYTES (smaller ones are faster in-process)
+    INGEST_MAX_WORKERS = int(os.getenv("INGEST_MAX_WORKERS", "0"))
+    INGEST_PARALLEL_MIN_BYTES = int(os.getenv("INGEST_PARALLEL_MIN_BYTES", str(16 * 1024 * 1024)))
+
+    # Persistent company match cache (mapping_service.MatchCache): days a cached match is
+    # reused for an unchanged CRM name set; negative/fallback results expire sooner
+    MATCH_CACHE_TTL_DAYS = float(os.getenv("MATCH_CACHE_TTL_DAYS", "90"))
+    MATCH_CACHE_NEGATIVE_TTL_DAYS = float(os.getenv("MATCH_CACHE_NEGATIVE_TTL_DAYS", "7"))
+
+    # Background enrichment queue (data_service.process_enrichment_queue): companies resolved
+    # and written per batch, lookups that found nothing this many times are marked failed,
+    # and failed entries are queued again after this many days
+    ENRICHMENT_BATCH_SIZE = int(os.getenv("ENRICHMENT_BATCH_SIZE", "50"))
+    ENRICHMENT_MAX_ATTEMPTS = int(os.getenv("ENRICHMENT_MAX_ATTEMPTS", "3"))
+    ENRICHMENT_FAILED_RETRY_DAYS = float(os.getenv("ENRICHMENT_FAILED_RETRY_DAYS", "30"))
+
+    # External feature snapshots are reused while inputs are unchanged and younger than this
+    EXTERNAL_FEATURE_MAX_AGE_HOURS = float(os.getenv("EXTERNAL_FEATURE_MAX_AGE_HOURS", "24"))
     INTERNAL_KNOWLEDGE_DIR = DATA_DIR / "internal_knowledge"
     INTERNAL_KNOWLEDGE_NETWORK_ROOT = Path(
         os.getenv("INTERNAL_KNOWLEDGE_NETWORK_ROOT", r"P:\SDE-TS-Customer-Projects")
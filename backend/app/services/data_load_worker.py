@@ -6,7 +6,7 @@ import sys
 import time
 import re
 import subprocess
-from typing import List
+from typing import Dict, List
 
 from app.services.data_service import data_service
 from app.services.load_job_service import save_progress
@@ -80,7 +80,7 @@ def _maybe_cleanup_stale_lock_owner(error_text: str) -> bool:
         return False
 
 
-def _update_progress(job_id: str, step: str, current: int, total: int, logs: List[str] = None):
+def _update_progress(job_id: str, step: str, current: int, total: int, logs: List[str] = None, extra: Dict = None):
     percent = int((current / total) * 100) if total > 0 else 0
     payload = {
         "running": True,
@@ -92,9 +92,29 @@ def _update_progress(job_id: str, step: str, current: int, total: int, logs: Lis
     }
     if logs is not None:
         payload["logs"] = logs
+    if extra:
+        payload.update(extra)
     save_progress(job_id, payload)
 
 
+def _sheet_progress(job_id: str, file: str):
+    """Progress callback for load_bcg_installed_base: publishes per-sheet timings as they finish."""
+    timings = []
+
+    def report(done: int, total: int, timing: Dict):
+        timings.append(timing)
+        _update_progress(
+            job_id,
+            f"Loading BCG installed base ({file}): {done}/{total} sheets...",
+            3,
+            6,
+            data_service.get_logs(),
+            {"sheet_timings": list(timings)},
+        )
+
+    return report
+
+
 def run_data_load(job_id: str):
     save_progress(job_id, {
         "running": True,
@@ -105,18 +125,20 @@ def run_data_load(job_id: str):
         "total_steps": 6,
         "percent": 0,
         "logs": [],
+        "sheet_timings": [],
     })
 
     try:
         data_service.clear_logs()
         _cleanup_orphan_spawn_helpers()
 
+        # Build into a new dataset version; API readers stay on the published one until the swap.
         _update_progress(job_id, "Initializing database...", 1, 6)
         init_ok = False
         init_error = None
         for attempt in range(1, 6):
             try:
-                data_service.initialize_database()
+                data_service.begin_dataset_version()
                 init_ok = True
                 break
             except Exception as e:
@@ -146,6 +168,7 @@ def run_data_load(job_id: str):
         _update_progress(job_id, "Discovering data files...", 2, 6, data_service.get_logs())
         available_files = data_service.list_available_files()
         if not available_files:
+            data_service.discard_dataset_version()
             save_progress(job_id, {
                 "running": False,
                 "done": True,
@@ -158,7 +181,7 @@ def run_data_load(job_id: str):
         for file in available_files:
             if "bcg" in file.lower():
                 _update_progress(job_id, f"Loading BCG installed base ({file})...", 3, 6, data_service.get_logs())
-                data_service.load_bcg_installed_base(file)
+                data_service.load_bcg_installed_base(file, progress=_sheet_progress(job_id, file))
                 _update_progress(job_id, "BCG data loaded", 3, 6, data_service.get_logs())
 
         for file in available_files:
@@ -175,6 +198,7 @@ def run_data_load(job_id: str):
 
         _update_progress(job_id, "Creating unified company view & matching...", 5, 6, data_service.get_logs())
         data_service.create_unified_view()
+        data_service.publish_dataset_version()
         _update_progress(job_id, "Unified view created", 6, 6, data_service.get_logs())
 
         try:
@@ -193,6 +217,10 @@ def run_data_load(job_id: str):
         })
 
     except Exception as e:
+        try:
+            data_service.discard_dataset_version()
+        except Exception:
+            pass
         save_progress(job_id, {
             "running": False,
             "done": True,
@@ -3,46 +3,42 @@ Data ingestion service for loading and merging Excel/CSV files
 """
 import hashlib
 import re
-import shutil
-import time
 import threading
+import time
 import unicodedata
+import weakref
 import pandas as pd
 import duckdb
+import pyarrow as pa
+from concurrent.futures import as_completed
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional, Set, Tuple
 from app.core.config import settings
-from app.services.mapping_service import mapping_service
+from app.services.mapping_service import MatchCache, crm_set_version, mapping_service
 from app.services.enrichment_service import enrichment_service
+from app.services.load_job_service import get_latest_progress
+from app.utils import db_versions
+from app.utils.arrow_ingest import CATEGORY, to_arrow, union_tables
+from app.utils.ingest_cache import ExcelParquetCache, file_sha256, process_pool
+from app.utils.query_cache import QueryCache
 
 # ---------------------------------------------------------------------------
-# Module-level in-memory query cache  (survives Streamlit reruns in same process)
+# Module-level in-memory query cache shared by all API worker threads.
+# Bounded by entry count and estimated bytes, entries expire after the TTL,
+# and concurrent identical misses run the underlying query only once.
 # Cleared whenever create_unified_view() runs so stale results are never served.
 # ---------------------------------------------------------------------------
-_QUERY_CACHE: Dict[str, object] = {}
-_QUERY_CACHE_TTL: Dict[str, float] = {}
-_CACHE_TTL_SECONDS = 300  # 5 minutes
-
-
-def _cache_get(key: str):
-    """Return cached value or None if missing / expired"""
-    if key not in _QUERY_CACHE:
-        return None
-    if time.monotonic() - _QUERY_CACHE_TTL.get(key, 0) > _CACHE_TTL_SECONDS:
-        del _QUERY_CACHE[key]
-        return None
-    return _QUERY_CACHE[key]
-
-
-def _cache_set(key: str, value):
-    _QUERY_CACHE[key] = value
-    _QUERY_CACHE_TTL[key] = time.monotonic()
+_QUERY_CACHE = QueryCache(
+    max_entries=settings.QUERY_CACHE_MAX_ENTRIES,
+    max_bytes=settings.QUERY_CACHE_MAX_BYTES,
+    ttl_seconds=settings.QUERY_CACHE_TTL_SECONDS,
+)
 
 
 def _cache_clear():
     """Invalidate all cached query results"""
     _QUERY_CACHE.clear()
-    _QUERY_CACHE_TTL.clear()
 
 
 class DataIngestionService:
@@ -61,39 +57,107 @@ class DataIngestionService:
         'systems', 'technology', 'technologies', 'metals', 'metal', 'works', 'werk', 'plant',
         'eisen', 'und', 'of', 'the', 'de', 'du', 'la', 'le', 'products', 'solutions'
     }
+    # Tables whose company names get a row in company_name_keys
+    COMPANY_NAME_SOURCES = ("crm_data", "unified_companies")
+    # Upper bound on in-process memoised company-name keys
+    COMPANY_KEY_MEMO_MAX = 200_000
     
     def __init__(self):
         self.db_path = settings.DB_PATH
         self.data_dir = settings.DATA_DIR
+        # Excel sheets are parsed once per workbook version and re-read from Parquet.
+        self.ingest_cache = ExcelParquetCache(
+            settings.INGEST_CACHE_DIR,
+            max_workers=settings.INGEST_MAX_WORKERS,
+            parallel_min_bytes=settings.INGEST_PARALLEL_MIN_BYTES,
+        )
         self.conn = None
         self.logs = []
         self._schema_migrated = False  # track one-time schema migration
-        self._lock = threading.Lock()  # DuckDB connections are NOT thread-safe
-        self._snapshot_db_path = None
+        self._derived_tables_ready = set()  # lookup tables known to exist (region_keys, company_mapping_best, ...)
+        self._derived_tables_failed = set()  # lookup tables that could not be built on the current handle
+        self._company_key_memo: Dict[str, Tuple[str, Tuple[str, ...], str]] = {}
+        # A single DuckDB connection is NOT thread-safe, but cursors created from it
+        # are independent connections to the same database. Reads run on a per-thread
+        # cursor so dashboard queries execute in parallel; writes are serialised on
+        # the parent connection behind the write lock.
+        self._write_lock = threading.RLock()
+        self._cursor_local = threading.local()
+        self._cursors = weakref.WeakSet()
+        self._cursors_lock = threading.Lock()
+        self._conn_generation = 0
+        # Double-buffered dataset (see utils/db_versions.py): the file this process has open,
+        # the loader's unpublished version while it builds one, and handles retired on a swap.
+        self.active_db_path = None
+        self._active_version = None
+        self._staged_db_path = None
+        self._next_version_check = 0.0
+        self._retired_handles = []
+        # Set while the published version is held read-only for a loader (release_write_access)
+        self._released_for_load = False
         
     def add_log(self, message: str):
         """Add a log message for the UI"""
         self.logs.append(message)
         print(message)
 
+    def _thread_cursor(self):
+        """Return this thread's DuckDB cursor, creating it on first use."""
+        # Read the generation first: if the connection is swapped meanwhile, the cursor
+        # created below is tagged stale and replaced on the next call.
+        generation = self._conn_generation
+        conn = self.get_conn()
+        local = self._cursor_local
+        cursor = getattr(local, 'cursor', None)
+        if cursor is None or getattr(local, 'generation', None) != generation:
+            cursor = conn.cursor()
+            local.cursor = cursor
+            local.generation = generation
+            with self._cursors_lock:
+                self._cursors.add(cursor)
+        return cursor
+
     def execute(self, query, params=None):
-        """Thread-safe DuckDB execute"""
-        with self._lock:
-            if params:
-                return self.conn.execute(query, params)
-            return self.conn.execute(query)
+        """Thread-safe DuckDB read on the calling thread's cursor"""
+        try:
+            cursor = self._thread_cursor()
+            return cursor.execute(query, params) if params else cursor.execute(query)
+        except duckdb.ConnectionException:
+            # The connection was closed under this thread (reopened for a dataset reload); drop
+            # the dead cursor so the retry opens a fresh one.
+            self._cursor_local.cursor = None
+            cursor = self._thread_cursor()
+            return cursor.execute(query, params) if params else cursor.execute(query)
 
     def execute_df(self, query, params=None):
-        """Thread-safe DuckDB execute returning a DataFrame"""
-        with self._lock:
+        """Thread-safe DuckDB read on the calling thread's cursor, returning a DataFrame"""
+        return self.execute(query, params).df()
+
+    def execute_write(self, query, params=None, many: bool = False):
+        """Exclusive DuckDB write (DDL, inserts, updates) on the parent connection"""
+        conn = self.get_conn()
+        with self._write_lock:
+            if many:
+                return conn.executemany(query, params)
             if params:
-                return self.conn.execute(query, params).df()
-            return self.conn.execute(query).df()
+                return conn.execute(query, params)
+            return conn.execute(query)
+
+    @contextmanager
+    def write_connection(self):
+        """Hold the write lock and yield the parent connection for multi-statement writes"""
+        conn = self.get_conn()
+        with self._write_lock:
+            yield conn
 
     def get_conn(self):
         """Helper to get connection, initializing if needed"""
+        if self.conn and self._staged_db_path is None and time.monotonic() >= self._next_version_check:
+            self._follow_published_version()
         if not self.conn:
-            self.initialize_database()
+            with self._write_lock:
+                if not self.conn:
+                    self.initialize_database()
         return self.conn
 
     def get_logs(self) -> List[str]:
@@ -104,75 +168,253 @@ class DataIngestionService:
         """Clear the logs"""
         self.logs = []
         
-    def initialize_database(self):
-        """Initialize DuckDB database"""
+    def initialize_database(self, read_only: bool = False):
+        """Initialize DuckDB database on the current dataset version"""
+        path = self._staged_db_path or db_versions.current_db_path(self.db_path)
+        version = None if self._staged_db_path else db_versions.current_version(self.db_path)
         try:
             # Try to connect in read-write mode first
-            self.conn = duckdb.connect(str(self.db_path))
-            self.add_log(f"Database initialized at {self.db_path}")
+            self.conn = duckdb.connect(str(path), read_only=read_only)
+            self._released_for_load = self._released_for_load and read_only
+            self.add_log(f"Database initialized at {path}" + (" (read-only)" if read_only else ""))
         except Exception as e:
-            if "used by another process" in str(e).lower() or "IO Error" in str(e):
-                self.add_log("Database is locked by another process. Attempting read-only connection...")
-                try:
-                    self.conn = duckdb.connect(str(self.db_path), read_only=True)
-                    self.add_log("Connected in READ-ONLY mode. (Data loading will be disabled)")
-                except Exception as inner_e:
-                    self.add_log(f"Read-only connection failed: {inner_e}")
-                    self.conn = self._connect_snapshot_copy()
-            else:
+            if read_only or not ("used by another process" in str(e).lower() or "IO Error" in str(e)):
                 self.add_log(f"Database error: {e}")
                 raise e
+            self.add_log("Database is locked by another process. Attempting read-only connection...")
+            try:
+                self.conn = duckdb.connect(str(path), read_only=True)
+                self.add_log("Connected in READ-ONLY mode. (Data loading will be disabled)")
+            except Exception as inner_e:
+                # Keep serving the version published before this one rather than copying the file.
+                previous = db_versions.previous_db_path(self.db_path)
+                if previous is None:
+                    self.add_log(f"Read-only connection failed: {inner_e}")
+                    raise inner_e
+                self.conn = duckdb.connect(str(previous), read_only=True)
+                path = previous
+                self.add_log(f"Read-only connection failed ({inner_e}); serving previous version {previous.name}")
+        self.active_db_path = path
+        self._derived_tables_failed = set()
+        self._active_version = version
+        self._next_version_check = time.monotonic() + settings.DATASET_VERSION_CHECK_SECONDS
+
+    def _follow_published_version(self):
+        """Reopen on a newly published dataset version, or read-write again on the same
+        version once the load that released write access has ended without publishing.
+
+        On a version switch the old connection and its cursors are retired rather than closed
+        so queries already running on them finish; they are closed on the following swap. The
+        same file cannot be reopened with another access mode while a handle is open, so a
+        read-write reopen of the current version closes them instead.
+        """
+        self._next_version_check = time.monotonic() + settings.DATASET_VERSION_CHECK_SECONDS
+        if db_versions.current_version(self.db_path) == self._active_version and not self._load_ended():
+            return
+        with self._write_lock:
+            version = db_versions.current_version(self.db_path)
+            if not self.conn:
+                return
+            if version == self._active_version:
+                if not self._load_ended():
+                    return
+                self.add_log("Data load ended without publishing; reopening dataset read-write")
+                self.close()
+            else:
+                self.add_log(f"Switching to dataset version {version}")
+                self._retire_connection()
+            self.initialize_database()
+
+    def _load_ended(self) -> bool:
+        """True when write access was released for a load job that is no longer running."""
+        if not self._released_for_load:
+            return False
+        latest = get_latest_progress()
+        return not (latest and latest.get("running"))
+
+    def _retire_connection(self):
+        """Detach the current connection and cursors from new requests without closing them."""
+        for handle in self._retired_handles:
+            try:
+                handle.close()
+            except Exception:
+                pass
+        with self._cursors_lock:
+            retired = list(self._cursors)
+            self._cursors = weakref.WeakSet()
+            self._conn_generation += 1
+        self._retired_handles = retired + ([self.conn] if self.conn else [])
+        self.conn = None
+        self._derived_tables_ready = set()
+        self._schema_migrated = False
+        _cache_clear()
 
-    def _connect_snapshot_copy(self):
-        """Create a temporary snapshot copy of the DB for read-only queries when the main file is locked."""
-        temp_dir = settings.BASE_DIR / "temp"
-        temp_dir.mkdir(parents=True, exist_ok=True)
+    def release_write_access(self, start_job: Optional[Callable[[], Dict]] = None):
+        """Reopen the current version read-only so a loader process can read it to seed the
+        next version; the API keeps serving queries from it meanwhile.
 
-        snapshot_db = temp_dir / "sales_app_snapshot.db"
-        snapshot_wal = temp_dir / "sales_app_snapshot.db.wal"
-        source_wal = Path(f"{self.db_path}.wal")
+        ``start_job`` launches the loader under the write lock, so the handle is not reopened
+        read-write before the job is recorded as running; its result is returned.
+        """
+        with self._write_lock:
+            if self.conn and not self._staged_db_path:
+                try:
+                    self.conn.execute("CHECKPOINT")
+                except Exception:
+                    pass
+            self.close()
+            self._released_for_load = True
+            try:
+                self.initialize_database(read_only=True)
+            except Exception as e:
+                self.add_log(f"Could not reopen database read-only: {e}")
+            return start_job() if start_job else None
 
-        try:
-            shutil.copy2(self.db_path, snapshot_db)
-            if source_wal.exists():
-                shutil.copy2(source_wal, snapshot_wal)
-            self._snapshot_db_path = snapshot_db
-            conn = duckdb.connect(str(snapshot_db), read_only=True)
-            self.add_log(f"Connected using snapshot copy at {snapshot_db}. (Read-only mode)")
-            return conn
-        except Exception as snapshot_error:
-            self.add_log(f"Failed to connect via snapshot copy: {snapshot_error}")
-            raise snapshot_error
+    # ── Dataset versions (loader side) ───────────────────────────────────────
 
-    def _normalize_company_name(self, name: str) -> str:
-        raw = str(name or '').strip().lower()
-        if not raw:
-            return ''
-        ascii_name = unicodedata.normalize('NFKD', raw).encode('ascii', 'ignore').decode('ascii')
-        return re.sub(r'[^a-z0-9]+', '', ascii_name)
+    def begin_dataset_version(self) -> Path:
+        """Start building the next dataset version, seeded with a copy of the published one.
 
-    def _tokenize_company_name(self, name: str) -> List[str]:
-        raw = str(name or '').strip().lower()
-        if not raw:
-            return []
-        ascii_name = unicodedata.normalize('NFKD', raw).encode('ascii', 'ignore').decode('ascii')
-        ascii_name = re.sub(r'[-/,()]+', ' ', ascii_name)
-        tokens = [tok for tok in re.split(r'\s+', ascii_name) if tok]
+        Subsequent loads write to the new file; readers keep using the published version
+        until publish_dataset_version() swaps the pointer.
+        """
+        source = db_versions.current_db_path(self.db_path)
+        target = db_versions.new_version_path(self.db_path)
+        with self._write_lock:
+            self.close()
+            conn = duckdb.connect(str(target))
+            try:
+                if source.exists():
+                    conn.execute(f"ATTACH {self._quote_literal(source)} AS published (READ_ONLY)")
+                    try:
+                        target_db = conn.execute("SELECT current_database()").fetchone()[0]
+                        conn.execute(f"COPY FROM DATABASE published TO {self._quote_ident(target_db)}")
+                    finally:
+                        conn.execute("DETACH published")
+            except Exception:
+                conn.close()
+                db_versions.discard(target)
+                raise
+            self.conn = conn
+            self._staged_db_path = target
+            self.active_db_path = target
+            self._derived_tables_ready = set()
+            self._derived_tables_failed = set()
+            self._schema_migrated = False
+        self.add_log(f"Building dataset version {target.name} (from {source.name})")
+        return target
+
+    def publish_dataset_version(self):
+        """Checkpoint and close the staged version, then atomically make it current."""
+        target = self._staged_db_path
+        if target is None:
+            return
+        with self._write_lock:
+            # Cursors used during the load may still hold open transactions, which make a
+            # plain CHECKPOINT fail; close them so the checkpoint sees only this connection.
+            self._close_cursors()
+            self.conn.execute("CHECKPOINT")
+            self.close()
+            self._staged_db_path = None
+            db_versions.publish(self.db_path, target)
+            removed = db_versions.prune(self.db_path)
+        self.add_log(f"Published dataset version {target.name}" + (f" ({removed} old file(s) removed)" if removed else ""))
+
+    def discard_dataset_version(self):
+        """Abandon the staged version; readers stay on the published one."""
+        target = self._staged_db_path
+        if target is None:
+            return
+        with self._write_lock:
+            self.close()
+            self._staged_db_path = None
+            db_versions.discard(target)
+
+    def _compute_company_name_keys(self, raw: str) -> Tuple[str, Tuple[str, ...], str]:
+        lowered = raw.strip().lower()
+        if not lowered:
+            return '', (), ''
+        ascii_name = unicodedata.normalize('NFKD', lowered).encode('ascii', 'ignore').decode('ascii')
+        normalized = re.sub(r'[^a-z0-9]+', '', ascii_name)
+
+        tokens = [tok for tok in re.split(r'\s+', re.sub(r'[-/,()]+', ' ', ascii_name)) if tok]
         while tokens and tokens[-1] in self.LEGAL_SUFFIX_TOKENS:
             tokens.pop()
-        return tokens
+
+        group_key = ''
+        if tokens:
+            first = tokens[0]
+            if first in self.GENERIC_ROOT_TOKENS and len(tokens) > 1:
+                meaningful = [tok for tok in tokens if tok not in self.GENERIC_ROOT_TOKENS]
+                group_key = ''.join(meaningful[:2]) if meaningful else ''.join(tokens[:2])
+            elif len(first) < 4 and len(tokens) > 1:
+                group_key = ''.join(tokens[:2])
+            else:
+                group_key = first
+        return normalized, tuple(tokens), group_key
+
+    def _company_name_keys(self, name) -> Tuple[str, Tuple[str, ...], str]:
+        """(normalized_name, tokens, group_key) of a company name, computed once per distinct name."""
+        raw = str(name or '')
+        keys = self._company_key_memo.get(raw)
+        if keys is None:
+            keys = self._compute_company_name_keys(raw)
+            if len(self._company_key_memo) < self.COMPANY_KEY_MEMO_MAX:
+                self._company_key_memo[raw] = keys
+        return keys
+
+    def _normalize_company_name(self, name: str) -> str:
+        return self._company_name_keys(name)[0]
+
+    def _tokenize_company_name(self, name: str) -> List[str]:
+        return list(self._company_name_keys(name)[1])
 
     def _extract_company_group_key(self, name: str) -> str:
-        tokens = self._tokenize_company_name(name)
-        if not tokens:
-            return ''
-        first = tokens[0]
-        if first in self.GENERIC_ROOT_TOKENS and len(tokens) > 1:
-            meaningful = [tok for tok in tokens if tok not in self.GENERIC_ROOT_TOKENS]
-            return ''.join(meaningful[:2]) if meaningful else ''.join(tokens[:2])
-        if len(first) < 4 and len(tokens) > 1:
-            return ''.join(tokens[:2])
-        return first
+        return self._company_name_keys(name)[2]
+
+    def _refresh_company_name_keys(self, conn):
+        """Sync company_name_keys with the names in COMPANY_NAME_SOURCES; keys are only computed for new names."""
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS company_name_keys (
+                name VARCHAR PRIMARY KEY,
+                clean_name VARCHAR,
+                normalized_name VARCHAR,
+                tokens VARCHAR[],
+                group_key VARCHAR
+            )
+        """)
+        sources = [t for t in self.COMPANY_NAME_SOURCES if self._table_exists(conn.execute, t)]
+        if not sources:
+            conn.execute("DELETE FROM company_name_keys")
+            return
+        names_sql = " UNION ".join(
+            f"SELECT CAST(name AS VARCHAR) AS name FROM {t} WHERE name IS NOT NULL" for t in sources
+        )
+        conn.execute(f"DELETE FROM company_name_keys WHERE name NOT IN ({names_sql})")
+        new_names = [row[0] for row in conn.execute(
+            f"SELECT DISTINCT name FROM ({names_sql}) n WHERE name NOT IN (SELECT name FROM company_name_keys)"
+        ).fetchall()]
+        if not new_names:
+            return
+        keys = [self._company_name_keys(name) for name in new_names]
+        df = pd.DataFrame({
+            'name': new_names,
+            'clean_name': [name.strip() for name in new_names],
+            'normalized_name': [k[0] for k in keys],
+            'tokens': [' '.join(k[1]) for k in keys],
+            'group_key': [k[2] for k in keys],
+        })
+        conn.register('_company_name_keys_df', df)
+        try:
+            conn.execute("""
+                INSERT INTO company_name_keys
+                SELECT name, clean_name, normalized_name,
+                       CASE WHEN tokens = '' THEN []::VARCHAR[] ELSE string_split(tokens, ' ') END,
+                       group_key
+                FROM _company_name_keys_df
+            """)
+        finally:
+            conn.unregister('_company_name_keys_df')
 
     def _best_group_label(self, group_key: str, members: List[str]) -> str:
         def _base_name(value: str) -> str:
@@ -195,18 +437,48 @@ class DataIngestionService:
 
     def get_company_hierarchy(self, region: str = 'All', country: str = 'All', equipment_type: str = 'All') -> Dict[str, List[Dict]]:
         cache_key = f"company_hierarchy|{region}|{country}|{equipment_type}"
-        cached = _cache_get(cache_key)
-        if cached is not None:
-            return cached
-
-        names = self.get_all_company_names(region=region, country=country, equipment_type=equipment_type)
-        unique_names = sorted({str(name).strip() for name in names if str(name).strip()})
-        grouped: Dict[str, List[str]] = {}
-        for name in unique_names:
-            group_key = self._extract_company_group_key(name)
-            if not group_key:
-                continue
-            grouped.setdefault(group_key, []).append(name)
+        return _QUERY_CACHE.get_or_compute(
+            cache_key,
+            lambda: self._build_company_hierarchy(region, country, equipment_type),
+        )
+
+    def _query_company_groups(self, region: str, country: str, equipment_type: str):
+        """Company names and their groups via SQL GROUP BY over company_name_keys.
+        Returns (unique_names, {group_key: members}) or None if the key table is unavailable."""
+        query, params = self._company_names_query(region, country, equipment_type)
+        if query is None:
+            return [], {}
+        if not self._ensure_derived_table('company_name_keys', self._refresh_company_name_keys):
+            return None
+        rows = self.execute(f"""
+            SELECT k.group_key, list(DISTINCT k.clean_name) AS members
+            FROM ({query}) n
+            JOIN company_name_keys k ON k.name = n.name
+            WHERE k.clean_name <> ''
+            GROUP BY k.group_key
+            ORDER BY MIN(k.clean_name)
+        """, params).fetchall()
+        unique_names = sorted(name for _, members in rows for name in members)
+        grouped = {group_key: members for group_key, members in rows if group_key and len(members) >= 2}
+        return unique_names, grouped
+
+    def _build_company_hierarchy(self, region: str, country: str, equipment_type: str) -> Dict[str, List[Dict]]:
+        try:
+            result = self._query_company_groups(region, country, equipment_type)
+        except Exception as e:
+            self.add_log(f"Error grouping company names: {e}")
+            result = None
+        if result is not None:
+            unique_names, grouped = result
+        else:
+            names = self.get_all_company_names(region=region, country=country, equipment_type=equipment_type)
+            unique_names = sorted({str(name).strip() for name in names if str(name).strip()})
+            grouped: Dict[str, List[str]] = {}
+            for name in unique_names:
+                group_key = self._extract_company_group_key(name)
+                if not group_key:
+                    continue
+                grouped.setdefault(group_key, []).append(name)
 
         groups = []
         grouped_names = set()
@@ -231,7 +503,6 @@ class DataIngestionService:
             'company_groups': groups,
             'standalone_companies': standalone,
         }
-        _cache_set(cache_key, hierarchy)
         return hierarchy
 
     def resolve_company_selection(self, company_name: str, region: str = 'All', country: str = 'All', equipment_type: str = 'All') -> Dict[str, object]:
@@ -279,7 +550,78 @@ class DataIngestionService:
         placeholders = ', '.join(['?'] * len(values))
         params.extend(values)
         return query + f' AND {column_expr} IN ({placeholders})'
+
+    @staticmethod
+    def _quote_ident(name: str) -> str:
+        return '"' + str(name).replace('"', '""') + '"'
+
+    @staticmethod
+    def _quote_literal(value) -> str:
+        return "'" + str(value).replace("'", "''") + "'"
+
+    @staticmethod
+    def _split_columns(value) -> List[str]:
+        """Comma-separated string (or list) of column names -> stripped, non-empty names."""
+        if not value:
+            return []
+        if isinstance(value, str):
+            value = value.split(',')
+        return [str(v).strip() for v in value if str(v).strip()]
+
+    def _query_page(self, query: str, params: List[object], limit: Optional[int] = None, offset: int = 0,
+                    sort_by=None, fields=None, columns: Optional[List[str]] = None,
+                    default_sort: Optional[str] = None):
+        """Run one page of ``query`` with projection, ORDER BY and LIMIT/OFFSET pushed into DuckDB.
+
+        ``fields`` and ``sort_by`` name output columns of ``query`` (``-col`` sorts descending)
+        and are validated against them, so nothing user-supplied is spliced into SQL unchecked.
+        ``columns`` limits which output columns may be returned at all.
+        Returns ``(page_df, total_rows)``; raises ValueError for unknown fields or sort keys.
+        """
+        page_query = self._ordered_select(query, params, sort_by, fields, columns, default_sort)
+        total = int(self.execute(f"SELECT COUNT(*) FROM ({query}) q", params).fetchone()[0])
+        page_params = list(params)
+        if limit is not None:
+            page_query += " LIMIT ?"
+            page_params.append(int(limit))
+        if offset:
+            page_query += " OFFSET ?"
+            page_params.append(int(offset))
+        return self.execute_df(page_query, page_params), total
     
+    def _ordered_select(self, query: str, params: List[object], sort_by=None, fields=None,
+                        columns: Optional[List[str]] = None, default_sort: Optional[str] = None) -> str:
+        """Wrap ``query`` in a validated projection + deterministic ORDER BY (see _query_page)."""
+        available = list(self.execute_df(f"SELECT * FROM ({query}) q LIMIT 0", params).columns)
+        allowed = [c for c in (columns or available) if c in available]
+
+        requested = self._split_columns(fields)
+        unknown = [c for c in requested if c not in allowed]
+        if unknown:
+            raise ValueError(f"Unknown field(s): {', '.join(unknown)}")
+        selected = requested or allowed
+
+        sort_keys = self._split_columns(sort_by)
+        unknown = [k.lstrip('-') for k in sort_keys if k.lstrip('-') not in allowed]
+        if unknown:
+            raise ValueError(f"Unknown sort column(s): {', '.join(unknown)}")
+        if not sort_keys:
+            sort_keys = [k for k in self._split_columns(default_sort) if k.lstrip('-') in allowed]
+
+        order_terms, sorted_columns = [], set()
+        for key in sort_keys:
+            column = key.lstrip('-')
+            direction = 'DESC' if key.startswith('-') else 'ASC'
+            order_terms.append(f"{self._quote_ident(column)} {direction} NULLS LAST")
+            sorted_columns.add(column)
+        # Tie-break on the returned columns so consecutive pages neither overlap nor skip rows.
+        order_terms += [self._quote_ident(c) for c in selected if c not in sorted_columns]
+
+        return (
+            f"SELECT {', '.join(self._quote_ident(c) for c in selected)} FROM ({query}) q"
+            f" ORDER BY {', '.join(order_terms)}"
+        )
+
     def list_available_files(self) -> List[str]:
         """List all supported files in the data directory"""
         if not self.data_dir.exists():
@@ -304,8 +646,7 @@ class DataIngestionService:
         if filepath.suffix == '.csv':
             return ['CSV File']
         
-        excel_file = pd.ExcelFile(filepath)
-        return excel_file.sheet_names
+        return self.ingest_cache.sheet_names(filepath)
     
     def load_excel_file(self, filename: str, sheet_name: Optional[str] = None) -> pd.DataFrame:
         """Load an Excel file from the data directory with cleaning"""
@@ -318,19 +659,49 @@ class DataIngestionService:
             df = pd.read_csv(filepath)
         else:
             if sheet_name is None:
-                excel_file = pd.ExcelFile(filepath)
-                sheet_name = excel_file.sheet_names[0]
-            df = pd.read_excel(filepath, sheet_name=sheet_name)
+                sheet_name = self.ingest_cache.sheet_names(filepath)[0]
+            df = self.ingest_cache.read_sheet(filepath, sheet_name)
         
-        # Data Cleaning: Remove unnamed columns
-        df = df.loc[:, ~df.columns.str.contains('^Unnamed', na=False)]
-        
-        # Remove columns with no name (None or empty string)
-        df = df.loc[:, [c for c in df.columns if c and str(c).strip()]]
+        df = self._drop_unnamed_columns(df)
         
         self.add_log(f"Loaded {filename} (sheet: {sheet_name}): {len(df)} rows, {len(df.columns)} columns")
         return df
     
+    def _log_type_mismatches(self, source: str, mismatches: Dict[str, int]):
+        """Report values that did not fit a declared column type (they are loaded as NULL)."""
+        if mismatches:
+            details = ", ".join(f"{col}: {count}" for col, count in sorted(mismatches.items()))
+            self.add_log(f"  {source}: values not matching the declared type were set to NULL ({details})")
+
+    @staticmethod
+    def _drop_unnamed_columns(df: pd.DataFrame) -> pd.DataFrame:
+        # Data Cleaning: Remove unnamed columns
+        df = df.loc[:, ~df.columns.str.contains('^Unnamed', na=False)]
+        
+        # Remove columns with no name (None or empty string)
+        return df.loc[:, [c for c in df.columns if c and str(c).strip()]]
+
+    # Declared Arrow types of crm_data (after column normalization, see utils/arrow_ingest.py);
+    # other columns are inferred. Measures are DOUBLE like the unified view expects.
+    CRM_SCHEMA = {
+        'name': pa.string(),
+        'industry': CATEGORY,
+        'country': CATEGORY,
+        'region': CATEGORY,
+        'rating': CATEGORY,
+        'status': CATEGORY,
+        'Status of Plant/Equipment': CATEGORY,
+        'PBS: Plant type': CATEGORY,
+        'company_ceo': pa.string(),
+        'Installed Base ID': pa.int64(),
+        'fte': pa.float64(),
+        'fte_count': pa.float64(),
+        'revenue': pa.float64(),
+        'latitude': pa.float64(),
+        'longitude': pa.float64(),
+        'Nominat Capacity [t/y]': pa.float64(),
+    }
+
     def load_crm_data(self, filename: str = "crm_export.xlsx") -> pd.DataFrame:
         """Load CRM data with column normalization"""
         df = self.load_excel_file(filename)
@@ -380,67 +751,22 @@ class DataIngestionService:
                 df[col] = None
         
         
-        # Fix DuckDB type mismatch: Convert all columns to consistent types
-        for col in df.columns:
-            if df[col].dtype == 'object':
-                # Convert object columns to string, but preserve None for actual NaN values
-                df[col] = df[col].fillna('__NULL__')
-                df[col] = df[col].astype(str)
-                df[col] = df[col].replace('__NULL__', None)
-                df[col] = df[col].replace('nan', None)
-                df[col] = df[col].replace('None', None)
-            elif pd.api.types.is_numeric_dtype(df[col]):
-                df[col] = df[col].astype('float64')
-        
         # Store in DuckDB
         if self.conn:
             # Filter for Europe and Australia/Oceania specifically
-            europe_vars = [r.lower() for r in self.REGION_MAPPING["Europe"]]
-            aus_vars = ["australia", "oceania", "nz", "new zealand"]
-            
-            target_vars = europe_vars + aus_vars
-            
             if 'region' in df.columns or 'country' in df.columns:
-                target_regions = ["europe", "oceania"]
-                
-                def matches_target(row):
-                    reg = str(row.get('region', '') or '').lower()
-                    cnt = str(row.get('country', '') or '').lower()
-                    
-                    # 1. Direct match on region name
-                    if any(v in reg for v in target_vars) or reg in target_vars:
-                        return True
-                    
-                    # 2. Direct match on country name (e.g. "Australia")
-                    if any(v in cnt for v in target_vars) or cnt in target_vars:
-                        # Try to fill region if empty
-                        return True
-                        
-                    # 3. Check country-to-region map
-                    mapped_reg = self.COUNTRY_TO_REGION_MAP.get(cnt, "").lower()
-                    if mapped_reg in target_regions:
-                        return True
-                        
-                    return False
-                
-                # Apply filter
-                df = df[df.apply(matches_target, axis=1)].copy()
+                df = df[self._target_region_mask(df)].copy()
                 
                 # IMPORTANT: Fill missing regions
-                def fill_region(row):
-                    reg = str(row.get('region', '') or '').strip()
-                    if not reg or reg.lower() == 'nan':
-                        cnt = str(row.get('country', '') or '').lower()
-                        return self.COUNTRY_TO_REGION_MAP.get(cnt, reg)
-                    return reg
-                
                 if 'region' in df.columns:
-                    df['region'] = df.apply(fill_region, axis=1)
+                    df['region'] = self._backfill_region(df)
                 else:
                     df['region'] = df['country'].str.lower().map(self.COUNTRY_TO_REGION_MAP)
             
-            self.conn.execute("DROP TABLE IF EXISTS crm_data")
-            self.conn.execute("CREATE TABLE crm_data AS SELECT * FROM df")
+            mismatches = {}
+            table = to_arrow(df, self.CRM_SCHEMA, mismatches)
+            self._log_type_mismatches(filename, mismatches)
+            self.replace_table("crm_data", table, source=self._source_signature(filename))
             self.add_log(f"CRM data loaded (filtered for Europe): {len(df)} records")
         
         return df
@@ -537,124 +863,144 @@ class DataIngestionService:
         "Commonwealth": ["CIS", "Russia", "Kazakhstan", "Ukraine", "Uzbekistan", "Belarus"]
     }
 
-    def load_bcg_installed_base(self, filename: str = "bcg_data.xlsx") -> pd.DataFrame:
+    # Columns returned by the plant endpoints (dashboard map, inventory and profile flows)
+    PLANT_COLUMNS = [
+        "name",
+        "crm_name",
+        "company_internal",
+        "equipment_type",
+        "country",
+        "country_internal",
+        "Region",
+        "site_name",
+        "site_city",
+        "city_internal",
+        "City",
+        "capacity",
+        "capacity_internal",
+        "Nominal Capacity",
+        "status_internal",
+        "Status of the Plant",
+        "Matching Quality %",
+        "map_latitude",
+        "map_longitude",
+        "latitude",
+        "longitude",
+        "CEO",
+        "Number of Full time employees",
+        "manufacturer",
+        "oem",
+        "start_year_internal",
+        "start_year",
+        "year",
+    ]
+
+    def load_bcg_installed_base(self, filename: str = "bcg_data.xlsx", progress=None) -> pd.DataFrame:
         """
         Load BCG installed base data from all sheets
+
+        Sheets are read from the ingest cache, column-mapped and region-filtered in a process
+        pool (INGEST_MAX_WORKERS) and handed back as Arrow tables, which are unioned and
+        written to DuckDB without a pandas concat. ``progress(done, total, timing)`` is called
+        as each sheet finishes, with timing = {"sheet", "rows", "seconds"[, "error"]}.
         """
         filepath = self.data_dir / filename
         if not filepath.exists():
             raise FileNotFoundError(f"File not found: {filepath}")
         
-        excel_file = pd.ExcelFile(filepath)
-        all_equipment = []
-        
-        self.add_log(f"Loading BCG Installed Base from {len(excel_file.sheet_names)} sheets...")
-        
-        for sheet_name in excel_file.sheet_names:
-            if sheet_name == "Master Sorting List":
-                continue
-            try:
-                df = self.load_excel_file(filename, sheet_name=sheet_name)
-                df = self.fuzzy_column_mapping(df)
-                df['equipment_type'] = sheet_name
-                
-                # Internal mapping for logic, but keep original columns for UI
-                internal_mapping = {
-                    'name': 'company_internal',
-                    'country': 'country_internal',
-                    'latitude': 'latitude_internal',
-                    'longitude': 'longitude_internal',
-                    'start_year': 'start_year_internal',
-                    'capacity': 'capacity_internal',
-                    'Status of the Plant': 'status_internal'
-                }
-                
-                for old_col, new_col in internal_mapping.items():
-                    if old_col in df.columns:
-                        df[new_col] = df[old_col]
-                
-                # Ensure 'company' exists for mapping
-                if 'company_internal' not in df.columns:
-                    potential_comp_cols = [c for c in df.columns if 'company' in str(c).lower() or 'customer' in str(c).lower()]
-                    if potential_comp_cols:
-                        df['company_internal'] = df[potential_comp_cols[0]]
-                
-                # Filter for Europe and Australia/Oceania specifically
-                europe_vars = [r.lower() for r in self.REGION_MAPPING["Europe"]]
-                aus_vars = ["australia", "oceania", "nz", "new zealand"]
-                
-                target_vars = europe_vars + aus_vars
-                
-                if 'region' in df.columns or 'country' in df.columns:
-                    target_regions = ["europe", "oceania"]
-                    def matches_target(row):
-                        reg = str(row.get('region', '') or '').lower()
-                        cnt = str(row.get('country', '') or '').lower()
-                        # 1. Direct match on region name
-                        if any(v in reg for v in target_vars) or reg in target_vars:
-                            return True
-                        # 2. Direct match on country name
-                        if any(v in cnt for v in target_vars) or cnt in target_vars:
-                            return True
-                        # 3. Check mapping
-                        mapped_reg = self.COUNTRY_TO_REGION_MAP.get(cnt, "").lower()
-                        if mapped_reg in target_regions:
-                            return True
-                        return False
-                    
-                    df = df[df.apply(matches_target, axis=1)].copy()
-                    
-                    # Fill missing regions to ensure filtering works correctly in unified view
-                    def fill_region_bcg(row):
-                        reg = str(row.get('region', '') or '').strip()
-                        if not reg or reg.lower() == 'nan':
-                            cnt = str(row.get('country', '') or '').lower()
-                            return self.COUNTRY_TO_REGION_MAP.get(cnt, reg)
-                        return reg
-                    
-                    df['region'] = df.apply(fill_region_bcg, axis=1)
-                
-                if not df.empty:
-                    all_equipment.append(df)
-                    self.add_log(f"  Processed {sheet_name} (Europe): {len(df)} records")
-                else:
-                    self.add_log(f"  Skipped {sheet_name}: No Europe records found")
-                
-            except Exception as e:
-                self.add_log(f"  Error loading sheet '{sheet_name}': {e}")
-                continue
-        
-        if not all_equipment:
+        sheet_names = [s for s in self.get_excel_sheets(filename) if s != "Master Sorting List"]
+        self.add_log(f"Loading BCG Installed Base from {len(sheet_names)} sheets...")
+
+        tasks = [(str(filepath), str(self.ingest_cache.cache_dir), sheet_name) for sheet_name in sheet_names]
+        results = {}
+
+        def finished(result):
+            results[result["sheet"]] = result
+            if result.get("error"):
+                self.add_log(f"  Error loading sheet '{result['sheet']}': {result['error']}")
+            if result.get("mismatches"):
+                self._log_type_mismatches(result["sheet"], result["mismatches"])
+            elif result["rows"]:
+                self.add_log(f"  Processed {result['sheet']} (Europe): {result['rows']} records in {result['seconds']:.2f}s")
+            else:
+                self.add_log(f"  Skipped {result['sheet']}: No Europe records found")
+            if progress:
+                timing = {k: v for k, v in result.items() if k != "table"}
+                progress(len(results), len(tasks), timing)
+
+        workers = self.ingest_cache.workers_for(filepath, len(tasks))
+        if workers > 1:
+            with process_pool(workers) as pool:
+                futures = [pool.submit(_prepare_bcg_sheet_task, *task) for task in tasks]
+                for future in as_completed(futures):
+                    finished(future.result())
+        else:
+            for task in tasks:
+                finished(_prepare_bcg_sheet_task(*task))
+
+        tables = [results[name]["table"] for name in sheet_names if results[name].get("table") is not None]
+        if not tables:
             return pd.DataFrame()
+        combined = union_tables(tables, self.BCG_SCHEMA)
         
-        combined_df = pd.concat(all_equipment, ignore_index=True)
-        
-        # Numeric conversion for internal logic columns
-        for col in ['latitude_internal', 'longitude_internal', 'start_year_internal', 'capacity_internal']:
-            if col in combined_df.columns:
-                combined_df[col] = pd.to_numeric(combined_df[col], errors='coerce')
+        if self.conn:
+            self.replace_table("bcg_installed_base", combined, source=self._source_signature(filename))
+            self.add_log(f"BCG Installed Base loaded: {combined.num_rows} total records")
+        
+        return combined.to_pandas()
+
+    # Declared Arrow types of prepared BCG sheets (see utils/arrow_ingest.py); other columns
+    # are inferred. Internal logic columns are parsed as numbers (non-numeric values become
+    # NULL); the start year stays DOUBLE because callers fall back with ``year or ...``.
+    BCG_SCHEMA = {
+        'company_internal': pa.string(),
+        'country_internal': CATEGORY,
+        'country': CATEGORY,
+        'region': CATEGORY,
+        'Region': CATEGORY,
+        'equipment_type': CATEGORY,
+        'status_internal': CATEGORY,
+        'Status of the Plant': CATEGORY,
+        'latitude_internal': pa.float64(),
+        'longitude_internal': pa.float64(),
+        'start_year_internal': pa.float64(),
+        'capacity_internal': pa.float64(),
+        'DB-Plant-No.': pa.int64(),
+    }
+
+    def _prepare_bcg_sheet(self, df: pd.DataFrame, sheet_name: str) -> pd.DataFrame:
+        """Column mapping, internal columns and Europe/Oceania filter for one BCG sheet."""
+        df = self.fuzzy_column_mapping(df)
+        df['equipment_type'] = sheet_name
+        
+        # Internal mapping for logic, but keep original columns for UI
+        internal_mapping = {
+            'name': 'company_internal',
+            'country': 'country_internal',
+            'latitude': 'latitude_internal',
+            'longitude': 'longitude_internal',
+            'start_year': 'start_year_internal',
+            'capacity': 'capacity_internal',
+            'Status of the Plant': 'status_internal'
+        }
         
-        # Fix DuckDB type mismatch: Convert all columns to consistent types
-        # This prevents "Type DOUBLE does not match with INTEGER" errors
-        for col in combined_df.columns:
-            if combined_df[col].dtype == 'object':
-                # Convert object columns to string, but preserve None for actual NaN values
-                # First replace NaN with a placeholder, convert to string, then replace back
-                combined_df[col] = combined_df[col].fillna('__NULL__')
-                combined_df[col] = combined_df[col].astype(str)
-                combined_df[col] = combined_df[col].replace('__NULL__', None)
-                combined_df[col] = combined_df[col].replace('nan', None)
-                combined_df[col] = combined_df[col].replace('None', None)
-            elif pd.api.types.is_numeric_dtype(combined_df[col]):
-                # Convert all numeric types to float64 for consistency
-                combined_df[col] = combined_df[col].astype('float64')
+        for old_col, new_col in internal_mapping.items():
+            if old_col in df.columns:
+                df[new_col] = df[old_col]
         
-        if self.conn:
-            self.conn.execute("DROP TABLE IF EXISTS bcg_installed_base")
-            self.conn.execute("CREATE TABLE bcg_installed_base AS SELECT * FROM combined_df")
-            self.add_log(f"BCG Installed Base loaded: {len(combined_df)} total records")
+        # Ensure 'company' exists for mapping
+        if 'company_internal' not in df.columns:
+            potential_comp_cols = [c for c in df.columns if 'company' in str(c).lower() or 'customer' in str(c).lower()]
+            if potential_comp_cols:
+                df['company_internal'] = df[potential_comp_cols[0]]
         
-        return combined_df
+        # Filter for Europe and Australia/Oceania specifically
+        if 'region' in df.columns or 'country' in df.columns:
+            df = df[self._target_region_mask(df)].copy()
+            # Fill missing regions to ensure filtering works correctly in unified view
+            df['region'] = self._backfill_region(df)
+
+        return df
 
     COUNTRY_TO_REGION_MAP = {
         "germany": "Europe", "france": "Europe", "italy": "Europe", "spain": "Europe", "united kingdom": "Europe",
@@ -666,13 +1012,145 @@ class DataIngestionService:
         "australia": "Oceania", "new zealand": "Oceania", "nz": "Oceania", "papua new guinea": "Oceania", "fiji": "Oceania"
     }
 
+    # Europe + Australia/Oceania scope applied by the CRM and BCG loaders.
+    TARGET_REGION_VARIANTS = [r.lower() for r in REGION_MAPPING["Europe"]] + ["australia", "oceania", "nz", "new zealand"]
+    TARGET_REGION_PATTERN = "|".join(re.escape(v) for v in TARGET_REGION_VARIANTS)
+    TARGET_REGION_COUNTRIES = sorted(k for k, v in COUNTRY_TO_REGION_MAP.items() if v.lower() in ("europe", "oceania"))
+
+    @staticmethod
+    def _text_column(df: pd.DataFrame, column: str) -> pd.Series:
+        """Vectorised str(value or '') for a column: None/absent become '', NaN becomes 'nan'."""
+        if column not in df.columns:
+            return pd.Series('', index=df.index, dtype=object)
+        values = df[column]
+        text = values.astype(object).astype(str)
+        missing = values.isna()
+        if missing.any():
+            blank = values[missing].map(lambda v: v is None or v is pd.NA)
+            text = text.where(~missing, blank.map({True: '', False: 'nan'}))
+        return text
+
+    def _target_region_mask(self, df: pd.DataFrame) -> pd.Series:
+        """Rows whose region or country names a target-region variant, or whose country maps into one."""
+        reg = self._text_column(df, 'region').str.lower()
+        cnt = self._text_column(df, 'country').str.lower()
+        return (
+            reg.str.contains(self.TARGET_REGION_PATTERN, regex=True)
+            | cnt.str.contains(self.TARGET_REGION_PATTERN, regex=True)
+            | cnt.isin(self.TARGET_REGION_COUNTRIES)
+        )
+
+    def _backfill_region(self, df: pd.DataFrame) -> pd.Series:
+        """Keep stripped region values; fill empty/'nan' ones from COUNTRY_TO_REGION_MAP."""
+        reg = self._text_column(df, 'region').str.strip()
+        missing = reg.eq('') | reg.str.lower().eq('nan')
+        mapped = self._text_column(df, 'country').str.lower().map(self.COUNTRY_TO_REGION_MAP)
+        return reg.where(~missing, mapped.fillna(reg))
+
+    # Region filter option -> raw region values, kept in the region_keys lookup table
+    REGION_SOURCE_COLUMNS = {"bcg_installed_base": "Region", "crm_data": "region", "unified_companies": "region"}
+    UNASSIGNED_REGION = "Not assigned"
+
+    def _region_keys_for(self, value) -> List[str]:
+        """Region filter options a raw region value belongs to (the one canonical matching rule).
+        Blank values are unassigned; otherwise any REGION_MAPPING variant contained in the value
+        (case-insensitive), or the option name itself, selects that option."""
+        text = '' if value is None else str(value)
+        if not text.strip():
+            return [self.UNASSIGNED_REGION]
+        lowered = text.lower()
+        return [
+            key for key, variants in self.REGION_MAPPING.items()
+            if lowered == key.lower() or any(v.lower() in lowered for v in variants)
+        ]
+
+    def _region_key_rows(self, run) -> List[tuple]:
+        """(region_value, region_key) pairs for the distinct region values of the loaded tables.
+        ``run`` is conn.execute or self.execute."""
+        selects = []
+        for table, column in self.REGION_SOURCE_COLUMNS.items():
+            present = run(
+                "SELECT COUNT(*) FROM information_schema.columns "
+                "WHERE table_schema = 'main' AND table_name = ? AND lower(column_name) = lower(?)",
+                [table, column],
+            ).fetchone()[0]
+            if present:
+                selects.append(f'SELECT CAST("{column}" AS VARCHAR) AS region_value FROM {table}')
+        values = [row[0] for row in run(" UNION ".join(selects)).fetchall()] if selects else []
+        return [(v, key) for v in values if v is not None for key in self._region_keys_for(v)]
+
+    def _refresh_region_keys(self, conn):
+        """Rebuild the region_keys lookup (raw region value -> region filter option)."""
+        rows = self._region_key_rows(conn.execute)
+        conn.execute("CREATE OR REPLACE TABLE region_keys (region_value VARCHAR, region_key VARCHAR)")
+        if rows:
+            conn.register("_region_key_rows", pd.DataFrame(rows, columns=["region_value", "region_key"]))
+            try:
+                conn.execute("INSERT INTO region_keys SELECT region_value, region_key FROM _region_key_rows")
+            finally:
+                conn.unregister("_region_key_rows")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_region_keys_key ON region_keys(region_key)")
+
+    @staticmethod
+    def _table_exists(run, table_name: str) -> bool:
+        return bool(run(
+            "SELECT COUNT(*) FROM information_schema.tables WHERE table_schema = 'main' AND table_name = ?",
+            [table_name],
+        ).fetchone()[0])
+
+    def _ensure_derived_table(self, table_name: str, build) -> bool:
+        """True once ``table_name`` exists, building it with ``build(conn)`` for databases that
+        predate it. False if it is missing and cannot be built (read-only handle); that is
+        remembered until the connection is reopened, so the build is tried and logged once."""
+        if table_name in self._derived_tables_ready:
+            return True
+        if table_name in self._derived_tables_failed:
+            return False
+        try:
+            if not self._table_exists(self.execute, table_name):
+                with self.write_connection() as conn:
+                    if not self._table_exists(conn.execute, table_name):
+                        build(conn)
+        except Exception as e:
+            self._derived_tables_failed.add(table_name)
+            self.add_log(f"Could not build {table_name}: {e}")
+            return False
+        self._derived_tables_ready.add(table_name)
+        return True
+
+    def _region_filter_sql(self, column_expr: str, region: str, params: List[object]) -> str:
+        """Region predicate shared by the plant, customer, company-name and stats queries.
+        Returns '' for "All" (and unknown options); NULL regions count as unassigned."""
+        if region != self.UNASSIGNED_REGION and region not in self.REGION_MAPPING:
+            return ''
+        if self._ensure_derived_table('region_keys', self._refresh_region_keys):
+            params.append(region)
+            match = f"CAST({column_expr} AS VARCHAR) IN (SELECT region_value FROM region_keys WHERE region_key = ?)"
+        else:
+            values = [v for v, key in self._region_key_rows(self.execute) if key == region]
+            match = f"CAST({column_expr} AS VARCHAR) IN ({', '.join(['?'] * len(values))})" if values else "FALSE"
+            params.extend(values)
+        if region == self.UNASSIGNED_REGION:
+            return f" AND ({column_expr} IS NULL OR {match})"
+        return f" AND {match}"
+
     def get_detailed_plant_data(self, equipment_type: str = "All", country: str = "All", region: str = "All", company_name: str = "All") -> pd.DataFrame:
         """Get granular plant data joined with CRM information"""
         cache_key = f"detailed_plants|{equipment_type}|{country}|{region}|{company_name}"
-        cached = _cache_get(cache_key)
-        if cached is not None:
-            return cached.copy()
+        try:
+            df = _QUERY_CACHE.get_or_compute(
+                cache_key,
+                lambda: self._query_detailed_plant_data(equipment_type, country, region, company_name),
+            )
+        except Exception as e:
+            self.add_log(f"Error fetching plant data: {e}")
+            import traceback
+            self.add_log(traceback.format_exc())
+            return pd.DataFrame()
+        return df.copy()
 
+    def _detailed_plant_query(self, equipment_type: str, country: str, region: str, company_name: str):
+        """Build the filtered plant SQL; returns (query, params, has_crm, selection_scope)."""
         if not self.conn:
             self.initialize_database()
         
@@ -689,8 +1167,9 @@ class DataIngestionService:
         except:
             pass
 
+        mapping_best = self._mapping_best_relation()
         if has_crm:
-            query = """
+            query = f"""
                 SELECT 
                     b.*,
                     c.company_ceo as CEO,
@@ -699,28 +1178,14 @@ class DataIngestionService:
                     m.match_score as "Matching Quality %",
                     COALESCE(CAST(m.crm_name AS VARCHAR), CAST(b.company_internal AS VARCHAR)) as name
                 FROM bcg_installed_base b
-                LEFT JOIN (
-                    SELECT bcg_name, crm_name, match_score
-                    FROM (
-                        SELECT
-                            bcg_name,
-                            crm_name,
-                            match_score,
-                            ROW_NUMBER() OVER (
-                                PARTITION BY bcg_name
-                                ORDER BY match_score DESC NULLS LAST, crm_name
-                            ) AS rn
-                        FROM company_mappings
-                    ) ranked
-                    WHERE rn = 1
-                ) m ON b.company_internal = m.bcg_name
+                LEFT JOIN {mapping_best} m ON b.company_internal = m.bcg_name
                 LEFT JOIN (
                     SELECT name, company_ceo, fte_count FROM crm_data
                 ) c ON COALESCE(CAST(m.crm_name AS VARCHAR), CAST(b.company_internal AS VARCHAR)) = c.name
                 WHERE 1=1
             """
         else:
-            query = """
+            query = f"""
                 SELECT 
                     b.*,
                     CAST(NULL AS VARCHAR) as CEO,
@@ -728,21 +1193,7 @@ class DataIngestionService:
                     CAST(NULL AS VARCHAR) as crm_name,
                     m.match_score as "Matching Quality %"
                 FROM bcg_installed_base b
-                LEFT JOIN (
-                    SELECT bcg_name, crm_name, match_score
-                    FROM (
-                        SELECT
-                            bcg_name,
-                            crm_name,
-                            match_score,
-                            ROW_NUMBER() OVER (
-                                PARTITION BY bcg_name
-                                ORDER BY match_score DESC NULLS LAST, crm_name
-                            ) AS rn
-                        FROM company_mappings
-                    ) ranked
-                    WHERE rn = 1
-                ) m ON b.company_internal = m.bcg_name
+                LEFT JOIN {mapping_best} m ON b.company_internal = m.bcg_name
                 WHERE 1=1
             """
         params = []
@@ -763,281 +1214,478 @@ class DataIngestionService:
         if selection_scope['selection_type'] != 'all':
             query = self._append_in_filter(query, 'COALESCE(m.crm_name, b.company_internal)', selection_scope['company_names'], params)
             
-        try:
-            df = self.execute_df(query, params)
-            self.add_log(f"Query returned {len(df)} initial records.")
-            
-            # Apply Region filter in Pandas to handle mapping logic
-            if not df.empty and region != "All":
-                if region in self.REGION_MAPPING:
-                    allowed_regions = [r.lower() for r in self.REGION_MAPPING[region]]
-                    if 'Region' in df.columns:
-                        # Case-insensitive match against allowed variations
-                        mask = df['Region'].fillna("").apply(
-                            lambda x: any(r in str(x).lower() for r in allowed_regions) or str(x).lower() == region.lower()
+        query += self._region_filter_sql('b."Region"', region, params)
+        return query, params, has_crm, selection_scope
+
+    def _crm_only_plant_query(self, selection_scope: Dict):
+        """Plant-shaped rows synthesised from crm_data for companies without BCG plants."""
+        target_company_list = selection_scope.get('company_names', [])
+        crm_placeholders = ', '.join(['?'] * len(target_company_list))
+        query = f"""
+            SELECT
+                name,
+                name      AS crm_name,
+                name      AS company_internal,
+                CAST(NULL AS VARCHAR)   AS equipment_type,
+                country,
+                country   AS country_internal,
+                region    AS "Region",
+                CAST(NULL AS VARCHAR)   AS site_name,
+                CAST(NULL AS VARCHAR)   AS site_city,
+                CAST(NULL AS VARCHAR)   AS city_internal,
+                CAST(NULL AS VARCHAR)   AS "City",
+                CAST(NULL AS DOUBLE)    AS capacity,
+                CAST(NULL AS DOUBLE)    AS capacity_internal,
+                CAST(NULL AS DOUBLE)    AS "Nominal Capacity",
+                CAST(NULL AS VARCHAR)   AS status_internal,
+                CAST(NULL AS VARCHAR)   AS "Status of the Plant",
+                CAST(100.0 AS DOUBLE)   AS "Matching Quality %",
+                TRY_CAST(latitude  AS DOUBLE) AS map_latitude,
+                TRY_CAST(longitude AS DOUBLE) AS map_longitude,
+                TRY_CAST(latitude  AS DOUBLE) AS latitude,
+                TRY_CAST(longitude AS DOUBLE) AS longitude,
+                company_ceo             AS CEO,
+                fte_count               AS "Number of Full time employees",
+                CAST(NULL AS VARCHAR)   AS manufacturer,
+                CAST(NULL AS VARCHAR)   AS oem,
+                CAST(NULL AS DOUBLE)    AS start_year_internal,
+                CAST(NULL AS DOUBLE)    AS start_year,
+                CAST(NULL AS DOUBLE)    AS year
+            FROM crm_data
+            WHERE name IN ({crm_placeholders})
+        """
+        return query, list(target_company_list)
+
+    def get_plant_page(self, equipment_type: str = "All", country: str = "All", region: str = "All",
+                       company_name: str = "All", limit: Optional[int] = None, offset: int = 0,
+                       sort_by: Optional[str] = None, fields: Optional[str] = None):
+        """One page of get_detailed_plant_data, sorted/projected/limited in SQL; returns (df, total).
+        Raises ValueError for unknown ``fields``/``sort_by`` columns."""
+        cache_key = f"plant_page|{equipment_type}|{country}|{region}|{company_name}|{limit}|{offset}|{sort_by}|{fields}"
+        df, total = _QUERY_CACHE.get_or_compute(
+            cache_key,
+            lambda: self._query_plant_page(equipment_type, country, region, company_name, limit, offset, sort_by, fields),
+        )
+        return df.copy(), total
+
+    def _query_plant_page(self, equipment_type, country, region, company_name, limit, offset, sort_by, fields):
+        query, params, has_crm, selection_scope = self._detailed_plant_query(
+            equipment_type, country, region, company_name
+        )
+        page = self._query_page(query, params, limit, offset, sort_by, fields, columns=self.PLANT_COLUMNS)
+        if page[1] == 0 and selection_scope['selection_type'] != 'all' and has_crm and selection_scope.get('company_names'):
+            # Same CRM-only fallback as get_detailed_plant_data for companies without plants
+            crm_query, crm_params = self._crm_only_plant_query(selection_scope)
+            page = self._query_page(crm_query, crm_params, limit, offset, sort_by, fields, columns=self.PLANT_COLUMNS)
+        return page
+
+    def _query_detailed_plant_data(self, equipment_type: str, country: str, region: str, company_name: str) -> pd.DataFrame:
+        """Uncached body of get_detailed_plant_data; raises on query errors so failures are not cached."""
+        query, params, has_crm, selection_scope = self._detailed_plant_query(
+            equipment_type, country, region, company_name
+        )
+        df = self.execute_df(query, params)
+        self.add_log(f"Query returned {len(df)} records.")
+
+        # ── CRM-only fallback ────────────────────────────────────────────
+        # If a specific company was requested but no BCG plant records exist for it,
+        # synthesise rows from crm_data so the Overview / Inventory still shows data.
+        if df.empty and selection_scope['selection_type'] != 'all' and has_crm:
+            try:
+                if selection_scope.get('company_names'):
+                    df = self.execute_df(*self._crm_only_plant_query(selection_scope))
+                    if not df.empty:
+                        self.add_log(
+                            f"CRM-only fallback: {len(df)} records returned for "
+                            f"{selection_scope.get('display_name', 'company')} "
+                            f"(no BCG plant data found)."
                         )
-                        df = df[mask]
-                        self.add_log(f"Filtered to {len(df)} records for region: {region}")
-                elif region == "Not assigned":
-                     if 'Region' in df.columns:
-                        df = df[df['Region'].isna() | (df['Region'].fillna("").astype(str).str.strip() == "")]
-                        self.add_log(f"Filtered to {len(df)} records for unassigned region")
-
-            # ── CRM-only fallback ────────────────────────────────────────────
-            # If a specific company was requested but no BCG plant records exist for it,
-            # synthesise rows from crm_data so the Overview / Inventory still shows data.
-            if df.empty and selection_scope['selection_type'] != 'all' and has_crm:
-                try:
-                    target_company_list = selection_scope.get('company_names', [])
-                    if target_company_list:
-                        crm_placeholders = ', '.join(['?'] * len(target_company_list))
-                        crm_fallback_query = f"""
-                            SELECT
-                                name,
-                                name      AS crm_name,
-                                name      AS company_internal,
-                                CAST(NULL AS VARCHAR)   AS equipment_type,
-                                country,
-                                country   AS country_internal,
-                                region    AS "Region",
-                                CAST(NULL AS VARCHAR)   AS site_name,
-                                CAST(NULL AS VARCHAR)   AS site_city,
-                                CAST(NULL AS VARCHAR)   AS city_internal,
-                                CAST(NULL AS VARCHAR)   AS "City",
-                                CAST(NULL AS DOUBLE)    AS capacity,
-                                CAST(NULL AS DOUBLE)    AS capacity_internal,
-                                CAST(NULL AS DOUBLE)    AS "Nominal Capacity",
-                                CAST(NULL AS VARCHAR)   AS status_internal,
-                                CAST(NULL AS VARCHAR)   AS "Status of the Plant",
-                                CAST(100.0 AS DOUBLE)   AS "Matching Quality %",
-                                TRY_CAST(latitude  AS DOUBLE) AS map_latitude,
-                                TRY_CAST(longitude AS DOUBLE) AS map_longitude,
-                                TRY_CAST(latitude  AS DOUBLE) AS latitude,
-                                TRY_CAST(longitude AS DOUBLE) AS longitude,
-                                company_ceo             AS CEO,
-                                fte_count               AS "Number of Full time employees",
-                                CAST(NULL AS VARCHAR)   AS manufacturer,
-                                CAST(NULL AS VARCHAR)   AS oem,
-                                CAST(NULL AS DOUBLE)    AS start_year_internal,
-                                CAST(NULL AS DOUBLE)    AS start_year,
-                                CAST(NULL AS DOUBLE)    AS year
-                            FROM crm_data
-                            WHERE name IN ({crm_placeholders})
-                        """
-                        df = self.execute_df(crm_fallback_query, target_company_list)
-                        if not df.empty:
-                            self.add_log(
-                                f"CRM-only fallback: {len(df)} records returned for "
-                                f"{selection_scope.get('display_name', 'company')} "
-                                f"(no BCG plant data found)."
-                            )
-                except Exception as _crm_err:
-                    self.add_log(f"CRM fallback error in get_detailed_plant_data: {_crm_err}")
-
-            # Keep only the columns required by the dashboard and profile flows.
-            preferred_columns = [
-                "name",
-                "crm_name",
-                "company_internal",
-                "equipment_type",
-                "country",
-                "country_internal",
-                "Region",
-                "site_name",
-                "site_city",
-                "city_internal",
-                "City",
-                "capacity",
-                "capacity_internal",
-                "Nominal Capacity",
-                "status_internal",
-                "Status of the Plant",
-                "Matching Quality %",
-                "map_latitude",
-                "map_longitude",
-                "latitude",
-                "longitude",
-                "CEO",
-                "Number of Full time employees",
-                "manufacturer",
-                "oem",
-                "start_year_internal",
-                "start_year",
-                "year",
-            ]
-            existing_columns = [column for column in preferred_columns if column in df.columns]
-            if existing_columns:
-                df = df.loc[:, existing_columns].copy()
+            except Exception as _crm_err:
+                self.add_log(f"CRM fallback error in get_detailed_plant_data: {_crm_err}")
 
-            _cache_set(cache_key, df.copy())
-            return df
-        except Exception as e:
-            self.add_log(f"Error fetching plant data: {e}")
-            import traceback
-            self.add_log(traceback.format_exc())
-            return pd.DataFrame()
+        # Keep only the columns required by the dashboard and profile flows.
+        existing_columns = [column for column in self.PLANT_COLUMNS if column in df.columns]
+        if existing_columns:
+            df = df.loc[:, existing_columns].copy()
+
+        return df
 
     def get_all_countries(self):
         """Get all country names from BCG data"""
-        cached = _cache_get('all_countries')
-        if cached is not None:
-            return cached
         conn = self.get_conn()
         if not conn:
             return []
         try:
-            result = self.execute_df(
-                "SELECT DISTINCT country_internal FROM bcg_installed_base WHERE country_internal IS NOT NULL ORDER BY 1"
-            )['country_internal'].tolist()
-            _cache_set('all_countries', result)
-            return result
+            return _QUERY_CACHE.get_or_compute(
+                'all_countries',
+                lambda: self.execute_df(
+                    "SELECT DISTINCT country_internal FROM bcg_installed_base WHERE country_internal IS NOT NULL ORDER BY 1"
+                )['country_internal'].tolist(),
+            )
         except:
             return []
 
     def get_all_company_names(self, region: str = "All", country: str = "All", equipment_type: str = "All") -> List[str]:
         """Get all company names from unified view, optionally filtered"""
         cache_key = f"company_names|{region}|{country}|{equipment_type}"
-        cached = _cache_get(cache_key)
-        if cached is not None:
-            return cached
-        
         conn = self.get_conn()
         if not conn:
             return []
         
         try:
-            tables = self.execute_df("SHOW TABLES")['name'].tolist()
-            if 'unified_companies' not in tables:
-                if 'crm_data' not in tables:
-                    return []
-                table_name = 'crm_data'
-            else:
-                table_name = 'unified_companies'
-            
-            query = f"SELECT DISTINCT name FROM {table_name} WHERE name IS NOT NULL AND name != ''"
-            params = []
-            
-            # Filter by region
-            if region != "All" and region in self.REGION_MAPPING:
-                region_values = [r.lower() for r in self.REGION_MAPPING[region]]
-                filter_str = " OR ".join(["LOWER(region) LIKE ?"] * len(region_values))
-                query += f" AND ({filter_str})"
-                for r in region_values:
-                    params.append(f"%{r}%")
-            
-            # Filter by country
-            if country != "All":
-                query += " AND (LOWER(country) = ? OR list_contains(bcg_locations, ?))"
-                params.append(country.lower())
-                params.append(country.title())
-            
-            # Filter by equipment (only if unified_companies exists with array columns)
-            if equipment_type != "All" and table_name == 'unified_companies':
-                internal_name = self.EQUIPMENT_MAP.get(equipment_type, equipment_type)
-                query += " AND list_contains(equipment_list, ?)"
-                params.append(internal_name)
-            
-            query += " ORDER BY name"
-            
-            if params:
-                result = self.execute_df(query, params)['name'].tolist()
-            else:
-                result = self.execute_df(query)['name'].tolist()
-            
-            _cache_set(cache_key, result)
-            return result
+            return _QUERY_CACHE.get_or_compute(
+                cache_key,
+                lambda: self._query_company_names(region, country, equipment_type),
+            )
         except Exception as e:
             self.add_log(f"Error getting company names: {e}")
             return []
 
+    def _company_names_query(self, region: str, country: str, equipment_type: str):
+        """Filtered DISTINCT company-name SQL without ORDER BY; returns (query, params) or (None, [])."""
+        tables = self.execute_df("SHOW TABLES")['name'].tolist()
+        if 'unified_companies' not in tables:
+            if 'crm_data' not in tables:
+                return None, []
+            table_name = 'crm_data'
+        else:
+            table_name = 'unified_companies'
+        
+        query = f"SELECT DISTINCT name FROM {table_name} WHERE name IS NOT NULL AND name != ''"
+        params = []
+        
+        # Filter by region
+        query += self._region_filter_sql('region', region, params)
+
+        # Filter by country
+        if country != "All":
+            query += " AND (LOWER(country) = ? OR list_contains(bcg_locations, ?))"
+            params.append(country.lower())
+            params.append(country.title())
+        
+        # Filter by equipment (only if unified_companies exists with array columns)
+        if equipment_type != "All" and table_name == 'unified_companies':
+            internal_name = self.EQUIPMENT_MAP.get(equipment_type, equipment_type)
+            query += " AND list_contains(equipment_list, ?)"
+            params.append(internal_name)
+        return query, params
+
+    def _query_company_names(self, region: str, country: str, equipment_type: str) -> List[str]:
+        query, params = self._company_names_query(region, country, equipment_type)
+        if query is None:
+            return []
+        query += " ORDER BY name"
+
+        if params:
+            result = self.execute_df(query, params)['name'].tolist()
+        else:
+            result = self.execute_df(query)['name'].tolist()
+
+        return result
+
     def load_bcg_data(self, filename: str = "bcg_data.xlsx") -> pd.DataFrame:
         """Load BCG market data"""
+        if self.conn and self._replace_table_from_sheet("bcg_data", filename):
+            self.add_log("BCG market data loaded")
+            return self.execute_df("SELECT * FROM bcg_data")
+
         df = self.load_excel_file(filename)
         
         if self.conn:
-            self.conn.execute("DROP TABLE IF EXISTS bcg_data")
-            self.conn.execute("CREATE TABLE bcg_data AS SELECT * FROM df")
+            self.replace_table("bcg_data", df, source=self._source_signature(filename))
             self.add_log("BCG market data loaded")
         
         return df
     
     def load_installed_base(self, filename: str = "installed_base.xlsx") -> pd.DataFrame:
         """Load installed base equipment data"""
+        if self.conn and self._replace_table_from_sheet("installed_base", filename):
+            self.add_log("Installed base data loaded")
+            return self.execute_df("SELECT * FROM installed_base")
+
         df = self.load_excel_file(filename)
         
         if self.conn:
-            self.conn.execute("DROP TABLE IF EXISTS installed_base")
-            self.conn.execute("CREATE TABLE installed_base AS SELECT * FROM df")
+            self.replace_table("installed_base", df, source=self._source_signature(filename))
             self.add_log("Installed base data loaded")
         
         return df
+
+    def _replace_table_from_sheet(self, table_name: str, filename: str, sheet_name: Optional[str] = None) -> bool:
+        """(Re)create a table straight from the cached Parquet copy of a sheet.
+
+        Applies the same column cleaning as load_excel_file inside DuckDB.
+        Returns False when the sheet has no Parquet copy (CSV, unconvertible sheet).
+        """
+        filepath = self.data_dir / filename
+        if not filepath.exists():
+            raise FileNotFoundError(f"File not found: {filepath}")
+        if filepath.suffix == '.csv':
+            return False
+        parquet = self.ingest_cache.parquet_path(filepath, sheet_name)
+        if parquet is None:
+            return False
+
+        source = "read_parquet('" + str(parquet).replace("'", "''") + "')"
+        with self.write_connection() as conn:
+            columns = [row[0] for row in conn.execute(f"DESCRIBE SELECT * FROM {source}").fetchall()]
+            keep = [c for c in columns if c.strip() and not c.startswith('Unnamed')]
+            select = ", ".join('"' + c.replace('"', '""') + '"' for c in keep)
+            conn.execute(f"CREATE OR REPLACE TABLE {table_name} AS SELECT {select} FROM {source}")
+            rows = conn.execute(f"SELECT COUNT(*) FROM {table_name}").fetchone()[0]
+            self._record_table_fingerprint(conn, table_name, self._source_signature(filename, sheet_name))
+        self.add_log(f"Loaded {filename} (sheet: {sheet_name or 'first'}) from Parquet cache: {rows} rows, {len(keep)} columns")
+        return True
     
+    def replace_table(self, table_name: str, df, source: Optional[str] = None):
+        """Atomically (re)create a table from a DataFrame or Arrow table on the exclusive write path.
+
+        Also records the table's content fingerprint (see get_table_fingerprint).
+        """
+        view_name = f"_{table_name}_df"
+        with self.write_connection() as conn:
+            conn.register(view_name, df)
+            try:
+                conn.execute(f"CREATE OR REPLACE TABLE {table_name} AS SELECT * FROM {view_name}")
+            finally:
+                try:
+                    conn.unregister(view_name)
+                except Exception:
+                    pass
+            self._record_table_fingerprint(conn, table_name, source)
+
+    # ── Per-table fingerprints ────────────────────────────────────────────────
+    # Stored in _meta under "table_fingerprint:<table>" whenever a table is
+    # (re)written, so downstream caches (unified view, ML features, external
+    # feature snapshots) can each tell whether *their* inputs changed.
+
+    def _source_signature(self, filename: str, sheet_name: Optional[str] = None) -> str:
+        """Streaming content hash of the source file (and sheet) a table was loaded from."""
+        digest = file_sha256(self.data_dir / filename)[:16]
+        return f"{filename}[{sheet_name}]@{digest}" if sheet_name else f"{filename}@{digest}"
+
+    @staticmethod
+    def _table_digest(conn, table_name: str) -> str:
+        """Order-independent content digest: row count plus the sum of per-row hashes."""
+        rows, digest = conn.execute(f"SELECT COUNT(*), SUM(hash(t)) FROM {table_name} t").fetchone()
+        return f"rows={rows};digest={digest or 0}"
+
+    def _record_table_fingerprint(self, conn, table_name: str, source: Optional[str] = None):
+        value = self._table_digest(conn, table_name)
+        if source:
+            value += f";source={source}"
+        self._set_meta(conn, f"table_fingerprint:{table_name}", value)
+        if table_name in self.REGION_SOURCE_COLUMNS:
+            self._refresh_region_keys(conn)
+        if table_name in self.COMPANY_NAME_SOURCES:
+            self._refresh_company_name_keys(conn)
+
+    @staticmethod
+    def _set_meta(conn, key: str, value: str):
+        conn.execute("CREATE TABLE IF NOT EXISTS _meta (key VARCHAR PRIMARY KEY, value VARCHAR)")
+        conn.execute("""
+            INSERT INTO _meta (key, value) VALUES (?, ?)
+            ON CONFLICT (key) DO UPDATE SET value = excluded.value
+        """, (key, value))
+
+    def get_meta(self, key: str) -> str:
+        """Read a value from the _meta table; '' if the key or table is missing."""
+        try:
+            row = self.execute("SELECT value FROM _meta WHERE key = ?", [key]).fetchone()
+            return row[0] if row else ''
+        except Exception:
+            return ''
+
+    def set_meta(self, key: str, value: str):
+        with self.write_connection() as conn:
+            self._set_meta(conn, key, value)
+
+    def get_table_fingerprint(self, table_name: str) -> str:
+        """Content fingerprint recorded when *table_name* was last written ('' if unknown)."""
+        return self.get_meta(f"table_fingerprint:{table_name}")
+
+    def get_table_fingerprints(self, table_names: List[str]) -> Dict[str, str]:
+        return {name: self.get_table_fingerprint(name) for name in table_names}
+
     def _ensure_schema(self):
-        """Ensure company_mappings table + match_score column exist (run once per session)"""
-        self.conn.execute("""
-            CREATE TABLE IF NOT EXISTS company_mappings (
+        """Ensure company_mappings (+ match_score column) and match_cache exist (run once per session)"""
+        with self.write_connection() as conn:
+            self._ensure_match_cache_table(conn)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS company_mappings (
+                    crm_name VARCHAR,
+                    bcg_name VARCHAR,
+                    match_score DOUBLE,
+                    UNIQUE(crm_name, bcg_name)
+                )
+            """)
+            try:
+                cols = conn.execute("PRAGMA table_info('company_mappings')").df()['name'].tolist()
+                if 'match_score' not in cols:
+                    conn.execute("ALTER TABLE company_mappings ADD COLUMN match_score DOUBLE")
+            except:
+                pass
+
+    # Best CRM match per BCG name: highest match_score, ties broken by crm_name
+    _MAPPING_BEST_SELECT = """
+        SELECT bcg_name, crm_name, match_score
+        FROM (
+            SELECT
+                bcg_name,
+                crm_name,
+                match_score,
+                ROW_NUMBER() OVER (
+                    PARTITION BY bcg_name
+                    ORDER BY match_score DESC NULLS LAST, crm_name
+                ) AS rn
+            FROM company_mappings
+            WHERE bcg_name IS NOT NULL
+        ) ranked
+        WHERE rn = 1
+    """
+
+    def _refresh_mapping_best(self, conn):
+        """Materialise company_mapping_best; call after every company_mappings write."""
+        conn.execute("""
+            CREATE OR REPLACE TABLE company_mapping_best (
+                bcg_name VARCHAR PRIMARY KEY,
+                crm_name VARCHAR,
+                match_score DOUBLE
+            )
+        """)
+        conn.execute(f"INSERT INTO company_mapping_best {self._MAPPING_BEST_SELECT}")
+
+    def _mapping_best_relation(self) -> str:
+        """company_mapping_best, or the equivalent window query if it cannot be materialised."""
+        if self._ensure_derived_table('company_mapping_best', self._refresh_mapping_best):
+            return 'company_mapping_best'
+        return f"({self._MAPPING_BEST_SELECT})"
+
+    def replace_company_mappings(self, mappings: List[tuple]):
+        """Make each (crm_name, bcg_name, match_score) the only mapping of its BCG name,
+        replacing earlier matches, and refresh company_mapping_best in the same transaction."""
+        if not mappings:
+            return
+        with self.write_connection() as conn:
+            conn.begin()
+            try:
+                conn.executemany(
+                    "DELETE FROM company_mappings WHERE bcg_name = ? AND crm_name IS DISTINCT FROM ?",
+                    [(bcg_name, crm_name) for crm_name, bcg_name, _ in mappings],
+                )
+                conn.executemany("""
+                    INSERT INTO company_mappings (crm_name, bcg_name, match_score) VALUES (?, ?, ?)
+                    ON CONFLICT (crm_name, bcg_name) DO UPDATE SET match_score = excluded.match_score
+                """, mappings)
+                self._refresh_mapping_best(conn)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+
+    # ── Persistent match cache ────────────────────────────────────────────────
+    # find_best_match results beyond the exact/normalised tiers, keyed by
+    # (bcg_norm, crm_set_version) so fuzzy scans and LLM calls run once per BCG
+    # name and CRM name set rather than on every matching run.
+
+    @staticmethod
+    def _ensure_match_cache_table(conn):
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS match_cache (
+                bcg_norm VARCHAR,
+                crm_set_version VARCHAR,
                 crm_name VARCHAR,
-                bcg_name VARCHAR,
-                match_score DOUBLE,
-                UNIQUE(crm_name, bcg_name)
+                score DOUBLE,
+                tier VARCHAR,
+                expires_at TIMESTAMP,
+                PRIMARY KEY (bcg_norm, crm_set_version)
             )
         """)
+
+    def load_match_cache(self, crm_names: List[str]) -> MatchCache:
+        """Unexpired cached matches for this CRM name set (empty if none are stored)."""
+        cache = MatchCache(crm_set_version(crm_names))
         try:
-            cols = self.conn.execute("PRAGMA table_info('company_mappings')").df()['name'].tolist()
-            if 'match_score' not in cols:
-                self.conn.execute("ALTER TABLE company_mappings ADD COLUMN match_score DOUBLE")
-        except:
-            pass
+            # Read on the parent connection like the writes, so no thread cursor holds a
+            # transaction on the staged version when it is checkpointed for publishing.
+            with self.write_connection() as conn:
+                self._ensure_match_cache_table(conn)
+                rows = conn.execute(
+                    """
+                    SELECT bcg_norm, crm_name, score, tier FROM match_cache
+                    WHERE crm_set_version = ? AND expires_at > current_localtimestamp()
+                    """,
+                    [cache.version],
+                ).fetchall()
+            cache.entries = {key: (crm_name, score, tier) for key, crm_name, score, tier in rows}
+        except Exception as e:
+            self.add_log(f"Could not read match cache: {e}")
+        return cache
+
+    def save_match_cache(self, cache: MatchCache):
+        """Persist entries added to ``cache`` since it was loaded and drop expired ones."""
+        if not cache.pending:
+            return
+        now = pd.Timestamp.now()
+        positive = now + pd.Timedelta(days=settings.MATCH_CACHE_TTL_DAYS)
+        negative = now + pd.Timedelta(days=settings.MATCH_CACHE_NEGATIVE_TTL_DAYS)
+        rows = pd.DataFrame(
+            [
+                (key, cache.version, crm_name, score, tier,
+                 negative if crm_name is None or tier == MatchCache.NEGATIVE_TIER else positive)
+                for key, (crm_name, score, tier) in cache.pending.items()
+            ],
+            columns=['bcg_norm', 'crm_set_version', 'crm_name', 'score', 'tier', 'expires_at'],
+        )
+        try:
+            with self.write_connection() as conn:
+                self._ensure_match_cache_table(conn)
+                conn.register("_match_cache_rows", rows)
+                try:
+                    conn.execute("INSERT OR REPLACE INTO match_cache SELECT * FROM _match_cache_rows")
+                finally:
+                    conn.unregister("_match_cache_rows")
+                conn.execute("DELETE FROM match_cache WHERE expires_at <= current_localtimestamp()")
+        except Exception as e:
+            self.add_log(f"Could not store match cache: {e}")
+            return
+        cache.pending.clear()
 
     def _compute_data_fingerprint(self) -> str:
-        """Compute a lightweight fingerprint of source table row counts + timestamps.
+        """Fingerprint of the unified view's inputs from the per-table content digests.
         If this value is unchanged, create_unified_view can be skipped."""
         parts = []
         for tbl in ('crm_data', 'bcg_installed_base'):
-            try:
-                cnt = self.conn.execute(f"SELECT COUNT(*) FROM {tbl}").fetchone()[0]
-                parts.append(f"{tbl}:{cnt}")
-            except:
-                parts.append(f"{tbl}:0")
-        # Also include modification times of source files
-        for f in sorted(self.data_dir.glob('*.xlsx')):
-            parts.append(f"{f.name}:{int(f.stat().st_mtime)}")
+            fp = self.get_table_fingerprint(tbl)
+            if not fp:
+                # Table written before fingerprints were recorded: digest it now.
+                try:
+                    fp = self._table_digest(self.conn, tbl)
+                except Exception:
+                    fp = "missing"
+            parts.append(f"{tbl}:{fp}")
         return hashlib.md5('|'.join(parts).encode()).hexdigest()
 
     def _get_stored_fingerprint(self) -> str:
         """Read fingerprint stored in DB; returns '' if not set"""
-        try:
-            self.conn.execute("""
-                CREATE TABLE IF NOT EXISTS _meta (
-                    key VARCHAR PRIMARY KEY,
-                    value VARCHAR
-                )
-            """)
-            row = self.conn.execute(
-                "SELECT value FROM _meta WHERE key = 'data_fingerprint'"
-            ).fetchone()
-            return row[0] if row else ''
-        except:
-            return ''
+        return self.get_meta('data_fingerprint')
 
     def _store_fingerprint(self, fp: str):
-        self.conn.execute("""
-            CREATE TABLE IF NOT EXISTS _meta (key VARCHAR PRIMARY KEY, value VARCHAR)
-        """)
-        self.conn.execute("""
-            INSERT INTO _meta (key, value) VALUES ('data_fingerprint', ?)
-            ON CONFLICT (key) DO UPDATE SET value = excluded.value
-        """, (fp,))
+        self._set_meta(self.conn, 'data_fingerprint', fp)
 
     def create_unified_view(self):
         """
         Create a unified view of companies from CRM and BCG datasets.
         Uses the mapping service to link entities with different names.
         Skips the expensive DROP+CREATE if source data hasn't changed.
+        Runs on the exclusive write path so concurrent readers never race the rebuild.
         """
         if not self.conn:
             self.initialize_database()
-        
+        with self._write_lock:
+            self._create_unified_view_locked()
+
+    def _create_unified_view_locked(self):
         # ---------------------------------------------------------------
         # Fast path: skip if data fingerprint unchanged and unified_companies exists
         # ---------------------------------------------------------------
@@ -1076,6 +1724,11 @@ class DataIngestionService:
         
         self.add_log(f"  {len(bcg_companies)} BCG companies | {len(already_mapped)} already matched | {len(new_bcg)} to process")
         
+        # Build the CRM lookup/blocking index once for the whole run
+        match_index = mapping_service.build_index(crm_names) if new_bcg else None
+        match_cache = self.load_match_cache(crm_names) if new_bcg else None
+        
+        fuzzy_names = []
         for bcg_name in new_bcg:
             bcg_name_str = str(bcg_name)
             bcg_name_lower = bcg_name_str.lower()
@@ -1085,26 +1738,46 @@ class DataIngestionService:
                 crm_name = crm_names_map[bcg_name_lower]
                 mappings_to_insert.append((crm_name, bcg_name_str, 100.0))
                 continue
+            fuzzy_names.append(bcg_name_str)
 
-            # 2. Fuzzy match + optional LLM verification
-            match = mapping_service.find_best_match(bcg_name_str, crm_names)
+        # 2. Fuzzy match + optional LLM verification (ambiguous names go to the LLM in batches)
+        matches = mapping_service.match_many(fuzzy_names, crm_names, index=match_index, cache=match_cache) if fuzzy_names else {}
+        for bcg_name_str in fuzzy_names:
+            match = matches.get(bcg_name_str)
             if match:
                 crm_name, score = match
                 mappings_to_insert.append((crm_name, bcg_name_str, float(score)))
                 self.add_log(f"Mapped: '{bcg_name_str}' -> '{crm_name}' (score: {score})")
         
+        if match_cache is not None:
+            self.add_log(f"  Match cache: {match_cache.hits} hits, {match_cache.misses} misses")
+            self.save_match_cache(match_cache)
+        
         if mappings_to_insert:
             self.conn.executemany(
                 "INSERT OR IGNORE INTO company_mappings (crm_name, bcg_name, match_score) VALUES (?, ?, ?)", mappings_to_insert
             )
-            
-        self.conn.execute("DROP TABLE IF EXISTS unified_companies")
+        self._refresh_mapping_best(self.conn)
+
+        self._sync_unified_companies()
         
-        # Calculate current year for age calculations
-        current_year = pd.Timestamp.now().year
+        # Store fingerprint so next load can skip this work
+        self._store_fingerprint(current_fp)
         
-        self.conn.execute(f"""
-            CREATE TABLE unified_companies AS
+        # Invalidate module-level query cache
+        _cache_clear()
+        self.add_log("Unified view created successfully")
+
+    def _unified_companies_sql(self, current_year: int, scoped: bool = False) -> List[str]:
+        """SELECT for CRM-backed rows and INSERT for BCG-only rows of unified_companies.
+
+        With scoped=True both statements only cover join names listed in _uc_affected.
+        """
+        affected = "(SELECT name FROM _uc_affected)"
+        agg_scope = f"WHERE COALESCE(m.crm_name, b.company_internal) IN {affected}" if scoped else ""
+        crm_scope = f"WHERE c.name IN {affected}" if scoped else ""
+        bcg_scope = f"AND company_internal IN {affected}" if scoped else ""
+        crm_select = f"""
             WITH bcg_agg AS (
                 SELECT 
                     COALESCE(m.crm_name, b.company_internal) as join_name,
@@ -1123,6 +1796,7 @@ class DataIngestionService:
                     AVG(longitude_internal) as avg_lon
                 FROM bcg_installed_base b
                 LEFT JOIN company_mappings m ON b.company_internal = m.bcg_name
+                {agg_scope}
                 GROUP BY 1
             )
             SELECT 
@@ -1150,10 +1824,9 @@ class DataIngestionService:
                 CAST(c.fte_count AS DOUBLE) as fte_count
             FROM crm_data c
             LEFT JOIN bcg_agg b ON c.name = b.join_name
-        """)
-        
-        # Add companies that are ONLY in BCG and not in CRM
-        self.conn.execute(f"""
+            {crm_scope}
+        """
+        bcg_only_insert = f"""
             INSERT INTO unified_companies (
                 name, crm_name, bcg_name, industry, country, region, "Matching Quality %", 
                 total_capacity, equip_count, equip_types, equipment_list, bcg_locations, 
@@ -1182,8 +1855,19 @@ class DataIngestionService:
                 NULL, NULL -- fte, revenue
             FROM bcg_installed_base
             WHERE company_internal NOT IN (SELECT bcg_name FROM company_mappings)
+            {bcg_scope}
             GROUP BY 1
-        """)
+        """
+        return [crm_select, bcg_only_insert]
+
+    def _rebuild_unified_full(self, current_year: int):
+        """Drop and recreate unified_companies from all CRM/BCG rows."""
+        crm_select, bcg_only_insert = self._unified_companies_sql(current_year)
+        self.conn.execute("DROP TABLE IF EXISTS unified_companies")
+        self.conn.execute(f"CREATE TABLE unified_companies AS {crm_select}")
+        
+        # Add companies that are ONLY in BCG and not in CRM
+        self.conn.execute(bcg_only_insert)
         
         # Add DuckDB indexes for fast filter queries
         for idx_sql in [
@@ -1198,99 +1882,383 @@ class DataIngestionService:
                 self.conn.execute(idx_sql)
             except:
                 pass
-        
-        # Store fingerprint so next load can skip this work
-        self._store_fingerprint(current_fp)
-        
-        # Invalidate module-level query cache
-        _cache_clear()
-        self.add_log("Unified view created successfully")
+        self.add_log("Unified view rebuilt from scratch")
+
+    # Snapshot tables recording the inputs unified_companies was last built from
+    _UC_STATE_TABLES = ('_uc_state_crm', '_uc_state_bcg', '_uc_state_mappings')
+    # Above this share of changed join names a full rebuild is cheaper than upserts
+    UNIFIED_INCREMENTAL_MAX_SHARE = 0.25
+
+    def _snapshot_unified_sources(self, current_year: int):
+        """Record per-name row digests and the mapping set the current build used."""
+        self.conn.execute("""
+            CREATE OR REPLACE TABLE _uc_state_crm AS
+            SELECT name, COUNT(*) AS row_count, SUM(hash(c)) AS digest FROM crm_data c GROUP BY name
+        """)
+        self.conn.execute("""
+            CREATE OR REPLACE TABLE _uc_state_bcg AS
+            SELECT company_internal, COUNT(*) AS row_count, SUM(hash(b)) AS digest FROM bcg_installed_base b GROUP BY company_internal
+        """)
+        self.conn.execute("""
+            CREATE OR REPLACE TABLE _uc_state_mappings AS
+            SELECT crm_name, bcg_name, match_score FROM company_mappings
+        """)
+        self._set_meta(self.conn, 'unified_year', str(current_year))
 
-    def enrich_geo_coordinates(self, limit: int = 20):
-        """Find missing latitude and longitude for companies"""
+    def _refresh_unified_incremental(self, current_year: int) -> bool:
+        """Recompute only the unified_companies rows whose join name changed since the last build.
+
+        A join name is affected when its CRM rows, the BCG rows aggregated under it,
+        or any company_mappings row touching it differ from the recorded snapshot.
+        Returns False (caller falls back to a full rebuild) when there is no usable
+        snapshot, the age reference year changed, or too many names changed.
+        """
+        tables = set(self.conn.execute("SHOW TABLES").df()['name'].tolist())
+        if 'unified_companies' not in tables or not set(self._UC_STATE_TABLES) <= tables:
+            return False
+        row = self.conn.execute("SELECT value FROM _meta WHERE key = 'unified_year'").fetchone()
+        if not row or row[0] != str(current_year):
+            return False
+
+        try:
+            self.conn.execute("""
+                CREATE OR REPLACE TEMP TABLE _uc_affected AS
+                WITH crm_now AS (
+                    SELECT name, COUNT(*) AS row_count, SUM(hash(c)) AS digest FROM crm_data c GROUP BY name
+                ),
+                bcg_now AS (
+                    SELECT company_internal, COUNT(*) AS row_count, SUM(hash(b)) AS digest FROM bcg_installed_base b GROUP BY company_internal
+                ),
+                changed_crm AS (
+                    SELECT COALESCE(n.name, o.name) AS name
+                    FROM crm_now n FULL OUTER JOIN _uc_state_crm o ON n.name IS NOT DISTINCT FROM o.name
+                    WHERE n.row_count IS DISTINCT FROM o.row_count OR n.digest IS DISTINCT FROM o.digest
+                ),
+                changed_bcg AS (
+                    SELECT COALESCE(n.company_internal, o.company_internal) AS name
+                    FROM bcg_now n FULL OUTER JOIN _uc_state_bcg o ON n.company_internal IS NOT DISTINCT FROM o.company_internal
+                    WHERE n.row_count IS DISTINCT FROM o.row_count OR n.digest IS DISTINCT FROM o.digest
+                ),
+                changed_mappings AS (
+                    (SELECT crm_name, bcg_name, match_score FROM company_mappings
+                     EXCEPT SELECT crm_name, bcg_name, match_score FROM _uc_state_mappings)
+                    UNION ALL
+                    (SELECT crm_name, bcg_name, match_score FROM _uc_state_mappings
+                     EXCEPT SELECT crm_name, bcg_name, match_score FROM company_mappings)
+                ),
+                all_mappings AS (
+                    SELECT crm_name, bcg_name FROM company_mappings
+                    UNION SELECT crm_name, bcg_name FROM _uc_state_mappings
+                )
+                SELECT DISTINCT CAST(name AS VARCHAR) AS name FROM (
+                    SELECT name FROM changed_crm
+                    UNION ALL SELECT name FROM changed_bcg
+                    UNION ALL SELECT crm_name FROM changed_mappings
+                    UNION ALL SELECT bcg_name FROM changed_mappings
+                    UNION ALL SELECT m.crm_name FROM all_mappings m JOIN changed_bcg b ON m.bcg_name = b.name
+                )
+            """)
+            affected, has_null = self.conn.execute(
+                "SELECT COUNT(*), COUNT(*) FILTER (WHERE name IS NULL) > 0 FROM _uc_affected"
+            ).fetchone()
+            if has_null:
+                return False
+            if affected == 0:
+                self.add_log("Unified view already up to date (no changed companies)")
+                return True
+            total = self.conn.execute("SELECT COUNT(*) FROM unified_companies").fetchone()[0]
+            if affected > max(1, total) * self.UNIFIED_INCREMENTAL_MAX_SHARE:
+                self.add_log(f"  {affected} changed companies — full rebuild is cheaper than incremental")
+                return False
+
+            crm_select, bcg_only_insert = self._unified_companies_sql(current_year, scoped=True)
+            self.conn.begin()
+            try:
+                self.conn.execute("""
+                    DELETE FROM unified_companies
+                    WHERE crm_name IN (SELECT name FROM _uc_affected)
+                       OR (crm_name IS NULL AND bcg_name IN (SELECT name FROM _uc_affected))
+                """)
+                self.conn.execute(f"INSERT INTO unified_companies BY NAME {crm_select}")
+                self.conn.execute(bcg_only_insert)
+                self.conn.commit()
+            except Exception:
+                self.conn.rollback()
+                raise
+            self.add_log(f"Unified view updated incrementally ({affected} changed companies)")
+            return True
+        except Exception as e:
+            self.add_log(f"Incremental unified view update failed ({e}); rebuilding from scratch")
+            return False
+        finally:
+            try:
+                self.conn.execute("DROP TABLE IF EXISTS _uc_affected")
+            except Exception:
+                pass
+
+    def refresh_unified_view(self):
+        """Bring unified_companies in line with the current CRM/BCG tables and mappings.
+
+        Unlike create_unified_view this does not run name matching; use it after
+        writing company_mappings directly (e.g. /api/data/rematch-poor).
+        """
         if not self.conn:
             self.initialize_database()
-            
-        self.add_log(f"Searching for missing geographical coordinates (limit: {limit})...")
-        
+        with self._write_lock:
+            self._sync_unified_companies()
+            _cache_clear()
+
+    def _sync_unified_companies(self):
+        """Incrementally update unified_companies, falling back to a full rebuild."""
+        # Calculate current year for age calculations
+        current_year = pd.Timestamp.now().year
+        if not self._refresh_unified_incremental(current_year):
+            self._rebuild_unified_full(current_year)
+        self._apply_company_enrichment(self.conn)
+        self._snapshot_unified_sources(current_year)
+        self._record_table_fingerprint(self.conn, 'unified_companies')
+
+    # ── Enrichment queue ──────────────────────────────────────────────────────
+    # Companies missing coordinates ("geo") or CEO/FTE ("company") are queued in
+    # enrichment_queue and resolved in batches. Results are kept in company_enrichment,
+    # which outlives unified_companies rebuilds and is re-applied after each one, so a
+    # company is never looked up twice.
+
+    # kind -> unified_companies rows that still need it
+    ENRICHMENT_KINDS = {
+        'geo': "map_latitude IS NULL OR map_longitude IS NULL",
+        'company': "company_ceo IS NULL OR company_ceo = 'N/A' OR fte_count IS NULL OR fte_count = 0",
+    }
+    _enrichment_locks = {kind: threading.Lock() for kind in ENRICHMENT_KINDS}
+
+    @staticmethod
+    def _ensure_enrichment_tables(conn):
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS enrichment_queue (
+                name VARCHAR,
+                kind VARCHAR,
+                status VARCHAR DEFAULT 'pending',
+                attempts INTEGER DEFAULT 0,
+                enqueued_at TIMESTAMP DEFAULT current_timestamp,
+                updated_at TIMESTAMP,
+                PRIMARY KEY (name, kind)
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS company_enrichment (
+                name VARCHAR PRIMARY KEY,
+                latitude DOUBLE,
+                longitude DOUBLE,
+                country VARCHAR,
+                company_ceo VARCHAR,
+                fte_count DOUBLE,
+                geo_updated_at TIMESTAMP,
+                company_updated_at TIMESTAMP
+            )
+        """)
+
+    def _apply_company_enrichment(self, conn, only_batch: bool = False):
+        """Fill gaps in unified_companies from company_enrichment with one UPDATE ... FROM.
+
+        Values from the source tables win; enrichment only fills what they leave missing.
+        With ``only_batch`` just the names in the registered _enrichment_batch are touched.
+        """
+        if not self._table_exists(conn.execute, 'company_enrichment'):
+            return
+        batch_filter = "AND e.name IN (SELECT name FROM _enrichment_batch WHERE found)" if only_batch else ""
+        conn.execute(f"""
+            UPDATE unified_companies AS u
+            SET map_latitude = CASE WHEN u.map_latitude IS NULL OR u.map_longitude IS NULL
+                                    THEN COALESCE(e.latitude, u.map_latitude) ELSE u.map_latitude END,
+                map_longitude = CASE WHEN u.map_latitude IS NULL OR u.map_longitude IS NULL
+                                     THEN COALESCE(e.longitude, u.map_longitude) ELSE u.map_longitude END,
+                country = COALESCE(u.country, e.country),
+                company_ceo = CASE WHEN u.company_ceo IS NULL OR u.company_ceo = 'N/A'
+                                   THEN COALESCE(e.company_ceo, u.company_ceo) ELSE u.company_ceo END,
+                fte_count = CASE WHEN u.fte_count IS NULL OR u.fte_count = 0
+                                 THEN COALESCE(e.fte_count, u.fte_count) ELSE u.fte_count END
+            FROM company_enrichment e
+            WHERE u.name = e.name {batch_filter}
+        """)
+
+    def enqueue_enrichment(self, kind: str) -> int:
+        """Queue every unified company still missing ``kind`` data; returns the number added.
+
+        Names already pending or done are left as they are. Failed entries are queued again
+        (with their attempts reset) once ENRICHMENT_FAILED_RETRY_DAYS have passed since the
+        last lookup, and count as added.
+        """
+        missing = self.ENRICHMENT_KINDS[kind]
+        with self.write_connection() as conn:
+            self._ensure_enrichment_tables(conn)
+            requeued = conn.execute("""
+                UPDATE enrichment_queue
+                SET status = 'pending', attempts = 0, updated_at = current_timestamp
+                WHERE kind = ? AND status = 'failed'
+                  AND updated_at < current_timestamp - to_seconds(CAST(? AS DOUBLE) * 86400)
+            """, [kind, settings.ENRICHMENT_FAILED_RETRY_DAYS]).fetchone()[0]
+            count_sql = "SELECT COUNT(*) FROM enrichment_queue WHERE kind = ?"
+            before = conn.execute(count_sql, [kind]).fetchone()[0]
+            conn.execute(f"""
+                INSERT INTO enrichment_queue (name, kind)
+                SELECT DISTINCT name, ? FROM unified_companies
+                WHERE name IS NOT NULL AND ({missing})
+                ON CONFLICT DO NOTHING
+            """, [kind])
+            return requeued + conn.execute(count_sql, [kind]).fetchone()[0] - before
+
+    def process_enrichment_queue(self, kind: str, limit: Optional[int] = None) -> int:
+        """Resolve pending ``kind`` entries in batches of ENRICHMENT_BATCH_SIZE; returns the
+        number of companies enriched. One run per kind at a time: a second caller returns
+        immediately and its entries are picked up by the next run. Without an LLM client
+        nothing can be looked up, so the queue is left untouched."""
+        if not enrichment_service.client:
+            self.add_log(f"  Enrichment ({kind}) skipped: no LLM client is configured.")
+            return 0
+        lock = self._enrichment_locks[kind]
+        if not lock.acquire(blocking=False):
+            self.add_log(f"  Enrichment ({kind}) is already running.")
+            return 0
         try:
             query = """
-                SELECT DISTINCT name 
-                FROM unified_companies 
-                WHERE map_latitude IS NULL OR map_longitude IS NULL
-                LIMIT ?
+                SELECT name FROM enrichment_queue
+                WHERE kind = ? AND status = 'pending'
+                ORDER BY attempts, enqueued_at, name
             """
-            companies_to_enrich = self.conn.execute(query, (limit,)).df()['name'].tolist()
-            
-            if not companies_to_enrich:
-                self.add_log("  All companies have coordinates.")
-                return
-            
-            geo_results = enrichment_service.enrich_locations(companies_to_enrich)
-            
-            update_count = 0
-            for name, data in geo_results.items():
-                lat = data.get('latitude')
-                lon = data.get('longitude')
-                country = data.get('country')
-                
+            params = [kind]
+            if limit:
+                query += " LIMIT ?"
+                params.append(limit)
+            names = self.execute_df(query, params)['name'].tolist()
+            batch_size = max(1, settings.ENRICHMENT_BATCH_SIZE)
+            enriched = 0
+            for start in range(0, len(names), batch_size):
+                batch = names[start:start + batch_size]
+                enriched += self._store_enrichment(kind, batch, *self._fetch_enrichment(kind, batch))
+                self.add_log(f"  Enrichment ({kind}): {min(start + batch_size, len(names))}/{len(names)} companies processed")
+            return enriched
+        finally:
+            lock.release()
+
+    @staticmethod
+    def _fetch_enrichment(kind: str, names: List[str]) -> Tuple[Dict[str, Dict], Set[str]]:
+        """Look ``names`` up; returns (name -> column values for the names that resolved,
+        names whose lookup request raised and so were not actually looked up)."""
+        results, errored = {}, set()
+        if kind == 'geo':
+            for name, data in enrichment_service.enrich_locations(names, failed=errored).items():
+                lat, lon = data.get('latitude'), data.get('longitude')
                 if lat and lon:
-                    self.conn.execute("""
-                        UPDATE unified_companies 
-                        SET map_latitude = ?,
-                            map_longitude = ?,
-                            country = COALESCE(country, ?)
-                        WHERE name = ?
-                    """, (lat, lon, country, name))
-                    update_count += 1
-            
-            self.add_log(f"Successfully enriched {update_count} companies with geo-coordinates.")
-            
-        except Exception as e:
-            self.add_log(f"Error during geo-enrichment: {e}")
+                    results[name] = {'latitude': lat, 'longitude': lon, 'country': data.get('country')}
+        else:
+            for name, data in enrichment_service.enrich_companies(names, failed=errored).items():
+                ceo, fte = data.get('ceo'), data.get('fte')
+                if ceo or fte:
+                    results[name] = {'company_ceo': ceo, 'fte_count': fte}
+        return results, errored - results.keys()
 
-    def enrich_company_data(self, limit: int = 20):
-        """Find CEO and FTE for companies that don't have it"""
+    def _store_enrichment(self, kind: str, names: List[str], results: Dict[str, Dict],
+                          errored: Set[str] = frozenset()) -> int:
+        """Persist one batch: upsert company_enrichment, settle the queue entries and apply the
+        new values to unified_companies, all in one transaction. Returns names resolved.
+
+        Names in ``errored`` were not looked up (the request raised); their queue entries stay
+        pending without using up an attempt.
+        """
+        rows = pd.DataFrame({'name': names})
+        rows['found'] = rows['name'].isin(results.keys())
+        rows['errored'] = rows['name'].isin(errored)
+        columns = ['latitude', 'longitude', 'country'] if kind == 'geo' else ['company_ceo', 'fte_count']
+        for col in columns:
+            rows[col] = [results.get(name, {}).get(col) for name in names]
+        for col in ('latitude', 'longitude', 'fte_count'):
+            if col in rows:
+                rows[col] = pd.to_numeric(rows[col], errors='coerce')
+        for col in ('country', 'company_ceo'):
+            if col in rows:
+                rows[col] = rows[col].map(lambda v: None if v is None or pd.isna(v) else str(v))
+
+        if kind == 'geo':
+            upsert = """
+                INSERT INTO company_enrichment (name, latitude, longitude, country, geo_updated_at)
+                SELECT name, latitude, longitude, country, current_timestamp
+                FROM _enrichment_batch WHERE found
+                ON CONFLICT (name) DO UPDATE SET
+                    latitude = excluded.latitude,
+                    longitude = excluded.longitude,
+                    country = COALESCE(excluded.country, country),
+                    geo_updated_at = excluded.geo_updated_at
+            """
+        else:
+            upsert = """
+                INSERT INTO company_enrichment (name, company_ceo, fte_count, company_updated_at)
+                SELECT name, company_ceo, fte_count, current_timestamp
+                FROM _enrichment_batch WHERE found
+                ON CONFLICT (name) DO UPDATE SET
+                    company_ceo = COALESCE(excluded.company_ceo, company_ceo),
+                    fte_count = COALESCE(excluded.fte_count, fte_count),
+                    company_updated_at = excluded.company_updated_at
+            """
+        with self.write_connection() as conn:
+            conn.register("_enrichment_batch", rows)
+            try:
+                conn.begin()
+                try:
+                    conn.execute(upsert)
+                    conn.execute("""
+                        UPDATE enrichment_queue AS q
+                        SET status = CASE WHEN b.found THEN 'done'
+                                          WHEN q.attempts + 1 >= ? THEN 'failed'
+                                          ELSE 'pending' END,
+                            attempts = q.attempts + 1,
+                            updated_at = current_timestamp
+                        FROM _enrichment_batch b
+                        WHERE q.kind = ? AND q.name = b.name AND NOT b.errored
+                    """, [settings.ENRICHMENT_MAX_ATTEMPTS, kind])
+                    self._apply_company_enrichment(conn, only_batch=True)
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+            finally:
+                conn.unregister("_enrichment_batch")
+        _cache_clear()
+        return int(rows['found'].sum())
+
+    def get_enrichment_status(self) -> Dict[str, Dict[str, int]]:
+        """Queue entries per kind and status, e.g. {"geo": {"pending": 12, "done": 80}}."""
+        status = {kind: {} for kind in self.ENRICHMENT_KINDS}
+        if not self._table_exists(self.execute, 'enrichment_queue'):
+            return status
+        rows = self.execute(
+            "SELECT kind, status, COUNT(*) FROM enrichment_queue GROUP BY kind, status"
+        ).fetchall()
+        for kind, state, count in rows:
+            status.setdefault(kind, {})[state] = int(count)
+        return status
+
+    def run_enrichment(self, kind: str, limit: Optional[int] = None) -> int:
+        """Queue every company missing ``kind`` data and work through the queue."""
         if not self.conn:
             self.initialize_database()
-            
-        self.add_log(f"Searching internet for missing CEO and FTE data (limit: {limit} companies)...")
-        
-        # Find companies with missing data in unified_companies
+        label = "geographical coordinates" if kind == 'geo' else "CEO and FTE data"
+        self.add_log(f"Searching for missing {label}...")
         try:
-            query = """
-                SELECT DISTINCT name 
-                FROM unified_companies 
-                WHERE company_ceo IS NULL OR company_ceo = 'N/A' OR fte_count IS NULL OR fte_count = 0
-                LIMIT ?
-            """
-            companies_to_enrich = self.conn.execute(query, (limit,)).df()['name'].tolist()
-            
-            if not companies_to_enrich:
-                self.add_log("  No companies found requiring enrichment.")
-                return
-            
-            enriched_results = enrichment_service.enrich_companies(companies_to_enrich)
-            
-            # Update unified_companies table
-            update_count = 0
-            for name, data in enriched_results.items():
-                ceo = data.get('ceo')
-                fte = data.get('fte')
-                
-                if ceo or fte:
-                    self.conn.execute("""
-                        UPDATE unified_companies 
-                        SET company_ceo = COALESCE(?, company_ceo),
-                            fte_count = COALESCE(?, fte_count)
-                        WHERE name = ?
-                    """, (ceo, fte, name))
-                    update_count += 1
-            
-            self.add_log(f"Successfully enriched {update_count} companies with AI data.")
-            
+            added = self.enqueue_enrichment(kind)
+            enriched = self.process_enrichment_queue(kind, limit)
         except Exception as e:
-            self.add_log(f"Error during enrichment: {e}")
+            self.add_log(f"Error during {kind} enrichment: {e}")
+            return 0
+        self.add_log(f"Successfully enriched {enriched} companies ({added} newly queued).")
+        return enriched
+
+    def enrich_geo_coordinates(self, limit: Optional[int] = None):
+        """Find missing latitude and longitude for companies (all queued ones unless ``limit``)"""
+        return self.run_enrichment('geo', limit)
+
+    def enrich_company_data(self, limit: Optional[int] = None):
+        """Find CEO and FTE for companies that don't have it (all queued ones unless ``limit``)"""
+        return self.run_enrichment('company', limit)
 
     def get_customer_list(self, equipment_type: str = "All", country: str = "All", region: str = "All", company_name: str = "All") -> pd.DataFrame:
         """Get list of all customers from unified data with optional filtering.
@@ -1301,141 +2269,277 @@ class DataIngestionService:
         
         # Cache key includes all filter params
         cache_key = f"customer_list|{equipment_type}|{country}|{region}|{company_name}"
-        cached = _cache_get(cache_key)
-        if cached is not None:
-            return cached
-        
         try:
-            selection_scope = self.resolve_company_selection(
-                company_name,
-                region=region,
-                country=country,
-                equipment_type=equipment_type,
+            return _QUERY_CACHE.get_or_compute(
+                cache_key,
+                lambda: self._query_customer_list(equipment_type, country, region, company_name),
             )
-            tables = self.execute_df("SHOW TABLES")['name'].tolist()
-            if 'unified_companies' not in tables:
-                if 'crm_data' in tables:
-                    return self.execute_df("SELECT * FROM crm_data LIMIT 1000")
-                return pd.DataFrame()
-            
-            # Start building query
-            query = "SELECT * FROM unified_companies WHERE 1=1"
-            params = []
-
-            # Filter by region
-            if region != "All" and hasattr(self, 'REGION_MAPPING') and region in self.REGION_MAPPING:
-                region_values = [r.lower() for r in self.REGION_MAPPING[region]]
-                filter_str = " OR ".join(["LOWER(region) LIKE ?"] * len(region_values))
-                query += f" AND ({filter_str})"
-                for r in region_values:
-                    params.append(f"%{r}%")
-            elif region == "Not assigned":
-                query += " AND (region IS NULL OR region = '')"
-
-            # Filter by country — match either CRM HQ country OR any plant in that country.
-            # A multinational like Outokumpu (HQ=Finland) must appear when filtering by Germany
-            # because they have plants there (stored in bcg_locations array).
-            if country != "All":
-                query += " AND (LOWER(country) = ? OR list_contains(bcg_locations, ?))"
-                params.append(country.lower())
-                # bcg_locations stores country_internal values with original casing (e.g. 'Germany')
-                # Try title-cased version to match the BCG data
-                params.append(country.title())
-
-            # Filter by equipment
-            if equipment_type != "All":
-                internal_name = self.EQUIPMENT_MAP.get(equipment_type, equipment_type)
-                query += " AND list_contains(equipment_list, ?)"
-                params.append(internal_name)
-
-            # Filter by company name
-            if selection_scope['selection_type'] != 'all':
-                query = self._append_in_filter(query, 'name', selection_scope['company_names'], params)
-
-            query += " ORDER BY equip_count DESC NULLS LAST"
-            
-            result = self.execute_df(query, params)
-            
-            # Safety check for 'name' column
-            if not result.empty and 'name' not in result.columns:
-                result.rename(columns={result.columns[0]: 'name'}, inplace=True)
-            
-            _cache_set(cache_key, result)
-            return result
         except Exception as e:
             self.add_log(f"Error fetching customer list: {e}")
             import traceback
             self.add_log(traceback.format_exc())
             return pd.DataFrame()
 
+    def get_customer_page(self, equipment_type: str = "All", country: str = "All", region: str = "All",
+                          company_name: str = "All", limit: Optional[int] = None, offset: int = 0,
+                          sort_by: Optional[str] = None, fields: Optional[str] = None):
+        """One page of get_customer_list, sorted/projected/limited in SQL; returns (df, total).
+        Raises ValueError for unknown ``fields``/``sort_by`` columns."""
+        conn = self.get_conn()
+        if not conn:
+            return pd.DataFrame(), 0
+        cache_key = f"customer_page|{equipment_type}|{country}|{region}|{company_name}|{limit}|{offset}|{sort_by}|{fields}"
+        df, total = _QUERY_CACHE.get_or_compute(
+            cache_key,
+            lambda: self._query_customer_page(equipment_type, country, region, company_name, limit, offset, sort_by, fields),
+        )
+        return df.copy(), total
+
+    def _query_customer_page(self, equipment_type, country, region, company_name, limit, offset, sort_by, fields):
+        query, params, default_sort = self._customer_list_query(equipment_type, country, region, company_name)
+        if query is None:
+            return pd.DataFrame(), 0
+        return self._query_page(query, params, limit, offset, sort_by, fields, default_sort=default_sort)
+
+    def _customer_list_query(self, equipment_type: str, country: str, region: str, company_name: str):
+        """Build the filtered unified_companies SQL without ORDER BY; returns (query, params, default_sort)."""
+        selection_scope = self.resolve_company_selection(
+            company_name,
+            region=region,
+            country=country,
+            equipment_type=equipment_type,
+        )
+        tables = self.execute_df("SHOW TABLES")['name'].tolist()
+        if 'unified_companies' not in tables:
+            if 'crm_data' in tables:
+                return "SELECT * FROM crm_data LIMIT 1000", [], None
+            return None, [], None
+
+        # Start building query
+        query = "SELECT * FROM unified_companies WHERE 1=1"
+        params = []
+
+        # Filter by region
+        query += self._region_filter_sql('region', region, params)
+
+        # Filter by country — match either CRM HQ country OR any plant in that country.
+        # A multinational like Outokumpu (HQ=Finland) must appear when filtering by Germany
+        # because they have plants there (stored in bcg_locations array).
+        if country != "All":
+            query += " AND (LOWER(country) = ? OR list_contains(bcg_locations, ?))"
+            params.append(country.lower())
+            # bcg_locations stores country_internal values with original casing (e.g. 'Germany')
+            # Try title-cased version to match the BCG data
+            params.append(country.title())
+
+        # Filter by equipment
+        if equipment_type != "All":
+            internal_name = self.EQUIPMENT_MAP.get(equipment_type, equipment_type)
+            query += " AND list_contains(equipment_list, ?)"
+            params.append(internal_name)
+
+        # Filter by company name
+        if selection_scope['selection_type'] != 'all':
+            query = self._append_in_filter(query, 'name', selection_scope['company_names'], params)
+        return query, params, "-equip_count"
+
+    def _query_customer_list(self, equipment_type: str, country: str, region: str, company_name: str) -> pd.DataFrame:
+        query, params, default_sort = self._customer_list_query(equipment_type, country, region, company_name)
+        if query is None:
+            return pd.DataFrame()
+        if default_sort:
+            query += " ORDER BY equip_count DESC NULLS LAST"
+
+        result = self.execute_df(query, params)
+        
+        # Safety check for 'name' column
+        if not result.empty and 'name' not in result.columns:
+            result.rename(columns={result.columns[0]: 'name'}, inplace=True)
+
+        return result
+
     def get_all_equipment_types(self) -> List[str]:
         """Get list of all equipment types from BCG data"""
         return self.FIXED_EQUIPMENT_LIST
     
-    def get_match_quality_stats(self) -> Dict[str, float]:
+    # Match-quality levels over company_mappings.match_score, checked in order
+    MATCH_QUALITY_LEVELS = (("excellent", 100), ("good", 80), ("okay", 50), ("poor", None))
+
+    def _match_quality_breakdown(self, counts: Dict[str, int]) -> Dict[str, float]:
+        total = sum(counts.values())
+        breakdown = {level: (counts.get(level, 0) / total) * 100 if total > 0 else 0
+                     for level, _ in self.MATCH_QUALITY_LEVELS}
+        breakdown["total"] = total
+        return breakdown
+
+    def get_match_quality_stats(self) -> Dict:
         """
         Calculate match quality statistics showing % of companies matched at different quality levels
-        Returns dict with keys: excellent (100%), good (80-99%), okay (50-79%), poor (<50%)
+        Returns dict with keys: excellent (100%), good (80-99%), okay (50-79%), poor (<50%), plus
+        by_equipment_type / by_country with the same breakdown over the mappings of BCG companies
+        that have plants of that type / in that country.
+        Uses the stored match_score; only mappings without one are scored (token_sort_ratio).
         """
         if not self.conn:
             self.initialize_database()
-        
         try:
-            # Get all mappings
-            mappings = self.conn.execute("SELECT crm_name, bcg_name FROM company_mappings").df()
-            
-            if mappings.empty:
-                return {"excellent": 0, "good": 0, "okay": 0, "poor": 100}
-            
-            # Calculate match scores using fuzzy matching
-            from thefuzz import fuzz
-            
-            excellent = 0
-            good = 0
-            okay = 0
-            poor = 0
-            
-            for _, row in mappings.iterrows():
-                crm_name = str(row['crm_name'])
-                bcg_name = str(row['bcg_name'])
-                
-                # Calculate fuzzy match score
-                score = fuzz.token_sort_ratio(crm_name, bcg_name)
-                
-                if score == 100:
-                    excellent += 1
-                elif score >= 80:
-                    good += 1
-                elif score >= 50:
-                    okay += 1
-                else:
-                    poor += 1
-            
-            total = len(mappings)
-            
-            return {
-                "excellent": (excellent / total) * 100 if total > 0 else 0,
-                "good": (good / total) * 100 if total > 0 else 0,
-                "okay": (okay / total) * 100 if total > 0 else 0,
-                "poor": (poor / total) * 100 if total > 0 else 0
-            }
-            
+            return dict(_QUERY_CACHE.get_or_compute('match_quality_stats', self._query_match_quality_stats))
         except Exception as e:
             self.add_log(f"Error calculating match quality stats: {e}")
             return {"excellent": 0, "good": 0, "okay": 0, "poor": 0}
 
+    def _query_match_quality_stats(self) -> Dict:
+        """Uncached body of get_match_quality_stats; raises on query errors so failures are not cached."""
+        cursor = self._thread_cursor()
+        missing = cursor.execute(
+            "SELECT crm_name, bcg_name FROM company_mappings WHERE match_score IS NULL"
+        ).fetchall()
+        score_expr = "m.match_score"
+        recomputed_join = ""
+        if missing:
+            recomputed = pd.DataFrame(missing, columns=["crm_name", "bcg_name"])
+            recomputed["score"] = mapping_service.pair_scores(
+                [str(v) for v in recomputed["crm_name"]], [str(v) for v in recomputed["bcg_name"]]
+            )
+            cursor.register("_match_quality_recomputed", recomputed)
+            score_expr = "COALESCE(m.match_score, r.score)"
+            recomputed_join = """
+                LEFT JOIN _match_quality_recomputed r
+                  ON m.match_score IS NULL
+                 AND r.crm_name IS NOT DISTINCT FROM m.crm_name
+                 AND r.bcg_name IS NOT DISTINCT FROM m.bcg_name
+            """
+        whens = " ".join(
+            f"WHEN score >= {threshold} THEN '{level}'"
+            for level, threshold in self.MATCH_QUALITY_LEVELS if threshold is not None
+        )
+        query = f"""
+            WITH scored AS (
+                SELECT m.crm_name, m.bcg_name, {score_expr} AS score
+                FROM company_mappings m
+                {recomputed_join}
+            ),
+            bucketed AS (
+                SELECT crm_name, bcg_name, CASE {whens} ELSE 'poor' END AS level FROM scored
+            )
+            SELECT 'all' AS dimension, NULL AS value, level, COUNT(*) AS n FROM bucketed GROUP BY level
+        """
+        if self._table_exists(cursor.execute, 'bcg_installed_base'):
+            # One join to the installed base; each mapping counts once per equipment type / country
+            query += """
+                UNION ALL
+                SELECT
+                    CASE WHEN GROUPING(equipment_type) = 0 THEN 'equipment_type' ELSE 'country' END,
+                    CASE WHEN GROUPING(equipment_type) = 0 THEN equipment_type ELSE country END,
+                    level,
+                    COUNT(DISTINCT [crm_name, bcg_name])
+                FROM (
+                    SELECT DISTINCT m.crm_name, m.bcg_name, m.level,
+                           CAST(b.equipment_type AS VARCHAR) AS equipment_type,
+                           CAST(b.country_internal AS VARCHAR) AS country
+                    FROM bucketed m
+                    JOIN bcg_installed_base b ON b.company_internal = m.bcg_name
+                ) per_plant
+                GROUP BY GROUPING SETS ((equipment_type, level), (country, level))
+            """
+        try:
+            rows = cursor.execute(query).fetchall()
+        finally:
+            if missing:
+                cursor.unregister("_match_quality_recomputed")
+
+        counts: Dict[tuple, Dict[str, int]] = {}
+        for dimension, value, level, n in rows:
+            counts.setdefault((dimension, value), {})[level] = int(n)
+        overall = counts.get(("all", None))
+        if not overall:
+            return {"excellent": 0, "good": 0, "okay": 0, "poor": 100,
+                    "total": 0, "by_equipment_type": {}, "by_country": {}}
+
+        stats = self._match_quality_breakdown(overall)
+        for dimension in ("equipment_type", "country"):
+            stats[f"by_{dimension}"] = {
+                value if value is not None else "Unknown": self._match_quality_breakdown(level_counts)
+                for (dim, value), level_counts in sorted(counts.items(), key=lambda item: str(item[0][1]))
+                if dim == dimension
+            }
+        return stats
+
+    # format -> (media type, file suffix) for export_customers
+    EXPORT_FORMATS = {
+        "xlsx": ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", ".xlsx"),
+        "csv": ("text/csv", ".csv"),
+        "parquet": ("application/vnd.apache.parquet", ".parquet"),
+    }
+    EXPORT_BATCH_ROWS = 5000
+
+    def export_customers(self, target: Path, fmt: str = "xlsx", equipment_type: str = "All",
+                         country: str = "All", region: str = "All", company_name: str = "All",
+                         sort_by: Optional[str] = None, fields: Optional[str] = None) -> int:
+        """Write the filtered customer list (same filters as get_customer_page) to ``target``.
+
+        CSV and Parquet are written by DuckDB ``COPY ... TO``; XLSX by an openpyxl write-only
+        workbook fed in EXPORT_BATCH_ROWS batches, so memory stays flat whatever the row count.
+        Returns the number of rows written; raises ValueError for an unknown format or column.
+        """
+        if fmt not in self.EXPORT_FORMATS:
+            raise ValueError(f"Unsupported export format: {fmt}")
+        if not self.get_conn():
+            raise RuntimeError("Database is not available")
+
+        query, params, default_sort = self._customer_list_query(equipment_type, country, region, company_name)
+        if query is None:
+            query, params, default_sort = "SELECT NULL AS name WHERE 1=0", [], None
+        select = self._ordered_select(query, params, sort_by, fields, default_sort=default_sort)
+
+        if fmt == "xlsx":
+            return self._write_xlsx(target, select, params, sheet_name="Unified Customers")
+        options = "FORMAT CSV, HEADER" if fmt == "csv" else "FORMAT PARQUET"
+        row = self.execute(f"COPY ({select}) TO {self._quote_literal(target)} ({options})", params).fetchone()
+        return int(row[0]) if row else 0
+
+    def _write_xlsx(self, target: Path, query: str, params: List[object], sheet_name: str) -> int:
+        """Stream ``query`` into a write-only openpyxl workbook at ``target``; returns the row count."""
+        from openpyxl import Workbook
+        from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+
+        def cell(value):
+            if isinstance(value, (list, tuple)):
+                value = ", ".join("" if v is None else str(v) for v in value)
+            elif isinstance(value, dict):
+                value = str(value)
+            if isinstance(value, str):
+                return ILLEGAL_CHARACTERS_RE.sub("", value)
+            return value
+
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet(sheet_name)
+        # Dedicated cursor: the result is consumed batch by batch.
+        cursor = self.get_conn().cursor()
+        rows = 0
+        try:
+            result = cursor.execute(query, params)
+            sheet.append([d[0] for d in result.description])
+            while True:
+                batch = result.fetchmany(self.EXPORT_BATCH_ROWS)
+                if not batch:
+                    break
+                for record in batch:
+                    sheet.append([cell(v) for v in record])
+                rows += len(batch)
+        finally:
+            cursor.close()
+        workbook.save(str(target))
+        return rows
+
     def export_unified_to_excel(self) -> bytes:
         """Export the unified customer view to Excel format"""
-        df = self.get_customer_list()
-        if df.empty:
-            return None
-            
-        import io
-        output = io.BytesIO()
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            df.to_excel(writer, index=False, sheet_name='Unified Customers')
-        
-        return output.getvalue()
+        import tempfile
+        with tempfile.TemporaryDirectory() as tmp:
+            target = Path(tmp) / "unified_customers.xlsx"
+            if not self.export_customers(target, "xlsx"):
+                return None
+            return target.read_bytes()
 
     def get_customer_detail(self, customer_id: str, equipment_type: str = "All") -> Dict:
         """Get detailed customer information by ID or Name from unified datasets"""
@@ -1513,9 +2617,102 @@ class DataIngestionService:
 
 
     
-    def get_stats(self, region: str = "All", country: str = "All", equipment_type: str = "All", company_name: str = "All") -> Dict:
+    # Operational status buckets for get_stats, checked in order (first match wins)
+    STATUS_BUCKETS = [
+        ("Shutdown / Idle", ["shutdown", "shut down", "idle", "stopped", "offline", "mothball", "decommission"]),
+        ("Operating", ["operating", "operational", "active", "running", "in operation", "production"]),
+        ("Commissioning / Ramp-up", ["commission", "startup", "ramp", "construction"]),
+    ]
+    STATUS_OTHER = "Unknown / Other"
+    STATS_NUMERIC_COLUMNS = ("capacity", "age", "start_year")
+    STATS_HISTOGRAM_BINS = 20
+
+    @staticmethod
+    def _empty_stats_summary() -> Dict:
+        return {
+            "total": 0,
+            "status_counts": {},
+            "equipment_counts": {},
+            "capacity": {},
+            "age": {},
+            "start_year": {}
+        }
+
+    def _status_bucket_sql(self, column: str) -> str:
+        """SQL CASE mapping a raw status column onto STATUS_BUCKETS (case-insensitive substring match)."""
+        status = f"LOWER(COALESCE({column}, ''))"
+        whens = []
+        for label, keywords in self.STATUS_BUCKETS:
+            terms = " OR ".join(f"contains({status}, '{k}')" for k in keywords)
+            whens.append(f"WHEN {terms} THEN '{label}'")
+        return f"CASE {' '.join(whens)} ELSE '{self.STATUS_OTHER}' END"
+
+    def _stats_summary(self, query: str, params: List[object]) -> Dict:
+        """Counts, quantiles and fixed-width histograms over the rows of a get_stats query."""
+        base = f"WITH f AS ({query}) "
+        numeric = self.STATS_NUMERIC_COLUMNS
+        parts = ["COUNT(*)"]
+        for col in numeric:
+            parts += [
+                f"COUNT({col})", f"MIN({col})", f"MAX({col})", f"AVG({col})", f"STDDEV_SAMP({col})",
+                f"QUANTILE_CONT({col}, [0.25, 0.5, 0.75])",
+            ]
+        row = self.execute(base + f"SELECT {', '.join(parts)} FROM f", params).fetchone()
+        total = int(row[0])
+        if not total:
+            return self._empty_stats_summary()
+
+        def _r(value):
+            return None if value is None else round(float(value), 1)
+
+        summary = {"total": total}
+        bounds = {}
+        for k, col in enumerate(numeric):
+            count, lo, hi, mean, std, quartiles = row[1 + 6 * k: 7 + 6 * k]
+            if not count:
+                summary[col] = {}
+                continue
+            q1, median, q3 = quartiles
+            summary[col] = {
+                "count": int(count), "min": _r(lo), "max": _r(hi), "mean": _r(mean),
+                "median": _r(median), "std": _r(std), "q1": _r(q1), "q3": _r(q3),
+            }
+            bounds[col] = (float(lo), float(hi))
+
+        # Pre-binned histograms: STATS_HISTOGRAM_BINS equal-width bins between min and max
+        bins = self.STATS_HISTOGRAM_BINS
+        if bounds:
+            selects, hist_params = [], list(params)
+            for col, (lo, hi) in bounds.items():
+                width = (hi - lo) / bins if hi > lo else 1.0 / bins
+                selects.append(
+                    f"SELECT '{col}' AS metric, LEAST(CAST(FLOOR(({col} - ?) / ?) AS INTEGER), {bins - 1}) AS bin, "
+                    f"COUNT(*) AS n FROM f WHERE {col} IS NOT NULL GROUP BY 2"
+                )
+                hist_params += [lo, width]
+                summary[col]["histogram"] = {"min": _r(lo), "bin_width": width, "counts": [0] * bins}
+            for metric, bin_idx, n in self.execute(base + " UNION ALL ".join(selects), hist_params).fetchall():
+                summary[metric]["histogram"]["counts"][int(bin_idx)] = int(n)
+
+        status_counts = self.execute(
+            base + f"SELECT {self._status_bucket_sql('status')} AS bucket, COUNT(*) AS n FROM f GROUP BY 1 ORDER BY n DESC, 1",
+            params,
+        ).fetchall()
+        summary["status_counts"] = {label: int(n) for label, n in status_counts}
+        equipment_counts = self.execute(
+            base + "SELECT COALESCE(equipment_type, 'Unknown') AS equipment, COUNT(*) AS n "
+                   "FROM f GROUP BY 1 ORDER BY n DESC, 1 LIMIT 15",
+            params,
+        ).fetchall()
+        summary["equipment_counts"] = {label: int(n) for label, n in equipment_counts}
+        return summary
+
+    def get_stats(self, region: str = "All", country: str = "All", equipment_type: str = "All", company_name: str = "All",
+                  include_records: bool = False, records_limit: int = 1000, records_offset: int = 0) -> Dict:
         """Return summary statistics for the statistics panel:
-        distributions of capacity, equipment age, start year, operational status."""
+        distributions of capacity, equipment age, start year, operational status.
+        Everything is aggregated in DuckDB; the filtered rows themselves are only
+        returned (one page at a time) when ``include_records`` is set."""
         import json
         if not self.conn:
             self.initialize_database()
@@ -1523,9 +2720,10 @@ class DataIngestionService:
             # Check if bcg_installed_base table exists
             tables = self.execute_df("SHOW TABLES")['name'].tolist()
             if 'bcg_installed_base' not in tables:
-                return {"records": [], "summary": {"total": 0}}
+                return {"records": [], "summary": self._empty_stats_summary()}
             
-            query = """
+            mapping_best = self._mapping_best_relation()
+            query = f"""
                 SELECT
                     CAST(status_internal AS VARCHAR)  as status,
                     CAST(capacity_internal AS DOUBLE)  as capacity,
@@ -1542,31 +2740,13 @@ class DataIngestionService:
                     CAST(region AS VARCHAR)            as region,
                     COALESCE(CAST(m.crm_name AS VARCHAR), CAST(b.company_internal AS VARCHAR)) as company_name
                 FROM bcg_installed_base b
-                LEFT JOIN (
-                    SELECT bcg_name, crm_name, match_score
-                    FROM (
-                        SELECT
-                            bcg_name,
-                            crm_name,
-                            match_score,
-                            ROW_NUMBER() OVER (
-                                PARTITION BY bcg_name
-                                ORDER BY match_score DESC NULLS LAST, crm_name
-                            ) AS rn
-                        FROM company_mappings
-                    ) ranked
-                    WHERE rn = 1
-                ) m ON b.company_internal = m.bcg_name
+                LEFT JOIN {mapping_best} m ON b.company_internal = m.bcg_name
                 WHERE 1=1
             """
             current_year = pd.Timestamp.now().year
             params: list = [current_year, current_year]
 
-            if region != "All" and region in self.REGION_MAPPING:
-                region_vals = [r.lower() for r in self.REGION_MAPPING[region]]
-                placeholders = ", ".join(["?"] * len(region_vals))
-                query += f" AND LOWER(region) IN ({placeholders})"
-                params.extend(region_vals)
+            query += self._region_filter_sql('b."Region"', region, params)
             if country != "All":
                 query += " AND country_internal = ?"
                 params.append(country)
@@ -1583,79 +2763,64 @@ class DataIngestionService:
             if selection_scope['selection_type'] != 'all':
                 query = self._append_in_filter(query, 'COALESCE(m.crm_name, b.company_internal)', selection_scope['company_names'], params)
 
-            df = self.execute_df(query, params)
-            if df.empty:
-                return {
-                    "records": [],
-                    "summary": {
-                        "total": 0,
-                        "status_counts": {},
-                        "equipment_counts": {},
-                        "capacity": {},
-                        "age": {},
-                        "start_year": {}
-                    }
-                }
-
-            records = json.loads(json.dumps(df.to_dict(orient="records"), default=str))
-
-            # Summary statistics
-            cap = df["capacity"].dropna()
-            age = df["age"].dropna()
-            yr  = df["start_year"].dropna()
-            def _normalize_status(value: object) -> str:
-                status = str(value or "").strip().lower()
-                if not status:
-                    return "Unknown / Other"
-                if any(k in status for k in ["shutdown", "shut down", "idle", "stopped", "offline", "mothball", "decommission"]):
-                    return "Shutdown / Idle"
-                if any(k in status for k in ["operating", "operational", "active", "running", "in operation", "production"]):
-                    return "Operating"
-                if any(k in status for k in ["commission", "startup", "ramp", "construction"]):
-                    return "Commissioning / Ramp-up"
-                return "Unknown / Other"
-
-            status_norm = df["status"].apply(_normalize_status)
-            status_counts = status_norm.value_counts().to_dict()
-            equip_counts  = df["equipment_type"].fillna("Unknown").value_counts().head(15).to_dict()
-
-            def _desc(s):
-                if s.empty:
-                    return {}
-                return {
-                    "min":    round(float(s.min()),  1),
-                    "max":    round(float(s.max()),  1),
-                    "mean":   round(float(s.mean()), 1),
-                    "median": round(float(s.median()), 1),
-                    "std":    round(float(s.std()),  1),
-                    "q1":     round(float(s.quantile(0.25)), 1),
-                    "q3":     round(float(s.quantile(0.75)), 1),
-                    "values": [round(float(v), 1) for v in s.tolist()],
-                }
-
-            return {
-                "records": records,
-                "summary": {
-                    "total": len(df),
-                    "status_counts": status_counts,
-                    "equipment_counts": equip_counts,
-                    "capacity": _desc(cap),
-                    "age": _desc(age),
-                    "start_year": _desc(yr),
-                },
-            }
+            summary = self._stats_summary(query, params)
+            result = {"records": [], "summary": summary}
+            if include_records and summary["total"]:
+                page, total = self._query_page(query, params, limit=records_limit, offset=records_offset)
+                result["records"] = json.loads(json.dumps(page.to_dict(orient="records"), default=str))
+                result["records_total"] = total
+                result["records_offset"] = records_offset
+            return result
         except Exception as e:
             self.add_log(f"get_stats error: {e}")
             import traceback; self.add_log(traceback.format_exc())
             return {"records": [], "summary": {}}
 
-    def close(self):
-        """Close database connection"""
-        if self.conn:
+    def get_query_cache_stats(self) -> Dict:
+        """Return hit/miss/eviction counters and current size of the query cache"""
+        return _QUERY_CACHE.stats()
+
+    def _close_cursors(self):
+        """Close every per-thread cursor and retired handle; threads open fresh cursors on next use"""
+        with self._cursors_lock:
+            cursors = list(self._cursors) + self._retired_handles
+            self._cursors = weakref.WeakSet()
+            self._retired_handles = []
+            self._conn_generation += 1
+        for cursor in cursors:
             try:
-                self.conn.close()
-            finally:
-                self.conn = None
+                cursor.close()
+            except Exception:
+                pass
+
+    def close(self):
+        """Close database connection and every per-thread cursor derived from it"""
+        self._close_cursors()
+        conn, self.conn = self.conn, None
+        if conn:
+            conn.close()
+
+
+def _prepare_bcg_sheet_task(source: str, cache_dir: str, sheet_name: str) -> Dict:
+    """Process-pool task for load_bcg_installed_base: one sheet -> prepared Arrow table + timing."""
+    started = time.perf_counter()
+    result = {"sheet": sheet_name, "rows": 0, "table": None}
+    try:
+        if source.lower().endswith('.csv'):
+            df = pd.read_csv(source)
+        else:
+            df = ExcelParquetCache(Path(cache_dir)).read_sheet(Path(source), sheet_name)
+        df = data_service._prepare_bcg_sheet(DataIngestionService._drop_unnamed_columns(df), sheet_name)
+        if not df.empty:
+            mismatches = {}
+            result["table"] = to_arrow(df, DataIngestionService.BCG_SCHEMA, mismatches)
+            result["rows"] = int(len(df))
+            if mismatches:
+                result["mismatches"] = mismatches
+    except Exception as e:
+        result["error"] = str(e)
+    result["seconds"] = round(time.perf_counter() - started, 3)
+    return result
 
 
 # Singleton instance
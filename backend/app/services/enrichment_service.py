@@ -3,7 +3,7 @@ AI Service for enriching company data (CEO, FTE) using LLM
 """
 import json
 import pandas as pd
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Set
 from openai import AzureOpenAI, OpenAI
 from app.core.config import settings
 
@@ -29,10 +29,11 @@ class EnrichmentService:
             self.client = OpenAI(api_key=settings.OPENAI_API_KEY)
             self.model = "gpt-4o"
         
-    def enrich_locations(self, companies: List[str]) -> Dict[str, Dict]:
+    def enrich_locations(self, companies: List[str], failed: Optional[Set[str]] = None) -> Dict[str, Dict]:
         """
         Search for geographical coordinates (lat/lon) and full business HQ country for companies
         Returns a mapping of company name to its enriched location data
+        Names of batches whose request raised are added to ``failed`` (if given)
         """
         if not self.client or not companies:
             return {}
@@ -72,13 +73,16 @@ class EnrichmentService:
                 all_results.update(batch_results)
             except Exception as e:
                 print(f"Error enriching locations for batch {batch}: {e}")
+                if failed is not None:
+                    failed.update(batch)
                 
         return all_results
 
-    def enrich_companies(self, companies: List[str]) -> Dict[str, Dict]:
+    def enrich_companies(self, companies: List[str], failed: Optional[Set[str]] = None) -> Dict[str, Dict]:
         """
         Search for CEO and Employee count for a list of companies
         Returns a mapping of company name to its enriched data
+        Names of batches whose request raised are added to ``failed`` (if given)
         """
         if not self.client or not companies:
             return {}
@@ -118,6 +122,8 @@ class EnrichmentService:
                 all_results.update(batch_results)
             except Exception as e:
                 print(f"Error enriching batch {batch}: {e}")
+                if failed is not None:
+                    failed.update(batch)
                 
         return all_results
 
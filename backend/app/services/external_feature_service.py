@@ -9,6 +9,7 @@ from typing import Any, Dict, List, Optional, Tuple
 
 import pandas as pd
 
+from app.core.config import settings
 from app.services.data_service import data_service
 from app.services.web_enrichment_service import web_enrichment_service
 
@@ -258,18 +259,41 @@ class ExternalFeatureService:
         }
 
     def _persist_table(self, table_name: str, df: pd.DataFrame) -> None:
-        conn = data_service.get_conn()
-        with data_service._lock:
-            conn.register("snapshot_df", df)
-            try:
-                conn.execute(f"CREATE OR REPLACE TABLE {table_name} AS SELECT * FROM snapshot_df")
-            finally:
-                try:
-                    conn.unregister("snapshot_df")
-                except Exception:
-                    pass
-
-    def refresh_snapshots(self, max_company_count: int = 75) -> Dict[str, Any]:
+        data_service.replace_table(table_name, df)
+
+    # Tables the snapshot candidates are drawn from.
+    _INPUT_TABLES = ["crm_data", "crm", "customers", "unified_companies", "bcg_installed_base", "bcg_data"]
+
+    def _input_fingerprint(self, max_company_count: int) -> str:
+        fps = data_service.get_table_fingerprints(self._INPUT_TABLES)
+        return f"max_company_count={max_company_count}|" + "|".join(f"{name}={fps[name]}" for name in self._INPUT_TABLES)
+
+    def _snapshots_current(self, input_fp: str) -> bool:
+        """True when the stored snapshots were built from the same inputs and are still fresh."""
+        if not (self._table_exists("company_external_features") and self._table_exists("country_market_features")):
+            return False
+        if data_service.get_meta("external_features_inputs") != input_fp:
+            return False
+        try:
+            refreshed_at = datetime.fromisoformat(data_service.get_meta("external_features_refreshed_at"))
+        except ValueError:
+            return False
+        age_hours = (datetime.now(timezone.utc) - refreshed_at).total_seconds() / 3600.0
+        return age_hours < settings.EXTERNAL_FEATURE_MAX_AGE_HOURS
+
+    def refresh_snapshots(self, max_company_count: int = 75, force: bool = False) -> Dict[str, Any]:
+        input_fp = self._input_fingerprint(max_company_count)
+        if not force and self._snapshots_current(input_fp):
+            company_rows = data_service.execute("SELECT COUNT(*) FROM company_external_features").fetchone()[0]
+            country_rows = data_service.execute("SELECT COUNT(*) FROM country_market_features").fetchone()[0]
+            return {
+                "status": "unchanged",
+                "company_feature_rows": int(company_rows),
+                "country_feature_rows": int(country_rows),
+                "company_feature_columns": COMPANY_EXTERNAL_FEATURE_COLS,
+                "country_feature_columns": COUNTRY_MARKET_FEATURE_COLS,
+            }
+
         company_candidates = self._load_company_candidates(max_company_count=max_company_count)
         country_candidates = self._load_country_candidates()
 
@@ -289,6 +313,8 @@ class ExternalFeatureService:
 
         self._persist_table("company_external_features", company_df)
         self._persist_table("country_market_features", country_df)
+        data_service.set_meta("external_features_inputs", input_fp)
+        data_service.set_meta("external_features_refreshed_at", datetime.now(timezone.utc).isoformat())
 
         return {
             "status": "ok",
@@ -44,16 +44,15 @@ def _load_ib() -> pd.DataFrame:
     try:
         # Load first sheet or all sheets? BCG data has many sheets. 
         # For simplicity, we'll try to find the 'Company' column in any sheet.
-        xl = pd.ExcelFile(_IB_PATH)
         all_dfs = []
-        for sheet in xl.sheet_names:
-            tmp = pd.read_excel(xl, sheet_name=sheet)
+        for sheet in data_service.ingest_cache.sheet_names(_IB_PATH):
+            tmp = data_service.ingest_cache.read_sheet(_IB_PATH, sheet)
             if 'Company' in tmp.columns:
                 tmp['sheet_source'] = sheet
                 all_dfs.append(tmp)
         
         if not all_dfs:
-            return pd.read_excel(_IB_PATH) # Fallback to first
+            return data_service.ingest_cache.read_sheet(_IB_PATH) # Fallback to first
         return pd.concat(all_dfs, ignore_index=True)
     except Exception as e:
         logger.error("Failed to load IB file: %s", e)
@@ -66,7 +65,7 @@ def _load_crm() -> pd.DataFrame:
         logger.warning("CRM file not found: %s", _CRM_PATH)
         return pd.DataFrame()
     try:
-        df = pd.read_excel(_CRM_PATH)
+        df = data_service.ingest_cache.read_sheet(_CRM_PATH)
         return df
     except Exception as e:
         logger.error("Failed to load CRM file: %s", e)
@@ -5,13 +5,20 @@ Uses a 4-tier strategy:
   2. Cleaned/normalised name match (strip legal suffixes)
   3. Fuzzy token-sort match (thefuzz)
   4. LLM verification via standard OpenAI OR Azure OpenAI
+Results of the fuzzy/LLM tiers can be memoised across runs in a MatchCache.
 """
+import bisect
+import hashlib
 import json
 import logging
 import re
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Tuple, Optional
 
-from thefuzz import fuzz, process
+import numpy as np
+from rapidfuzz import fuzz as rf_fuzz, process as rf_process
+from thefuzz import utils as fuzz_utils
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
@@ -36,6 +43,188 @@ def _normalize(name: str) -> str:
     return re.sub(r'\s+', ' ', cleaned).strip().lower()
 
 
+# ── Candidate blocking ────────────────────────────────────────────────────────
+# thefuzz's process.extractOne(query, choices, scorer=token_*_ratio) runs
+# full_process on the query and full_process(force_ascii=True) on every choice,
+# scores with rapidfuzz and keeps the first maximum. The index below reproduces
+# that on a small candidate block instead of the whole choice list.
+
+def _query_key(value) -> str:
+    # thefuzz pre-processes the query, then rapidfuzz applies the choice processor to it too
+    return _choice_key(fuzz_utils.full_process(str(value)))
+
+
+def _choice_key(value) -> str:
+    # rapidfuzz skips None choices; an empty key scores 0 against everything
+    return "" if value is None else fuzz_utils.full_process(str(value), force_ascii=True)
+
+
+def _trigrams(key: str) -> set:
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class _BlockIndex:
+    """Token and character-trigram inverted index over processed strings.
+
+    A candidate block is every entry that shares a (not too common) token
+    with the query, or at least MIN_TRIGRAM_SHARE of the query's trigrams.
+    """
+
+    MIN_TRIGRAM_SHARE = 0.3
+    # Tokens in more than this share of entries (e.g. "steel") do not open a block
+    MAX_TOKEN_SHARE = 0.05
+
+    def __init__(self, keys: List[str]):
+        self.keys = keys
+        tokens: Dict[str, List[int]] = defaultdict(list)
+        grams: Dict[str, List[int]] = defaultdict(list)
+        for i, key in enumerate(keys):
+            for tok in set(key.split()):
+                tokens[tok].append(i)
+            for gram in _trigrams(key):
+                grams[gram].append(i)
+        common = max(50, int(len(keys) * self.MAX_TOKEN_SHARE))
+        self._tokens = {t: np.asarray(ids, dtype=np.int64) for t, ids in tokens.items() if len(ids) <= common}
+        self._grams = {g: np.asarray(ids, dtype=np.int64) for g, ids in grams.items()}
+
+    def block(self, query_key: str) -> np.ndarray:
+        """Sorted candidate ids for a processed query string."""
+        parts = [self._tokens[t] for t in set(query_key.split()) if t in self._tokens]
+        query_grams = _trigrams(query_key)
+        postings = [self._grams[g] for g in query_grams if g in self._grams]
+        if postings:
+            counts = np.bincount(np.concatenate(postings), minlength=len(self.keys))
+            need = max(1, int(np.ceil(len(query_grams) * self.MIN_TRIGRAM_SHARE)))
+            parts.append(np.flatnonzero(counts >= need))
+        if not parts:
+            return np.empty(0, dtype=np.int64)
+        return np.unique(np.concatenate(parts))
+
+    def best(self, query_key: str, scorer, ids: Optional[np.ndarray] = None) -> Tuple[int, float]:
+        """(entry id, raw score) of the first best-scoring candidate, or (-1, 0.0)."""
+        if ids is None:
+            ids = self.block(query_key)
+        if len(ids) == 0:
+            return -1, 0.0
+        scores = rf_process.cdist(
+            [query_key], [self.keys[i] for i in ids], scorer=scorer, dtype=np.float64
+        )[0]
+        pos = int(np.argmax(scores))
+        return int(ids[pos]), float(scores[pos])
+
+    def best_overall(self, query_key: str, scorer) -> Tuple[int, float]:
+        """Like best() but over every entry (no blocking)."""
+        if not self.keys:
+            return -1, 0.0
+        scores = rf_process.cdist([query_key], self.keys, scorer=scorer, dtype=np.float64, workers=-1)[0]
+        pos = int(np.argmax(scores))
+        return pos, float(scores[pos])
+
+    def top(self, query_key: str, scorer, limit: int) -> List[Tuple[int, float]]:
+        """(entry id, raw score) of the ``limit`` best entries, best first (ties by id),
+        as thefuzz's process.extract ranks them."""
+        return [(i, score) for _, score, i in rf_process.extract(query_key, self.keys, scorer=scorer, limit=limit)]
+
+
+def _initials(choice: str) -> str:
+    words = re.sub(r'[^a-zA-Z0-9 ]', ' ', choice).split()
+    return ''.join(w[0].upper() for w in words if w)
+
+
+class MatchIndex:
+    """Per-run lookup structures over a fixed list of CRM names.
+
+    Build once (MappingService.build_index) and pass to find_best_match /
+    match_many so nothing is re-derived from the CRM names per BCG name: the
+    exact/normalised maps, the processed (thefuzz full_process) keys behind the
+    blocking indexes and the tier-4 candidate ranking, and the initials map used
+    for acronym candidates.
+    """
+
+    # Up to this many choices the low-threshold tier-5 fallback scores the full
+    # list (still one vectorised cdist call) so it matches the unblocked scan.
+    EXHAUSTIVE_FALLBACK_MAX_CHOICES = 20000
+
+    def __init__(self, choices: List[str]):
+        self.choices = list(choices)
+        self.exhaustive_fallback = len(self.choices) <= self.EXHAUSTIVE_FALLBACK_MAX_CHOICES
+        self.lower_map = {str(c).lower(): c for c in self.choices}
+        self.norm_map = {_normalize(c): c for c in self.choices}
+        self.norm_choices = list(self.norm_map.keys())
+        self.raw_index = _BlockIndex([_choice_key(c) for c in self.choices])
+        self.norm_index = _BlockIndex([_choice_key(c) for c in self.norm_choices])
+        # initials -> choice ids, plus the sorted initials for prefix lookups
+        acronyms: Dict[str, List[int]] = defaultdict(list)
+        for i, choice in enumerate(self.choices):
+            if choice is not None:
+                acronyms[_initials(str(choice))].append(i)
+        self.acronyms = dict(acronyms)
+        self._sorted_initials = sorted(self.acronyms)
+
+    def acronym_candidates(self, name: str, limit: int = 5) -> List[str]:
+        """Choices whose initials match `name` (e.g. 'HKM' → 'Huetten- und Kapitalwerk Marxloh'):
+        equal to it, starting with it, or a prefix of it. First `limit` in choice order."""
+        name_up = name.strip().upper().replace(' ', '').replace('.', '')
+        if len(name_up) < 2:
+            return []
+        ids = set()
+        # initials that are a prefix of the name (including the name itself)
+        for end in range(len(name_up) + 1):
+            ids.update(self.acronyms.get(name_up[:end], ()))
+        # initials that start with the name
+        pos = bisect.bisect_left(self._sorted_initials, name_up)
+        while pos < len(self._sorted_initials) and self._sorted_initials[pos].startswith(name_up):
+            ids.update(self.acronyms[self._sorted_initials[pos]])
+            pos += 1
+        return [self.choices[i] for i in sorted(ids)[:limit]]
+
+
+# ── Match cache ───────────────────────────────────────────────────────────────
+
+def crm_set_version(choices: List[str]) -> str:
+    """Digest of the distinct CRM names; cached matches are only valid for the same set."""
+    names = sorted({str(c) for c in choices if c is not None})
+    return hashlib.sha256("\n".join(names).encode("utf-8")).hexdigest()[:16]
+
+
+class MatchCache:
+    """Memo of find_best_match's expensive tiers for one CRM name set.
+
+    Maps a BCG name key (lower-cased, as tier 1 compares) to (crm_name, score, tier).
+    Tier "fallback" is the best fuzzy candidate when no confident tier matched; it is
+    kept whatever its score so the caller's threshold can be applied on a hit, and it
+    counts as a negative result (shorter expiry). ``pending`` collects entries added
+    since loading, for the owner to persist (DataIngestionService.save_match_cache).
+    """
+
+    NEGATIVE_TIER = "fallback"
+
+    def __init__(self, version: str, entries: Optional[Dict[str, Tuple[Optional[str], float, str]]] = None):
+        self.version = version
+        self.entries = dict(entries or {})
+        self.pending: Dict[str, Tuple[Optional[str], float, str]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(name: str) -> str:
+        return str(name).lower()
+
+    def get(self, name: str) -> Optional[Tuple[Optional[str], float, str]]:
+        entry = self.entries.get(self.key(name))
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return entry
+
+    def put(self, name: str, crm_name: Optional[str], score: float, tier: str):
+        entry = (crm_name, float(score), tier)
+        self.entries[self.key(name)] = entry
+        self.pending[self.key(name)] = entry
+
+
 # ── LLM client builder ────────────────────────────────────────────────────────
 def _build_llm_client():
     """Return (client, model) for Azure OpenAI or standard OpenAI, whichever is configured."""
@@ -57,14 +246,154 @@ def _build_llm_client():
     if settings.use_openai:
         try:
             from openai import OpenAI
-            client = OpenAI(api_key=settings.OPENAI_API_KEY, timeout=30.0)
-            return client, "gpt-4o"
+            client = OpenAI(
+                api_key=settings.OPENAI_API_KEY,
+                base_url=settings.OPENAI_BASE_URL or None,
+                timeout=30.0,
+            )
+            return client, settings.OPENAI_MODEL
         except Exception as e:
             logger.warning(f"Standard OpenAI init failed: {e}")
 
     return None, None
 
 
+# ── Batched LLM entity resolution ─────────────────────────────────────────────
+
+_RESOLVER_SYSTEM_PROMPT = (
+    "You are an expert in industrial master data management "
+    "and steel-industry company entity resolution."
+)
+
+# Default rules: strict same-legal-entity matching (find_best_match tier 4)
+SAME_ENTITY_RULES = """1. Decide for each item whether its "target" is the SAME legal entity as one of ITS "candidates".
+2. Account for: abbreviations, legal-form differences (GmbH/AG/Ltd/Oyj/NV/AS),
+   holding-vs-operating company names, national spelling variants.
+3. ONLY match if you are confident they refer to the exact same company.
+4. If matched, set confidence proportional to certainty (70–100)."""
+
+# Looser rules for re-matching poor matches with web context (/api/data/rematch-poor)
+REMATCH_RULES = """1. ONLY match if you are >70% confident the "target" is the SAME legal entity as one of ITS "candidates".
+2. Account for abbreviations, legal suffixes (GmbH/AG/S.A./Ltd), holding vs operating company.
+3. If the target company is a subsidiary/plant of a candidate company, match it.
+4. Use the item's "context" (web search snippets about the target) where it helps."""
+
+
+class BatchEntityResolver:
+    """Resolve many target names, each against its own candidate list, in few LLM calls.
+
+    Items are packed ``batch_size`` to a JSON-mode chat completion and up to
+    ``max_concurrency`` completions run at once. Every item's answer is checked on its
+    own (the matched name must be one of that item's candidates); items with a missing
+    or invalid answer, or whose request failed, are re-packed and retried up to
+    ``max_attempts`` times in total. Works with any OpenAI-compatible client.
+    """
+
+    def __init__(self, client, model: str, batch_size: int = 20, max_concurrency: int = 4, max_attempts: int = 3):
+        self.client = client
+        self.model = model
+        self.batch_size = max(1, batch_size)
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_attempts = max(1, max_attempts)
+
+    def resolve(
+        self,
+        items: List[Tuple[str, List[str]]],
+        rules: str = SAME_ENTITY_RULES,
+        contexts: Optional[Dict[str, str]] = None,
+    ) -> Dict[str, Optional[Tuple[str, float]]]:
+        """Map each target of ``items`` ((target, candidates) pairs) to (matched_name,
+        confidence), or None when the LLM found no match or never answered validly.
+        ``contexts`` optionally adds background text (e.g. web snippets) per target."""
+        entries = {}
+        for target, candidates in items:
+            if target in entries or not candidates:
+                continue
+            entry = {"id": f"t{len(entries) + 1}", "target": target, "candidates": list(candidates)}
+            if contexts and contexts.get(target):
+                entry["context"] = contexts[target]
+            entries[target] = entry
+        results: Dict[str, Optional[Tuple[str, float]]] = {target: None for target, _ in items}
+        pending = list(entries.values())
+        for attempt in range(1, self.max_attempts + 1):
+            if not pending:
+                break
+            batches = [pending[i:i + self.batch_size] for i in range(0, len(pending), self.batch_size)]
+            failed = []
+            with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(batches))) as pool:
+                for batch, (resolved, unresolved) in zip(batches, pool.map(lambda b: self._run_batch(b, rules), batches)):
+                    for entry in batch:
+                        if entry["id"] in resolved:
+                            results[entry["target"]] = resolved[entry["id"]]
+                    failed.extend(unresolved)
+            if failed and attempt < self.max_attempts:
+                logger.info(f"LLM entity resolution: retrying {len(failed)} of {len(pending)} item(s)")
+            pending = failed
+        if pending:
+            logger.warning(f"LLM entity resolution: {len(pending)} item(s) unresolved after {self.max_attempts} attempt(s)")
+        return results
+
+    def _run_batch(self, batch: List[Dict], rules: str) -> Tuple[Dict[str, Optional[Tuple[str, float]]], List[Dict]]:
+        """One completion for ``batch``: ({item id: result}, items to retry)."""
+        prompt = f"""Task: Steel-industry company entity resolution for {len(batch)} independent items.
+Each item has an "id", a "target" company name and its own "candidates" (from CRM);
+some also carry "context" about the target.
+
+Rules:
+{rules}
+
+Items:
+{json.dumps(batch, indent=2, ensure_ascii=False)}
+
+Respond ONLY with JSON containing exactly one result per item:
+{{"results": [{{"id": "<item id>", "match_found": true/false, "matched_name": "<exact string from that item's candidates or null>", "confidence": <0-100>}}]}}"""
+        try:
+            completion = self.client.chat.completions.create(
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": _RESOLVER_SYSTEM_PROMPT},
+                    {"role": "user", "content": prompt},
+                ],
+                response_format={"type": "json_object"},
+                temperature=0,
+            )
+            content = completion.choices[0].message.content
+        except Exception as e:
+            logger.error(f"LLM entity resolution error ({len(batch)} item(s)): {e}")
+            return {}, batch
+        return self._parse_results(content, batch)
+
+    @staticmethod
+    def _parse_results(content: str, batch: List[Dict]) -> Tuple[Dict[str, Optional[Tuple[str, float]]], List[Dict]]:
+        """Validate each item's answer independently; malformed ones go back for retry."""
+        try:
+            payload = json.loads(content or "")
+        except ValueError:
+            return {}, batch
+        answers = payload.get("results") if isinstance(payload, dict) else None
+        by_id = {}
+        for answer in answers if isinstance(answers, list) else []:
+            if isinstance(answer, dict) and "id" in answer:
+                by_id.setdefault(str(answer["id"]), answer)
+
+        resolved, failed = {}, []
+        for entry in batch:
+            answer = by_id.get(entry["id"])
+            if answer is None or not isinstance(answer.get("match_found"), bool):
+                failed.append(entry)
+            elif not answer["match_found"]:
+                resolved[entry["id"]] = None
+            elif answer.get("matched_name") in entry["candidates"]:
+                try:
+                    confidence = float(answer.get("confidence", 85))
+                except (TypeError, ValueError):
+                    confidence = 85.0
+                resolved[entry["id"]] = (answer["matched_name"], confidence)
+            else:
+                failed.append(entry)
+        return resolved, failed
+
+
 class MappingService:
     """Service to map company names between different datasets using AI.
 
@@ -77,6 +406,8 @@ class MappingService:
 
     def __init__(self):
         self.client, self.model = _build_llm_client()
+        self.resolver = self.build_resolver(self.client, self.model) if self.client else None
+        self._last_index: Optional[Tuple[tuple, MatchIndex]] = None
         if self.client:
             logger.info(f"MappingService: LLM ready (model={self.model})")
         else:
@@ -84,11 +415,48 @@ class MappingService:
 
     # ── Public API ──────────────────────────────────────────────────────────────
 
+    @staticmethod
+    def build_resolver(client, model: str) -> BatchEntityResolver:
+        """Batched LLM resolver sized by the LLM_MATCH_* settings."""
+        return BatchEntityResolver(
+            client,
+            model,
+            batch_size=settings.LLM_MATCH_BATCH_SIZE,
+            max_concurrency=settings.LLM_MATCH_CONCURRENCY,
+            max_attempts=settings.LLM_MATCH_MAX_ATTEMPTS,
+        )
+
+    def build_index(self, choices: List[str]) -> MatchIndex:
+        """Build the lookup/blocking index for a list of CRM names."""
+        return MatchIndex(choices)
+
+    def pair_scores(self, left: List[str], right: List[str]) -> List[int]:
+        """thefuzz token_sort_ratio for aligned name pairs, scored in one rapidfuzz batch."""
+        if not left:
+            return []
+        scores = rf_process.cpdist(
+            [_choice_key(v) for v in left],
+            [_choice_key(v) for v in right],
+            scorer=rf_fuzz.token_sort_ratio,
+        )
+        return [int(round(float(score))) for score in scores]
+
+    def _index_for(self, choices: List[str]) -> MatchIndex:
+        """Reuse the last index when called repeatedly with the same choices."""
+        key = tuple(choices)
+        cached = self._last_index
+        if cached is None or cached[0] != key:
+            cached = (key, MatchIndex(choices))
+            self._last_index = cached
+        return cached[1]
+
     def find_best_match(
         self,
         name: str,
         choices: List[str],
         threshold: int = 75,
+        index: Optional[MatchIndex] = None,
+        cache: Optional[MatchCache] = None,
     ) -> Optional[Tuple[str, float]]:
         """
         Return (matched_name, score) or None if no good match found.
@@ -100,135 +468,157 @@ class MappingService:
           3b. Fuzzy token_set_ratio  ≥ 90  → accept without LLM (handles reordered words)
           4. LLM on top-10 fuzzy candidates (if fuzzy ≥ 50 or acronym hit)
           5. Fuzzy fallback if ≥ threshold
+
+        Fuzzy tiers only score the candidate block from `index` (built from
+        `choices` when not supplied). With a `cache` for the same CRM name set,
+        tiers 3–5 (including the LLM call) only run for names it has not seen.
         """
         if not name or not choices:
             return None
+        return self.match_many([name], choices, threshold=threshold, index=index, cache=cache)[name]
 
-        choices_lower = {str(c).lower(): c for c in choices}
+    def match_many(
+        self,
+        names: List[str],
+        choices: List[str],
+        threshold: int = 75,
+        index: Optional[MatchIndex] = None,
+        cache: Optional[MatchCache] = None,
+    ) -> Dict[str, Optional[Tuple[str, float]]]:
+        """find_best_match for many names: {name: (matched_name, score) or None}.
 
-        # ── Tier 1: exact ──────────────────────────────────────────────────────
+        Names that reach tier 4 are resolved together through the batched LLM resolver
+        (a few concurrent JSON-mode requests) instead of one completion per name.
+        """
+        results: Dict[str, Optional[Tuple[str, float]]] = {name: None for name in names if name}
+        if not results or not choices:
+            return results
+
+        index = index or self._index_for(choices)
+        outcomes: Dict[str, Tuple[Optional[str], float, str]] = {}
+        waiting: Dict[str, tuple] = {}
+        for name in results:
+            # ── Tier 1: exact / Tier 2: normalised exact ───────────────────────
+            quick = self._exact_match(name, index)
+            if quick:
+                results[name] = quick
+                continue
+            # ── Tiers 3–5 (memoised in `cache`) ────────────────────────────────
+            cached = cache.get(name) if cache is not None else None
+            if cached is not None:
+                outcomes[name] = cached
+                continue
+            hit, state = self._fuzzy_tiers(name, _normalize(name), index)
+            if hit:
+                outcomes[name] = hit
+            elif state[-1]:
+                waiting[name] = state
+            else:
+                outcomes[name] = self._fallback(index, state)
+
+        if waiting:
+            verdicts = self.resolver.resolve([(name, state[-1]) for name, state in waiting.items()])
+            for name, state in waiting.items():
+                verdict = verdicts.get(name)
+                outcomes[name] = (verdict[0], verdict[1], "llm") if verdict else self._fallback(index, state)
+
+        for name, outcome in outcomes.items():
+            if cache is not None and cache.entries.get(cache.key(name)) is None:
+                cache.put(name, *outcome)
+            crm_name, score, tier = outcome
+            if crm_name is not None and not (tier == MatchCache.NEGATIVE_TIER and score < threshold):
+                results[name] = (crm_name, score)
+        return results
+
+    @staticmethod
+    def _exact_match(name: str, index: MatchIndex) -> Optional[Tuple[str, float]]:
+        """Tier 1 (case-insensitive exact → 100) and tier 2 (normalised exact → 97)."""
         name_lower = str(name).lower()
-        if name_lower in choices_lower:
-            return choices_lower[name_lower], 100.0
-
-        # ── Tier 2: normalised exact ───────────────────────────────────────────
+        if name_lower in index.lower_map:
+            return index.lower_map[name_lower], 100.0
         norm_name = _normalize(name)
-        norm_map = {_normalize(c): c for c in choices}
-        if norm_name and norm_name in norm_map:
-            return norm_map[norm_name], 97.0
+        if norm_name and norm_name in index.norm_map:
+            return index.norm_map[norm_name], 97.0
+        return None
+
+    def _fuzzy_tiers(self, name: str, norm_name: str, index: MatchIndex):
+        """Tiers 3a–3c, then the tier-4 LLM candidate list.
+
+        Returns ((crm_name, score, tier), None) on a confident fuzzy hit, otherwise
+        (None, state) where state ends with the candidate names for the LLM ([] when the
+        LLM is unavailable or has nothing to judge) and feeds _fallback.
+        """
+        choices = index.choices
+        norm_map = index.norm_map
 
         # ── Tier 3a: fuzzy token_sort_ratio ──────────────────────────────────
-        best_match, score = process.extractOne(
-            name, choices, scorer=fuzz.token_sort_ratio
-        )
+        query_key = _query_key(name)
+        block = index.raw_index.block(query_key)
+        best_id, raw_score = index.raw_index.best(query_key, rf_fuzz.token_sort_ratio, block)
+        best_match, score = (choices[best_id] if best_id >= 0 else None), int(round(raw_score))
         if score >= 95:
-            return best_match, float(score)
+            return (best_match, float(score), "token_sort"), None
 
         # ── Tier 3b: fuzzy token_set_ratio (handles word reorder / subset) ───
-        best_set_match, set_score = process.extractOne(
-            name, choices, scorer=fuzz.token_set_ratio
-        )
+        best_id, raw_score = index.raw_index.best(query_key, rf_fuzz.token_set_ratio, block)
+        best_set_match, set_score = (choices[best_id] if best_id >= 0 else None), int(round(raw_score))
         if set_score >= 90:
-            return best_set_match, float(set_score)
+            return (best_set_match, float(set_score), "token_set"), None
 
         # ── Tier 3c: normalised token_sort on cleaned names ───────────────────
-        norm_choices = list(norm_map.keys())
+        norm_choices = index.norm_choices
         if norm_name and norm_choices:
-            best_norm, norm_score = process.extractOne(
-                norm_name, norm_choices, scorer=fuzz.token_sort_ratio
-            )
+            best_id, norm_score = index.norm_index.best(_query_key(norm_name), rf_fuzz.token_sort_ratio)
+            norm_score = int(round(norm_score))
             if norm_score >= 90:
-                return norm_map[best_norm], float(norm_score)
+                return (norm_map[norm_choices[best_id]], float(norm_score), "normalized"), None
 
-        # ── Tier 4: LLM ───────────────────────────────────────────────────────
+        # ── Tier 4: LLM candidates ────────────────────────────────────────────
         # Collect candidates from both scorers for LLM
         fuzzy_score = max(score, set_score)
-        if self.client and fuzzy_score >= 45:
-            candidates = process.extract(
-                name, choices, scorer=fuzz.token_sort_ratio, limit=10
-            )
+        if self.resolver and fuzzy_score < 45:
+            # The block may miss a weak candidate; check the full list before skipping the LLM.
+            for scorer in (rf_fuzz.token_sort_ratio, rf_fuzz.token_set_ratio):
+                _, raw_score = index.raw_index.best_overall(query_key, scorer)
+                if raw_score >= 45:
+                    fuzzy_score = max(fuzzy_score, int(round(raw_score)))
+        if self.resolver and fuzzy_score >= 45:
+            candidates = index.raw_index.top(query_key, rf_fuzz.token_sort_ratio, 10)
             # Also include token_set_ratio candidates
-            candidates_set = process.extract(
-                name, choices, scorer=fuzz.token_set_ratio, limit=5
-            )
+            candidates_set = index.raw_index.top(query_key, rf_fuzz.token_set_ratio, 5)
             candidate_names = list({
-                c[0] for c in (candidates + candidates_set) if c[1] >= 35
+                choices[i] for i, raw in (candidates + candidates_set) if int(round(raw)) >= 35
             })
             # Acronym check: if BCG name looks like initials, try to find full-form
             if not candidate_names or len(name.replace(' ', '')) <= 6:
-                acro_candidates = self._acronym_candidates(name, choices)
+                acro_candidates = index.acronym_candidates(name)
                 candidate_names = list(set(candidate_names) | set(acro_candidates))
-            if candidate_names:
-                llm_result = self._verify_with_llm(name, candidate_names)
-                if llm_result:
-                    return llm_result
-
-        # ── Tier 5 fallback: best fuzzy score if above threshold ──────────────
+            return None, (query_key, best_match, score, best_set_match, set_score, candidate_names)
+
+        return None, (query_key, best_match, score, best_set_match, set_score, [])
+
+    @staticmethod
+    def _fallback(index: MatchIndex, state: tuple) -> Tuple[Optional[str], float, str]:
+        """Tier 5: best fuzzy candidate whatever its score (thresholded by the caller)."""
+        query_key, best_match, score, best_set_match, set_score, _ = state
+        choices = index.choices
+        if index.exhaustive_fallback:
+            best_id, raw_score = index.raw_index.best_overall(query_key, rf_fuzz.token_sort_ratio)
+            best_match, score = choices[best_id], int(round(raw_score))
+            best_id, raw_score = index.raw_index.best_overall(query_key, rf_fuzz.token_set_ratio)
+            best_set_match, set_score = choices[best_id], int(round(raw_score))
         best_overall_match = best_match if score >= set_score else best_set_match
-        best_overall_score = max(score, set_score)
-        if best_overall_score >= threshold:
-            return best_overall_match, float(best_overall_score)
-
-        return None
-
-    def _acronym_candidates(self, name: str, choices: List[str]) -> List[str]:
-        """Find CRM entries whose initials match `name` (e.g. 'HKM' → 'Huetten- und Kapitalwerk Marxloh')."""
-        name_up = name.strip().upper().replace(' ', '').replace('.', '')
-        if len(name_up) < 2:
-            return []
-        matches = []
-        for choice in choices:
-            words = re.sub(r'[^a-zA-Z0-9 ]', ' ', choice).split()
-            initials = ''.join(w[0].upper() for w in words if w)
-            if initials == name_up or initials.startswith(name_up) or name_up.startswith(initials):
-                matches.append(choice)
-        return matches[:5]  # limit to avoid LLM overload
+        return best_overall_match, float(max(score, set_score)), MatchCache.NEGATIVE_TIER
 
     # ── LLM helpers ────────────────────────────────────────────────────────────
 
     def _verify_with_llm(
         self, name: str, candidates: List[str]
     ) -> Optional[Tuple[str, float]]:
-        """Ask the LLM to pick the best candidate for `name`."""
-        prompt = f"""Task: Steel-industry company entity resolution.
-
-Target name: "{name}"
-Candidates (from CRM):
-{json.dumps(candidates, indent=2)}
-
-Rules:
-1. Decide if "{name}" is the SAME legal entity as any candidate.
-2. Account for: abbreviations, legal-form differences (GmbH/AG/Ltd/Oyj/NV/AS),
-   holding-vs-operating company names, national spelling variants.
-3. ONLY match if you are confident they refer to the exact same company.
-4. If matched, set confidence proportional to certainty (70–100).
-
-Respond ONLY with JSON:
-{{"match_found": true/false, "matched_name": "<exact string from candidates or null>", "confidence": <0-100>}}"""
-
-        try:
-            completion = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": (
-                            "You are an expert in industrial master data management "
-                            "and steel-industry company entity resolution."
-                        ),
-                    },
-                    {"role": "user", "content": prompt},
-                ],
-                response_format={"type": "json_object"},
-                temperature=0,
-            )
-            result = json.loads(completion.choices[0].message.content)
-            if result.get("match_found") and result.get("matched_name"):
-                return result["matched_name"], float(result.get("confidence", 85))
-        except Exception as e:
-            logger.error(f"LLM entity resolution error: {e}")
-
-        return None
+        """Ask the LLM to pick the best candidate for `name` (a batch of one)."""
+        if not self.resolver or not candidates:
+            return None
+        return self.resolver.resolve([(name, candidates)]).get(name)
 
 
 # ── Singleton ─────────────────────────────────────────────────────────────────
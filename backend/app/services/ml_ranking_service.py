@@ -32,24 +32,46 @@ class MLRankingService:
     PredictionService, so the app never breaks.
     """
 
-    def __init__(self, db_path: str | Path, model_path: Optional[str | Path] = None):
+    def __init__(
+        self,
+        db_path: str | Path,
+        model_path: Optional[str | Path] = None,
+        feature_store_path: Optional[str | Path] = None,
+    ):
         from app.core.config import settings
+        from app.utils.feature_store import FeatureStore
         self._db_path    = Path(db_path)
         self._model_path = Path(model_path) if model_path else Path(settings.XGB_MODEL_PATH)
         self._model      = None    # lazy
         self._feat_df    = None    # cached feature matrix
+        self._feat_fp    = None    # per-group input fingerprints the cached matrix was built from
+        self._feat_meta  = None    # encoder metadata persisted with the matrix
         self._labels     = None    # cached labels (if available)
+        self._feature_store = FeatureStore(
+            Path(feature_store_path) if feature_store_path else Path(settings.FEATURE_STORE_PATH)
+        )
 
     # ── Public API ────────────────────────────────────────────────────────────
 
     def is_model_available(self) -> bool:
         return self._model_path.exists()
 
+    def _source_db_path(self) -> Path:
+        """Published dataset version behind the configured DB path (see utils/db_versions.py)."""
+        from app.utils.db_versions import current_db_path
+        return current_db_path(self._db_path)
+
     def clear_cache(self) -> None:
-        """Invalidate the cached feature matrix (call after data is reloaded)."""
+        """Invalidate the cached feature matrix (call after data is reloaded).
+
+        The persisted feature store is kept; it is re-validated against the
+        input fingerprints on next use.
+        """
         from app.services.ranking_reranker_service import ranking_reranker_service
-        self._feat_df = None
-        self._labels  = None
+        self._feat_df   = None
+        self._feat_fp   = None
+        self._feat_meta = None
+        self._labels    = None
         ranking_reranker_service.clear_cache()
 
     def load_model(self) -> bool:
@@ -194,6 +216,27 @@ class MLRankingService:
         country_df = _ds.execute_df("SELECT * FROM country_market_features") if "country_market_features" in table_names else pd.DataFrame()
         return company_df, country_df
 
+    def _load_feature_inputs(self) -> Tuple[Optional[pd.DataFrame], ...]:
+        """(bcg_df, crm_df, external_company_df, external_country_df) for feature extraction."""
+        from src.features.feature_engineering import load_external_feature_data, load_raw_data
+
+        # ── Preferred path: reuse the already-open data_service connection ──
+        # data_service holds an exclusive Windows lock on the DB file, so
+        # opening a second connection would fail. Borrowing its connection
+        # avoids that entirely.
+        bcg_df = crm_df = external_company_df = external_country_df = None
+        try:
+            bcg_df, crm_df = self._load_bcg_crm_via_data_service()
+            external_company_df, external_country_df = self._load_external_features_via_data_service()
+        except Exception as shared_err:
+            logger.debug("Thread-safe shared load failed (%s), falling back to file open", shared_err)
+
+        # ── Fallback: open the file directly (works when no Streamlit lock) ─
+        if bcg_df is None:
+            bcg_df, crm_df = load_raw_data(self._source_db_path())
+            external_company_df, external_country_df = load_external_feature_data(self._source_db_path())
+        return bcg_df, crm_df, external_company_df, external_country_df
+
     def retrain_model(self, data_snapshot_id: str = "live_duckdb") -> Dict:
         """
         Retrain XGBoost model on current DuckDB data and persist artifact/metadata.
@@ -201,26 +244,12 @@ class MLRankingService:
         Returns metrics and model paths.
         """
         try:
-            from src.features.feature_engineering import (
-                build_labels,
-                extract_equipment_features,
-                load_external_feature_data,
-                load_raw_data,
-            )
+            from src.features.feature_engineering import build_labels, extract_equipment_features
             from src.models.xgb_ranking_model import XGBPriorityModel
         except Exception as exc:
             raise RuntimeError(f"Training dependencies unavailable: {exc}") from exc
 
-        bcg_df = crm_df = external_company_df = external_country_df = None
-        try:
-            bcg_df, crm_df = self._load_bcg_crm_via_data_service()
-            external_company_df, external_country_df = self._load_external_features_via_data_service()
-        except Exception as shared_err:
-            logger.debug("Thread-safe shared training load failed (%s), falling back to direct open", shared_err)
-
-        if bcg_df is None:
-            bcg_df, crm_df = load_raw_data(self._db_path)
-            external_company_df, external_country_df = load_external_feature_data(self._db_path)
+        bcg_df, crm_df, external_company_df, external_country_df = self._load_feature_inputs()
 
         if bcg_df is None or bcg_df.empty:
             raise RuntimeError("No BCG installed-base data available for retraining")
@@ -309,51 +338,131 @@ class MLRankingService:
 
     # ── Private helpers ───────────────────────────────────────────────────────
 
-    def _get_features(self) -> Optional[pd.DataFrame]:
-        """Lazily extract and cache the feature matrix, reusing the app's open DB connection."""
-        if self._feat_df is not None:
-            return self._feat_df
+    # Tables each feature group reads; their fingerprints key that group's columns
+    # (see FEATURE_GROUPS in src/features/feature_engineering.py). Every group
+    # also depends on "base", i.e. the BCG rows.
+    _FEATURE_SOURCE_TABLES = {
+        "base": ("bcg_installed_base", "bcg_data", "installed_base", "bcg"),
+        "crm": ("crm_data", "crm", "customers", "unified_companies"),
+        "external": ("company_external_features", "country_market_features"),
+    }
+    # Columns added after feature extraction from the BCG city and the IB list
+    _SITE_COLS = ["_site_city", "_last_startup"]
+
+    def _input_fingerprints(self) -> Optional[Dict[str, str]]:
+        """Per-group content fingerprints of the feature inputs (None if unavailable)."""
         try:
-            from src.features.feature_engineering import (
-                extract_equipment_features,
-                load_external_feature_data,
-                load_raw_data,
-            )
+            from app.services.data_service import data_service as _ds
+            from app.services.historical_service import _IB_PATH
+            from app.services.internal_knowledge_service import internal_knowledge_service
+            from app.utils.ingest_cache import file_sha256
+
+            tables = [t for group in self._FEATURE_SOURCE_TABLES.values() for t in group]
+            fps = _ds.get_table_fingerprints(tables)
+
+            def _file_fp(path: Path) -> str:
+                return file_sha256(path) if path.exists() else ""
+
+            out = {
+                group: "|".join(f"{name}={fps.get(name, '')}" for name in names)
+                for group, names in self._FEATURE_SOURCE_TABLES.items()
+            }
+            out["knowledge"] = _file_fp(internal_knowledge_service.manifest_path)
+            out["site"] = _file_fp(_IB_PATH)
+            return out
+        except Exception:
+            return None
 
-            # ── Preferred path: reuse the already-open data_service connection ──
-            # data_service holds an exclusive Windows lock on the DB file, so
-            # opening a second connection would fail. Borrowing its connection
-            # avoids that entirely.
-            bcg_df = crm_df = external_company_df = external_country_df = None
-            try:
-                bcg_df, crm_df = self._load_bcg_crm_via_data_service()
-                external_company_df, external_country_df = self._load_external_features_via_data_service()
-            except Exception as shared_err:
-                logger.debug("Thread-safe shared load failed (%s), falling back to file open", shared_err)
+    @staticmethod
+    def _store_meta(meta: Dict) -> Dict:
+        """JSON-serialisable part of extract_equipment_features' meta (encoder classes)."""
+        return {
+            "feature_columns": list(meta.get("feature_columns", [])),
+            "label_encoders": {
+                name: [str(c) for c in meta[key].classes_]
+                for name, key in (("equipment_type", "le_equipment_type"), ("country", "le_country"))
+                if key in meta
+            },
+            "company_col": meta.get("company_col"),
+        }
+
+    def _add_site_columns(self, feat_df: pd.DataFrame, bcg_df: pd.DataFrame) -> pd.DataFrame:
+        """Add _site_city / _last_startup from the BCG city column and Axel's IB list."""
+        feat_df = feat_df.drop(columns=[c for c in self._SITE_COLS if c in feat_df.columns])
 
-            # ── Fallback: open the file directly (works when no Streamlit lock) ─
-            if bcg_df is None:
-                bcg_df, crm_df = load_raw_data(self._db_path)
-                external_company_df, external_country_df = load_external_feature_data(self._db_path)
+        # Prefer per-row city from BCG so Ranking "Site / City" matches Overview tables.
+        city_col = next((c for c in ["city_internal", "City", "city", "site_name"] if c in bcg_df.columns), None)
+        if city_col is not None:
+            feat_df["_site_city"] = bcg_df[city_col].fillna("").astype(str).to_numpy()
+
+        # ── Enrich with Axel IB location data (site city, last startup) ──
+        return self._enrich_with_ib(feat_df)
+
+    def _get_features(self) -> Optional[pd.DataFrame]:
+        """Lazily extract and cache the feature matrix, reusing the app's open DB connection.
 
+        The matrix is persisted in the feature store. A new process loads it
+        from there; when input fingerprints changed, only the affected feature
+        groups are rebuilt (everything, if the BCG rows changed).
+        """
+        input_fp = self._input_fingerprints()
+        if self._feat_df is not None and (input_fp is None or input_fp == self._feat_fp):
+            return self._feat_df
+        try:
+            from src.features.feature_engineering import build_feature_group, extract_equipment_features
+
+            feat_df, built_fp, store_meta = self._feat_df, self._feat_fp, self._feat_meta
+            if feat_df is None and input_fp is not None:
+                stored = self._feature_store.load()
+                if stored is not None:
+                    feat_df, built_fp, store_meta = stored
+                    if built_fp == input_fp:
+                        logger.info("Loaded %d feature rows from %s", len(feat_df), self._feature_store.path)
+                        self._feat_df, self._feat_fp, self._feat_meta = feat_df, built_fp, store_meta
+                        return self._feat_df
+
+            stale = [
+                group for group in ("base", "crm", "knowledge", "external", "site")
+                if feat_df is None or input_fp is None or (built_fp or {}).get(group) != input_fp[group]
+            ]
+
+            bcg_df, crm_df, external_company_df, external_country_df = self._load_feature_inputs()
             if bcg_df is None or bcg_df.empty:
                 return None
 
-            self._feat_df, _ = extract_equipment_features(
-                bcg_df,
-                crm_df,
-                external_company_df=external_company_df,
-                external_country_df=external_country_df,
-            )
-
-            # Prefer per-row city from BCG so Ranking "Site / City" matches Overview tables.
-            city_col = next((c for c in ["city_internal", "City", "city", "site_name"] if c in bcg_df.columns), None)
-            if city_col is not None:
-                self._feat_df["_site_city"] = bcg_df[city_col].fillna("").astype(str)
+            if "base" in stale or len(feat_df) != len(bcg_df):
+                feat_df, meta = extract_equipment_features(
+                    bcg_df,
+                    crm_df,
+                    external_company_df=external_company_df,
+                    external_country_df=external_country_df,
+                )
+                feat_df = self._add_site_columns(feat_df, bcg_df)
+                store_meta = self._store_meta(meta)
+            else:
+                logger.info("Rebuilding feature groups %s", stale)
+                feat_df = feat_df.copy()
+                for group in stale:
+                    if group == "site":
+                        feat_df = self._add_site_columns(feat_df, bcg_df)
+                        continue
+                    group_df = build_feature_group(
+                        group,
+                        bcg_df,
+                        crm_df,
+                        external_company_df=external_company_df,
+                        external_country_df=external_country_df,
+                    )
+                    for col in group_df.columns:
+                        feat_df[col] = group_df[col].to_numpy()
 
-            # ── Enrich with Axel IB location data (site city, last startup) ──
-            self._feat_df = self._enrich_with_ib(self._feat_df)
+            if input_fp is not None:
+                try:
+                    self._feature_store.save(feat_df, input_fp, store_meta)
+                except Exception as e:
+                    logger.warning("Could not persist feature store: %s", e)
 
+            self._feat_df, self._feat_fp, self._feat_meta = feat_df, input_fp, store_meta
             return self._feat_df
         except Exception as e:
             logger.warning("Feature extraction failed: %s", e)
@@ -451,33 +560,11 @@ class MLRankingService:
         Build a heuristic ranking directly from BCG data.
         Score = age × 3 + sms_oem × 15 + crm_rating × 2  (capped at 100).
         """
-        from src.features.feature_engineering import (
-            extract_equipment_features,
-            load_external_feature_data,
-            load_raw_data,
-        )
         _empty = pd.DataFrame(columns=["rank", "company", "equipment_type",
                                         "country", "equipment_age", "priority_score"])
-        try:
-            bcg_df = crm_df = external_company_df = external_country_df = None
-            try:
-                bcg_df, crm_df = self._load_bcg_crm_via_data_service()
-                external_company_df, external_country_df = self._load_external_features_via_data_service()
-            except Exception:
-                pass
-
-            if bcg_df is None:
-                bcg_df, crm_df = load_raw_data(self._db_path)
-                external_company_df, external_country_df = load_external_feature_data(self._db_path)
-
-            feat_df, _ = extract_equipment_features(
-                bcg_df,
-                crm_df,
-                external_company_df=external_company_df,
-                external_country_df=external_country_df,
-            )
-        except Exception as e:
-            logger.warning("Heuristic fallback data load failed: %s", e)
+        feat_df = self._get_features()
+        if feat_df is None:
+            logger.warning("Heuristic fallback data load failed: no feature matrix")
             return _empty
 
         df = feat_df.copy()
@@ -0,0 +1,155 @@
+"""
+Typed DataFrame -> Arrow conversion for the Excel loaders.
+
+Each source declares the Arrow type of the columns it knows about (see
+DataIngestionService.CRM_SCHEMA / BCG_SCHEMA): categoricals are dictionary
+encoded, identifiers are nullable int64, measures float64 and free text string.
+Every column is converted once, vectorised, straight into Arrow; the resulting
+``pyarrow.Table`` is registered with DuckDB as-is. Undeclared columns keep the
+loaders' previous rules (numbers stay numeric, anything else becomes text).
+
+DuckDB stores dictionary columns as VARCHAR, so SQL sees the same types as
+before; the encoding only shrinks the in-memory tables between parse and write.
+Values of a declared column that do not fit its type are counted per column
+(``mismatches``) and loaded as NULL, so callers can report them before writing.
+"""
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# Low-cardinality text (country, region, equipment type, status, ...)
+CATEGORY = pa.dictionary(pa.int32(), pa.string())
+
+# Text produced by str() of a missing value; treated as NULL like the loaders always did.
+_NULL_TEXT = pa.array(["nan", "None"])
+
+
+def _is_number(dtype: pa.DataType) -> bool:
+    return pa.types.is_integer(dtype) or pa.types.is_floating(dtype) or pa.types.is_boolean(dtype)
+
+
+def _is_text(dtype: pa.DataType) -> bool:
+    return pa.types.is_string(dtype) or pa.types.is_large_string(dtype)
+
+
+def text_array(column) -> pa.ChunkedArray:
+    """Arrow column as string with str() formatting; 'nan'/'None' strings become NULL."""
+    if isinstance(column, pa.Array):
+        column = pa.chunked_array([column])
+    if pa.types.is_dictionary(column.type):
+        column = column.cast(column.type.value_type)
+    if _is_text(column.type):
+        text = column.cast(pa.string())
+    else:
+        text = pa.chunked_array(
+            [pa.array([None if v is None else str(v) for v in column.to_pylist()], type=pa.string())],
+            type=pa.string(),
+        )
+    return pc.if_else(pc.is_in(text, value_set=_NULL_TEXT), pa.scalar(None, pa.string()), text)
+
+
+def _series_text(values: pd.Series) -> pa.ChunkedArray:
+    if not isinstance(values.dtype, pd.StringDtype):
+        values = values.where(values.isna(), values.astype(str))
+    return text_array(pa.array(values, type=pa.string(), from_pandas=True))
+
+
+def _series_numbers(values: pd.Series) -> Tuple[pd.Series, int]:
+    """Numeric view of ``values`` plus the count of non-null values that did not parse."""
+    if pd.api.types.is_bool_dtype(values) or not pd.api.types.is_numeric_dtype(values):
+        parsed = pd.to_numeric(values, errors="coerce")
+        return parsed, int((parsed.isna() & values.notna()).sum())
+    return values, 0
+
+
+def column_array(values: pd.Series, dtype: pa.DataType) -> Tuple[pa.ChunkedArray, int]:
+    """Convert one pandas column to ``dtype``; returns (array, values that did not fit)."""
+    if _is_text(dtype):
+        return _series_text(values), 0
+    if pa.types.is_dictionary(dtype):
+        return _series_text(values).dictionary_encode().cast(dtype), 0
+    numbers, invalid = _series_numbers(values)
+    if pa.types.is_integer(dtype) and not pd.api.types.is_integer_dtype(numbers):
+        numbers = numbers.astype("float64")
+        fractional = numbers.notna() & (numbers % 1 != 0)
+        if fractional.any():
+            invalid += int(fractional.sum())
+            numbers = numbers.mask(fractional)
+    elif not pa.types.is_integer(dtype):
+        numbers = numbers.astype("float64")
+    return pa.chunked_array([pa.array(numbers, from_pandas=True).cast(dtype)]), invalid
+
+
+def _inferred_array(values: pd.Series) -> pa.ChunkedArray:
+    """Undeclared column: Arrow's own inference, text where the values mix types."""
+    if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+        return pa.chunked_array([pa.array(values, from_pandas=True)])
+    try:
+        array = pa.array(values, from_pandas=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return _series_text(values)
+    return pa.chunked_array([array])
+
+
+def to_arrow(
+    df: pd.DataFrame,
+    schema: Dict[str, pa.DataType],
+    mismatches: Optional[Dict[str, int]] = None,
+) -> pa.Table:
+    """DataFrame -> Arrow with declared types for the columns named in ``schema``.
+
+    Non-null values of declared columns that do not fit the type are loaded as NULL and
+    counted into ``mismatches`` (column -> count) when a dict is passed.
+    """
+    arrays = []
+    for position, name in enumerate(df.columns):
+        values = df.iloc[:, position]
+        if name in schema:
+            array, invalid = column_array(values, schema[name])
+            if invalid and mismatches is not None:
+                mismatches[name] = mismatches.get(name, 0) + invalid
+        else:
+            array = _inferred_array(values)
+        arrays.append(array)
+    return pa.Table.from_arrays(arrays, names=[str(name) for name in df.columns])
+
+
+def union_tables(tables: List[pa.Table], schema: Dict[str, pa.DataType]) -> pa.Table:
+    """Union tables by column name (first-seen column order) with one type per column.
+
+    Declared columns take their declared type; undeclared ones are int64 where every
+    table holds integers, float64 where every table holds numbers, otherwise string.
+    Keeps DuckDB from hitting "Type DOUBLE does not match with INTEGER" across sheets.
+    """
+    columns = list(dict.fromkeys(name for table in tables for name in table.column_names))
+    types = [dict(zip(table.schema.names, table.schema.types)) for table in tables]
+
+    targets = {}
+    for name in columns:
+        present = [t[name] for t in types if name in t]
+        if name in schema:
+            targets[name] = schema[name]
+        elif all(pa.types.is_integer(dtype) for dtype in present):
+            targets[name] = pa.int64()
+        elif all(_is_number(dtype) for dtype in present):
+            targets[name] = pa.float64()
+        else:
+            targets[name] = pa.string()
+
+    aligned = []
+    for table, table_types in zip(tables, types):
+        arrays = []
+        for name in columns:
+            target = targets[name]
+            if name not in table_types:
+                arrays.append(pa.nulls(table.num_rows, target))
+            elif table_types[name] == target:
+                arrays.append(table.column(name))
+            elif _is_text(target):
+                arrays.append(text_array(table.column(name)))
+            else:
+                arrays.append(table.column(name).cast(target))
+        aligned.append(pa.Table.from_arrays(arrays, names=columns))
+    return pa.concat_tables(aligned)
@@ -0,0 +1,129 @@
+"""
+Double-buffered DuckDB dataset versions.
+
+The data loader never writes into the database the API is reading. It builds
+the next version in ``db_versions/<stem>-<version>.db`` next to the configured
+DB path and then publishes it by atomically replacing a small pointer file
+(``<db name>.current``). API processes notice the new pointer and reopen on
+the new file; requests already running finish on the old one. Without a
+pointer file the configured DB path itself is the current version, so
+existing single-file installs keep working until their first staged load.
+"""
+import json
+import os
+import re
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+_VERSIONS_DIR = "db_versions"
+
+
+def pointer_path(base: Path) -> Path:
+    base = Path(base)
+    return base.with_name(base.name + ".current")
+
+
+def versions_dir(base: Path) -> Path:
+    return Path(base).parent / _VERSIONS_DIR
+
+
+def read_pointer(base: Path) -> Optional[Dict]:
+    """Published pointer ({"current", "previous", "published_at"}) or None."""
+    try:
+        with open(pointer_path(base), "r", encoding="utf-8") as fh:
+            pointer = json.load(fh)
+    except (OSError, ValueError):
+        return None
+    return pointer if pointer.get("current") else None
+
+
+def current_version(base: Path) -> Optional[str]:
+    """File name of the published version, or None while the plain DB path is in use."""
+    pointer = read_pointer(base)
+    return pointer["current"] if pointer else None
+
+
+def current_db_path(base: Path) -> Path:
+    """Database file API readers should open."""
+    version = current_version(base)
+    return versions_dir(base) / version if version else Path(base)
+
+
+def previous_db_path(base: Path) -> Optional[Path]:
+    """The version published before the current one, if it still exists."""
+    pointer = read_pointer(base)
+    if not pointer:
+        return None
+    previous = versions_dir(base) / pointer["previous"] if pointer.get("previous") else Path(base)
+    return previous if previous.exists() else None
+
+
+def new_version_path(base: Path) -> Path:
+    """Fresh, unpublished file name for the next version."""
+    base = Path(base)
+    stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S")
+    path = versions_dir(base) / f"{base.stem}-{stamp}-{uuid.uuid4().hex[:8]}{base.suffix}"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def publish(base: Path, version_path: Path) -> Dict:
+    """Atomically point readers at ``version_path`` (a closed, checkpointed DB file)."""
+    base = Path(base)
+    previous = read_pointer(base)
+    pointer = {
+        "current": Path(version_path).name,
+        "previous": previous["current"] if previous else None,
+        "published_at": datetime.utcnow().isoformat() + "Z",
+    }
+    target = pointer_path(base)
+    tmp_path = target.with_name(f".{target.name}.{uuid.uuid4().hex[:8]}.tmp")
+    tmp_path.write_text(json.dumps(pointer), encoding="utf-8")
+    # Windows refuses the rename while a reader has the pointer open; retry briefly.
+    for attempt in range(5):
+        try:
+            os.replace(tmp_path, target)
+            break
+        except OSError:
+            if attempt == 4:
+                tmp_path.unlink(missing_ok=True)
+                raise
+            time.sleep(0.1 * (attempt + 1))
+    return pointer
+
+
+def discard(version_path: Path):
+    """Delete an unpublished version and its WAL."""
+    for path in (Path(version_path), Path(f"{version_path}.wal")):
+        try:
+            path.unlink(missing_ok=True)
+        except OSError:
+            pass
+
+
+def prune(base: Path) -> int:
+    """Delete versions other than the current and previous one; returns files removed.
+
+    Files still open by a reader cannot be removed on Windows and are retried next time.
+    """
+    base = Path(base)
+    pointer = read_pointer(base)
+    folder = versions_dir(base)
+    if not pointer or not folder.exists():
+        return 0
+    keep = {pointer["current"], pointer.get("previous")}
+    pattern = re.compile(re.escape(base.stem) + r"-\d{8}T\d{6}-[0-9a-f]{8}" + re.escape(base.suffix) + r"(\.wal)?$")
+    removed = 0
+    for path in folder.iterdir():
+        match = pattern.match(path.name)
+        if not match or path.name[: len(path.name) - len(match.group(1) or "")] in keep:
+            continue
+        try:
+            path.unlink()
+            removed += 1
+        except OSError:
+            pass
+    return removed
@@ -0,0 +1,74 @@
+"""
+Persisted feature matrix for the ranking model.
+
+MLRankingService builds one feature row per BCG equipment row. The matrix is
+written to a single Parquet file together with the per-group input
+fingerprints it was built from and the encoder metadata (see
+``FEATURE_GROUPS`` in src/features/feature_engineering.py). A new process
+memory-maps that file instead of recomputing every feature; when only some
+inputs changed (CRM, internal knowledge, external features, ...) the caller
+rebuilds just those groups' columns and saves the result again.
+
+The file is written to a temp name and swapped in with ``os.replace``, so
+readers never see a partial snapshot. ``VERSION`` is part of the stored
+metadata: bump it whenever feature engineering changes what a column means,
+and existing snapshots are ignored.
+"""
+import json
+import logging
+import os
+import uuid
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from app.utils.ingest_cache import parquet_ready
+
+logger = logging.getLogger(__name__)
+
+_METADATA_KEY = b"feature_store"
+
+
+class FeatureStore:
+    """Single-file Parquet snapshot of a feature matrix, keyed by input fingerprints."""
+
+    VERSION = 1
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+
+    def load(self) -> Optional[Tuple[pd.DataFrame, Dict[str, str], Dict]]:
+        """Return (features, fingerprints, meta), or None if missing, unreadable or outdated."""
+        try:
+            table = pq.read_table(self.path, memory_map=True)
+        except (OSError, pa.ArrowException):
+            return None
+        try:
+            info = json.loads((table.schema.metadata or {}).get(_METADATA_KEY, b"{}"))
+        except ValueError:
+            return None
+        if info.get("version") != self.VERSION:
+            logger.info("Feature store %s has version %s (want %s); ignoring it",
+                        self.path, info.get("version"), self.VERSION)
+            return None
+        return table.to_pandas(), info.get("fingerprints", {}), info.get("meta", {})
+
+    def save(self, df: pd.DataFrame, fingerprints: Dict[str, str], meta: Dict) -> None:
+        """Write *df* with its input fingerprints and JSON-serialisable *meta*."""
+        table = pa.Table.from_pandas(parquet_ready(df))
+        info = {"version": self.VERSION, "fingerprints": fingerprints, "meta": meta}
+        table = table.replace_schema_metadata({
+            **(table.schema.metadata or {}),
+            _METADATA_KEY: json.dumps(info).encode("utf-8"),
+        })
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        staging = self.path.with_name(f".{self.path.name}.{uuid.uuid4().hex[:8]}.tmp")
+        try:
+            pq.write_table(table, staging)
+            os.replace(staging, self.path)
+        finally:
+            staging.unlink(missing_ok=True)
@@ -0,0 +1,269 @@
+"""
+Columnar ingest cache for Excel sources.
+
+The first time a workbook is seen every sheet is parsed once (openpyxl) and
+written to Parquet under ``data/processed/ingest_cache/<stem>-<sha256>/``.
+Later loads of the same file content read the Parquet files through DuckDB's
+``read_parquet`` and never touch openpyxl. The cache key is the SHA-256 of the
+workbook bytes plus the sheet name, so editing the workbook invalidates it.
+"""
+import hashlib
+import json
+import multiprocessing
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import duckdb
+import pandas as pd
+
+_HASH_CHUNK_SIZE = 1024 * 1024
+_MANIFEST = "manifest.json"
+
+# (resolved path) -> (size, mtime_ns, sha256); avoids re-hashing unchanged files.
+_hash_memo: Dict[str, Tuple[int, int, str]] = {}
+_hash_memo_lock = threading.Lock()
+_reader_local = threading.local()
+
+
+def file_sha256(path: Path) -> str:
+    """Streaming SHA-256 of a file, memoised on (size, mtime) for the process lifetime."""
+    path = Path(path)
+    stat = path.stat()
+    key = str(path.resolve())
+    with _hash_memo_lock:
+        memo = _hash_memo.get(key)
+    if memo and memo[0] == stat.st_size and memo[1] == stat.st_mtime_ns:
+        return memo[2]
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(_HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    value = digest.hexdigest()
+    with _hash_memo_lock:
+        _hash_memo[key] = (stat.st_size, stat.st_mtime_ns, value)
+    return value
+
+
+def _sheet_slug(index: int, sheet_name: str) -> str:
+    safe = re.sub(r"[^A-Za-z0-9_-]+", "_", sheet_name).strip("_")[:60]
+    return f"{index:03d}_{safe or 'sheet'}.parquet"
+
+
+def parquet_ready(df: pd.DataFrame) -> pd.DataFrame:
+    """Store mixed-type and all-null object columns as VARCHAR (non-null values -> str)."""
+    names = list(df.columns)
+    if not all(isinstance(c, str) for c in names) or len({c.lower() for c in names}) != len(names):
+        # Parquet/DuckDB would rename these columns; keep such sheets on the Excel path.
+        raise ValueError("sheet has non-string or case-insensitively duplicate column names")
+    out = df
+    for col in df.columns:
+        if df[col].dtype == "object":
+            values = df[col]
+            non_null = values.dropna()
+            if non_null.empty or non_null.map(type).nunique() > 1:
+                if out is df:
+                    out = df.copy()
+                out[col] = values.where(values.isna(), values.astype(str)).astype("string")
+    return out
+
+
+def _sql_literal(path: Path) -> str:
+    return "'" + str(path).replace("'", "''") + "'"
+
+
+def worker_count(tasks: int, max_workers: int = 0) -> int:
+    """Processes to use for ``tasks`` independent sheets (``max_workers`` 0 = CPU count)."""
+    return max(1, min(tasks, max_workers or os.cpu_count() or 1))
+
+
+def process_pool(workers: int) -> ProcessPoolExecutor:
+    """Spawn-based pool: forking a process that holds DuckDB/openpyxl state is not safe."""
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+def _write_sheet_parquet(df: pd.DataFrame, target: Path, con=None):
+    own = con is None
+    con = con or duckdb.connect()
+    try:
+        con.register("_sheet_df", parquet_ready(df))
+        try:
+            con.execute(f"COPY (SELECT * FROM _sheet_df) TO {_sql_literal(target)} (FORMAT PARQUET)")
+        finally:
+            con.unregister("_sheet_df")
+    finally:
+        if own:
+            con.close()
+
+
+def _convert_sheet(source: str, sheet_name: str, target: str) -> Dict:
+    """Process-pool task: parse one sheet and write it to ``target``; returns its manifest entry."""
+    started = time.perf_counter()
+    df = pd.read_excel(source, sheet_name=sheet_name)
+    entry = {"name": sheet_name, "file": None, "rows": int(len(df))}
+    try:
+        _write_sheet_parquet(df, Path(target))
+        entry["file"] = Path(target).name
+    except Exception as e:
+        entry["error"] = str(e)
+    entry["seconds"] = round(time.perf_counter() - started, 3)
+    return entry
+
+
+class ExcelParquetCache:
+    """Per-sheet Parquet cache of Excel workbooks, keyed by file hash and sheet name."""
+
+    def __init__(self, cache_dir: Path, max_workers: int = 0, parallel_min_bytes: int = 0):
+        self.cache_dir = Path(cache_dir)
+        # Sheets of a workbook are handled in up to this many processes (0 = CPU count,
+        # 1 = in-process), but only for workbooks of at least parallel_min_bytes: a spawned
+        # worker costs seconds to start, more than small sheets take to parse.
+        self.max_workers = max_workers
+        self.parallel_min_bytes = parallel_min_bytes
+        self._lock = threading.Lock()
+
+    # ── Public API ────────────────────────────────────────────────────────────
+
+    def sheet_names(self, source: Path) -> List[str]:
+        """Sheet names in workbook order (served from the manifest when cached)."""
+        return [entry["name"] for entry in self._manifest(Path(source))["sheets"]]
+
+    def read_sheet(self, source: Path, sheet_name: Optional[str] = None) -> pd.DataFrame:
+        """Return one sheet as a DataFrame; defaults to the first sheet."""
+        source = Path(source)
+        manifest = self._manifest(source)
+        entries = manifest["sheets"]
+        if not entries:
+            return pd.DataFrame()
+        if sheet_name is None:
+            entry = entries[0]
+        else:
+            entry = next((e for e in entries if e["name"] == sheet_name), None)
+            if entry is None:
+                raise ValueError(f"Worksheet named '{sheet_name}' not found")
+        if not entry.get("file"):
+            # Sheet could not be stored as Parquet; parse it directly.
+            return pd.read_excel(source, sheet_name=entry["name"])
+        return self._read_parquet(self._entry_dir(source, manifest["sha256"]) / entry["file"])
+
+    def parquet_path(self, source: Path, sheet_name: Optional[str] = None) -> Optional[Path]:
+        """Parquet file backing a sheet, or None if that sheet is not cached."""
+        source = Path(source)
+        manifest = self._manifest(source)
+        for i, entry in enumerate(manifest["sheets"]):
+            if (sheet_name is None and i == 0) or entry["name"] == sheet_name:
+                if entry.get("file"):
+                    return self._entry_dir(source, manifest["sha256"]) / entry["file"]
+                return None
+        return None
+
+    def workers_for(self, source: Path, tasks: int) -> int:
+        """Processes to use for ``tasks`` per-sheet jobs on ``source`` (1 = run in-process)."""
+        if tasks < 2 or Path(source).stat().st_size < self.parallel_min_bytes:
+            return 1
+        return worker_count(tasks, self.max_workers)
+
+    # ── Internals ─────────────────────────────────────────────────────────────
+
+    def _entry_dir(self, source: Path, sha256: str) -> Path:
+        return self.cache_dir / f"{source.stem}-{sha256[:16]}"
+
+    def _manifest(self, source: Path) -> Dict:
+        sha256 = file_sha256(source)
+        entry_dir = self._entry_dir(source, sha256)
+        manifest = self._read_manifest(entry_dir, sha256)
+        if manifest is not None:
+            return manifest
+        with self._lock:
+            manifest = self._read_manifest(entry_dir, sha256)
+            if manifest is None:
+                manifest = self._build(source, sha256, entry_dir)
+        return manifest
+
+    @staticmethod
+    def _read_manifest(entry_dir: Path, sha256: str) -> Optional[Dict]:
+        try:
+            with open(entry_dir / _MANIFEST, "r", encoding="utf-8") as fh:
+                manifest = json.load(fh)
+        except (OSError, ValueError):
+            return None
+        return manifest if manifest.get("sha256") == sha256 else None
+
+    def _build(self, source: Path, sha256: str, entry_dir: Path) -> Dict:
+        """Parse every sheet once and write it to Parquet; publish via directory rename."""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        staging = self.cache_dir / f".{entry_dir.name}.{uuid.uuid4().hex[:8]}.tmp"
+        staging.mkdir()
+        try:
+            sheets = self._convert_sheets(source, staging)
+            manifest = {"source": source.name, "sha256": sha256, "sheets": sheets}
+            with open(staging / _MANIFEST, "w", encoding="utf-8") as fh:
+                json.dump(manifest, fh, indent=2)
+
+            try:
+                os.replace(staging, entry_dir)
+            except OSError:
+                # Another process published the same content first.
+                if self._read_manifest(entry_dir, sha256) is None:
+                    raise
+            self._prune(source, keep=entry_dir)
+            return manifest
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+    def _convert_sheets(self, source: Path, staging: Path) -> List[Dict]:
+        """Parquet-convert every sheet into ``staging``; sheets are parsed in parallel processes
+        when there are several workers, otherwise the workbook is opened once in-process."""
+        names = []
+        if self.workers_for(source, 2) > 1:
+            from openpyxl import load_workbook
+
+            workbook = load_workbook(source, read_only=True)
+            try:
+                names = list(workbook.sheetnames)
+            finally:
+                workbook.close()
+        workers = self.workers_for(source, len(names))
+        if workers > 1:
+            with process_pool(workers) as pool:
+                futures = [
+                    pool.submit(_convert_sheet, str(source), name, str(staging / _sheet_slug(i, name)))
+                    for i, name in enumerate(names)
+                ]
+                return [future.result() for future in futures]
+
+        sheets = []
+        frames = pd.read_excel(source, sheet_name=None)
+        with duckdb.connect() as con:
+            for i, (name, df) in enumerate(frames.items()):
+                entry = {"name": name, "file": None, "rows": int(len(df))}
+                try:
+                    target = staging / _sheet_slug(i, name)
+                    _write_sheet_parquet(df, target, con)
+                    entry["file"] = target.name
+                except Exception as e:
+                    entry["error"] = str(e)
+                sheets.append(entry)
+        return sheets
+
+    def _prune(self, source: Path, keep: Path):
+        """Drop cache directories for older versions of the same workbook."""
+        pattern = re.compile(re.escape(source.stem) + r"-[0-9a-f]{16}$")
+        for path in self.cache_dir.iterdir():
+            if path != keep and path.is_dir() and pattern.match(path.name):
+                shutil.rmtree(path, ignore_errors=True)
+
+    @staticmethod
+    def _read_parquet(path: Path) -> pd.DataFrame:
+        # One in-memory DuckDB per thread; connecting per sheet costs more than small reads.
+        con = getattr(_reader_local, "con", None)
+        if con is None:
+            con = _reader_local.con = duckdb.connect()
+        return con.execute(f"SELECT * FROM read_parquet({_sql_literal(path)})").df()
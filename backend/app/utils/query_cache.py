@@ -0,0 +1,207 @@
+"""
+Bounded, thread-safe LRU cache for query results shared by API worker threads.
+
+Entries expire after a per-entry TTL and the least recently used entries are
+evicted once the configured entry count or estimated byte size is exceeded.
+Concurrent misses for the same key are coalesced (single-flight) so the
+underlying DuckDB query runs only once.
+"""
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+import pandas as pd
+
+_MISSING = object()
+# Above this many rows, string payloads are measured on an evenly spaced row sample
+_DEEP_SAMPLE_ROWS = 10_000
+
+
+def _pandas_size(value) -> int:
+    """Deep memory usage of a DataFrame/Series, including the Python strings it holds.
+
+    memory_usage(deep=True) walks every object, so on large frames only the object and
+    string columns (and index) are measured on a row sample and scaled to the full length.
+    """
+    rows = len(value)
+    if rows <= _DEEP_SAMPLE_ROWS:
+        return int(pd.Series(value.memory_usage(index=True, deep=True)).sum())
+    size = int(pd.Series(value.memory_usage(index=True, deep=False)).sum())
+    sample = value.iloc[:: rows // _DEEP_SAMPLE_ROWS]
+    frame = sample.to_frame() if isinstance(sample, pd.Series) else sample
+    strings = frame.select_dtypes(include=["object", "string"])
+    payload = int(strings.memory_usage(index=False, deep=True).sum() - strings.memory_usage(index=False).sum())
+    if sample.index.dtype == object:
+        payload += sample.index.memory_usage(deep=True) - sample.index.memory_usage()
+    return size + int(payload * rows / len(sample))
+
+
+def estimate_size(value: Any) -> int:
+    """Byte estimate used for size-based eviction; counts the strings held by frames."""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return _pandas_size(value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            estimate_size(k) + estimate_size(v) for k, v in value.items()
+        )
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class _Entry:
+    __slots__ = ("value", "size", "expires_at")
+
+    def __init__(self, value: Any, size: int, expires_at: float):
+        self.value = value
+        self.size = size
+        self.expires_at = expires_at
+
+
+class _InFlight:
+    __slots__ = ("event", "value", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error: Optional[BaseException] = None
+
+
+class QueryCache:
+    """LRU cache with TTL, size-based eviction, counters and single-flight loads."""
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 256 * 1024 * 1024, ttl_seconds: float = 300):
+        self.max_entries = max(1, int(max_entries))
+        self.max_bytes = max(1, int(max_bytes))
+        self.ttl_seconds = float(ttl_seconds)
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._inflight: Dict[Hashable, _InFlight] = {}
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self._generation = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._coalesced = 0
+        self._oversized = 0
+
+    # ── Basic operations ──────────────────────────────────────────────────────
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value or *default* if missing / expired."""
+        with self._lock:
+            value = self._lookup(key)
+            if value is _MISSING:
+                self._misses += 1
+                return default
+            self._hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        with self._lock:
+            self._store(key, value, ttl_seconds)
+
+    def clear(self) -> None:
+        """Invalidate all entries. Loads already in flight will not be stored."""
+        with self._lock:
+            self._entries.clear()
+            self._inflight.clear()
+            self._bytes = 0
+            self._generation += 1
+
+    def get_or_compute(self, key: Hashable, loader: Callable[[], Any], ttl_seconds: Optional[float] = None) -> Any:
+        """Return the cached value for *key*, running *loader* once on a miss.
+
+        Threads that miss on a key while another thread is already loading it
+        wait for that result instead of issuing the same query again. Errors
+        raised by *loader* propagate to every waiter and are not cached.
+        """
+        with self._lock:
+            value = self._lookup(key)
+            if value is not _MISSING:
+                self._hits += 1
+                return value
+            self._misses += 1
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = _InFlight()
+                self._inflight[key] = call
+                generation = self._generation
+            else:
+                self._coalesced += 1
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value
+
+        try:
+            call.value = loader()
+            with self._lock:
+                if generation == self._generation:
+                    self._store(key, call.value, ttl_seconds)
+            return call.value
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                if self._inflight.get(key) is call:
+                    del self._inflight[key]
+            call.event.set()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "coalesced": self._coalesced,
+                "oversized_rejections": self._oversized,
+                "in_flight": len(self._inflight),
+            }
+
+    # ── Internal helpers (caller must hold self._lock) ────────────────────────
+
+    def _lookup(self, key: Hashable) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return _MISSING
+        if entry.expires_at <= time.monotonic():
+            self._remove(key)
+            self._expirations += 1
+            return _MISSING
+        self._entries.move_to_end(key)
+        return entry.value
+
+    def _store(self, key: Hashable, value: Any, ttl_seconds: Optional[float]) -> None:
+        size = estimate_size(value)
+        if key in self._entries:
+            self._remove(key)
+        if size > self.max_bytes:
+            self._oversized += 1
+            return
+        ttl = self.ttl_seconds if ttl_seconds is None else float(ttl_seconds)
+        self._entries[key] = _Entry(value, size, time.monotonic() + ttl)
+        self._bytes += size
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self._evictions += 1
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
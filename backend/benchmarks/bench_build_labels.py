@@ -0,0 +1,81 @@
+"""
+Retrain label benchmark: build_labels with a containment index vs per-row scans.
+
+build_labels marks a BCG equipment row positive when its normalised company
+name equals a CRM name or either name contains the other. The previous path
+normalised every equipment row and, for each non-exact name, scanned every CRM
+name in both directions. This benchmark generates BCG equipment rows (several
+per company, mixing CRM variants and unrelated names) against a CRM export,
+and times build_labels against that per-row scan at 1x and 10x scale
+(tests/test_feature_engineering.py asserts the labels are identical).
+
+Run from the backend folder:
+    python benchmarks/bench_build_labels.py [--crm 2000] [--bcg 10000] [--scales 1 10]
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pandas as pd  # noqa: E402
+
+from src.features.feature_engineering import _normalise_name, build_labels  # noqa: E402
+from bench_entity_matching import _company, _variant  # noqa: E402
+
+
+def _legacy_build_labels(bcg_df: pd.DataFrame, crm_df: pd.DataFrame) -> pd.Series:
+    """The previous per-row path: exact lookup, then a scan over every CRM name."""
+    crm_names = set(crm_df["company_name"].dropna().map(_normalise_name))
+
+    def _is_match(raw_name: str) -> int:
+        n = _normalise_name(raw_name)
+        if n in crm_names:
+            return 1
+        for cn in crm_names:
+            if (len(n) >= 4 and n in cn) or (len(cn) >= 4 and cn in n):
+                return 1
+        return 0
+
+    return bcg_df["company_internal"].fillna("").map(_is_match)
+
+
+def _frames(rng: random.Random, crm_size: int, bcg_size: int):
+    crm = list(dict.fromkeys(_company(rng) for _ in range(crm_size)))
+    companies = [_variant(rng, rng.choice(crm)) if rng.random() < 0.5 else _company(rng)
+                 for _ in range(max(1, bcg_size // 4))]
+    bcg = [rng.choice(companies) for _ in range(bcg_size)]
+    return pd.DataFrame({"company_internal": bcg}), pd.DataFrame({"company_name": crm})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--crm", type=int, default=2000, help="CRM names at scale 1")
+    parser.add_argument("--bcg", type=int, default=10000, help="BCG equipment rows at scale 1")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10], help="data size multipliers")
+    parser.add_argument("--legacy-sample", type=int, default=2000, help="BCG rows timed on the per-row path")
+    args = parser.parse_args()
+
+    print(f"{'scale':>6}{'crm':>8}{'bcg rows':>10}{'labels s':>10}{'legacy s':>10}{'speedup':>9}")
+    for scale in args.scales:
+        rng = random.Random(scale)
+        bcg_df, crm_df = _frames(rng, args.crm * scale, args.bcg * scale)
+
+        start = time.perf_counter()
+        build_labels(bcg_df, crm_df)
+        labels_s = time.perf_counter() - start
+
+        # The per-row path is timed on a sample and extrapolated to every row
+        sample = bcg_df.head(args.legacy_sample)
+        start = time.perf_counter()
+        _legacy_build_labels(sample, crm_df)
+        legacy_s = (time.perf_counter() - start) * len(bcg_df) / max(1, len(sample))
+
+        print(f"{scale:>6}{len(crm_df):>8}{len(bcg_df):>10}{labels_s:>10.2f}{legacy_s:>10.1f}"
+              f"{legacy_s / labels_s if labels_s else 0:>8.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Tier-4 (LLM candidate) matching benchmark: prebuilt MatchIndex vs per-call scans.
+
+Names that no fuzzy tier accepts are sent to the LLM with a candidate list:
+the top token_sort / token_set choices plus, for short names, choices whose
+initials match (acronyms). The previous path re-ran thefuzz's full_process
+over every CRM name and re-tokenised every name for initials on each call,
+and rebuilt the lower-case / normalised maps per BCG name. This benchmark runs
+MappingService.match_many with a recording resolver (the LLM never answers, so
+every such name also reaches the fuzzy fallback), times it against that
+per-call path on a sample, and checks results and candidate sets are identical.
+
+Run from the backend folder:
+    python benchmarks/bench_choice_index.py [--queries 500] [--sizes 1000 10000 50000]
+"""
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from thefuzz import fuzz, process  # noqa: E402
+
+from app.services.mapping_service import _normalize, mapping_service  # noqa: E402
+from bench_entity_matching import _company, _variant  # noqa: E402
+
+
+class _RecordingResolver:
+    """Stands in for BatchEntityResolver: records each name's candidates, matches nothing."""
+
+    def __init__(self):
+        self.candidates = {}
+
+    def resolve(self, items, rules=None, contexts=None):
+        self.candidates.update({target: set(candidates) for target, candidates in items})
+        return {}
+
+
+def _acronym(rng: random.Random, name: str) -> str:
+    words = re.sub(r'[^a-zA-Z0-9 ]', ' ', name).split()
+    initials = "".join(w[0].upper() for w in words)
+    return initials[: rng.randint(2, max(2, len(initials)))]
+
+
+def _legacy_match(name, choices, threshold=75):
+    """The previous per-call path: ((crm_name, score) or None, tier-4 candidate set)."""
+    choices_lower = {str(c).lower(): c for c in choices}
+    if str(name).lower() in choices_lower:
+        return (choices_lower[str(name).lower()], 100.0), set()
+    norm_name = _normalize(name)
+    norm_map = {_normalize(c): c for c in choices}
+    if norm_name and norm_name in norm_map:
+        return (norm_map[norm_name], 97.0), set()
+    best_match, score = process.extractOne(name, choices, scorer=fuzz.token_sort_ratio)
+    if score >= 95:
+        return (best_match, float(score)), set()
+    best_set_match, set_score = process.extractOne(name, choices, scorer=fuzz.token_set_ratio)
+    if set_score >= 90:
+        return (best_set_match, float(set_score)), set()
+    if norm_name and norm_map:
+        best_norm, norm_score = process.extractOne(norm_name, list(norm_map), scorer=fuzz.token_sort_ratio)
+        if norm_score >= 90:
+            return (norm_map[best_norm], float(norm_score)), set()
+    candidate_names = set()
+    if max(score, set_score) >= 45:
+        candidates = process.extract(name, choices, scorer=fuzz.token_sort_ratio, limit=10)
+        candidates += process.extract(name, choices, scorer=fuzz.token_set_ratio, limit=5)
+        candidate_names = {c[0] for c in candidates if c[1] >= 35}
+        if not candidate_names or len(name.replace(' ', '')) <= 6:
+            name_up = name.strip().upper().replace(' ', '').replace('.', '')
+            acronyms = []
+            if len(name_up) >= 2:
+                for choice in choices:
+                    words = re.sub(r'[^a-zA-Z0-9 ]', ' ', choice).split()
+                    initials = ''.join(w[0].upper() for w in words if w)
+                    if initials == name_up or initials.startswith(name_up) or name_up.startswith(initials):
+                        acronyms.append(choice)
+            candidate_names |= set(acronyms[:5])
+    best = (best_match, score) if score >= set_score else (best_set_match, set_score)
+    return ((best[0], float(best[1])) if best[1] >= threshold else None), candidate_names
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=500, help="BCG names matched per size")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000], help="CRM name counts")
+    parser.add_argument("--legacy-sample", type=int, default=40, help="queries timed on the per-call path")
+    args = parser.parse_args()
+
+    print(f"{'crm names':>10}{'index s':>10}{'match s':>10}{'ms/query':>10}{'tier-4':>8}"
+          f"{'legacy ms/q':>13}{'speedup':>9}{'agree':>8}")
+    for size in args.sizes:
+        rng = random.Random(size)
+        crm = list(dict.fromkeys(_company(rng) for _ in range(size)))
+        queries = list(dict.fromkeys(
+            _acronym(rng, rng.choice(crm)) if rng.random() < 0.2 else _variant(rng, rng.choice(crm))
+            for _ in range(args.queries)
+        ))
+
+        recorder = _RecordingResolver()
+        mapping_service.resolver = recorder
+        start = time.perf_counter()
+        index = mapping_service.build_index(crm)
+        build_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        results = mapping_service.match_many(queries, crm, index=index)
+        match_s = time.perf_counter() - start
+
+        sample = queries[: args.legacy_sample]
+        start = time.perf_counter()
+        legacy = [_legacy_match(q, crm) for q in sample]
+        legacy_ms = (time.perf_counter() - start) * 1000.0 / max(1, len(sample))
+
+        agree = sum(
+            results[q] == result and recorder.candidates.get(q, set()) == candidates
+            for q, (result, candidates) in zip(sample, legacy)
+        ) / max(1, len(sample))
+        per_query = match_s * 1000.0 / max(1, len(queries))
+        print(f"{len(crm):>10}{build_s:>10.2f}{match_s:>10.2f}{per_query:>10.2f}{len(recorder.candidates):>8}"
+              f"{legacy_ms:>13.1f}{legacy_ms / per_query if per_query else 0:>8.0f}x{agree:>8.0%}")
+
+
+if __name__ == "__main__":
+    main()
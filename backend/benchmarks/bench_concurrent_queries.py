@@ -0,0 +1,82 @@
+"""
+Concurrent dashboard query benchmark.
+
+Fires the uncached queries behind /api/data/plants, /api/data/customers and
+/api/data/stats from 1, 8 and 32 threads and reports p50/p99 latency, once on
+the per-thread cursor pool and once with every call serialised behind a single
+lock (the previous behaviour).
+
+Run from the backend folder against a loaded database:
+    python benchmarks/bench_concurrent_queries.py [--requests 96]
+"""
+import argparse
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.data_service import data_service  # noqa: E402
+
+DASHBOARD_CALLS = [
+    lambda: data_service._query_detailed_plant_data("All", "All", "Europe", "All"),
+    lambda: data_service._query_customer_list("All", "All", "Europe", "All"),
+    lambda: data_service.get_stats(region="Europe"),
+]
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * (len(ordered) - 1)))))
+    return ordered[idx]
+
+
+def _run(concurrency: int, total_requests: int, serialised: bool):
+    gate = threading.Lock()
+    latencies = []
+
+    def _one(i: int):
+        call = DASHBOARD_CALLS[i % len(DASHBOARD_CALLS)]
+        start = time.perf_counter()
+        if serialised:
+            with gate:
+                call()
+        else:
+            call()
+        latencies.append((time.perf_counter() - start) * 1000.0)
+
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(_one, range(total_requests)))
+    wall = time.perf_counter() - wall_start
+    return {
+        "p50": _percentile(latencies, 50),
+        "p99": _percentile(latencies, 99),
+        "mean": statistics.mean(latencies),
+        "throughput": total_requests / wall if wall else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=96, help="requests per concurrency level")
+    args = parser.parse_args()
+
+    data_service.add_log = lambda message: None  # keep benchmark output readable
+    data_service.get_conn()
+    # Warm up schema migration and DuckDB caches.
+    for call in DASHBOARD_CALLS:
+        call()
+
+    print(f"{'mode':<12}{'threads':>8}{'p50 ms':>10}{'p99 ms':>10}{'mean ms':>10}{'req/s':>10}")
+    for concurrency in (1, 8, 32):
+        for mode, serialised in (("single-lock", True), ("cursor-pool", False)):
+            r = _run(concurrency, args.requests, serialised)
+            print(f"{mode:<12}{concurrency:>8}{r['p50']:>10.1f}{r['p99']:>10.1f}{r['mean']:>10.1f}{r['throughput']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+CRM enrichment benchmark: extract_equipment_features' indexed CRM join vs the row loop.
+
+extract_equipment_features adds crm_rating_num / log_fte / crm_projects_count
+by joining BCG companies to CRM names (exact, else first containment match).
+The previous path built the lookup with crm_df.iterrows(), resolved every
+equipment row with a dict lookup plus a linear containment scan, and unpacked
+the result with three .map calls. This benchmark times the full
+extract_equipment_features call against that CRM block alone (timed on a row
+sample and extrapolated) at 1x and 10x scale; tests/test_feature_engineering.py
+asserts the three columns are identical. Internal-knowledge enrichment is
+switched off so document scans stay out of the timings.
+
+Run from the backend folder:
+    python benchmarks/bench_crm_join.py [--crm 2000] [--bcg 10000] [--scales 1 10]
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from app.services.internal_knowledge_service import internal_knowledge_service  # noqa: E402
+from src.features.feature_engineering import (  # noqa: E402
+    _normalise_name,
+    _parse_int,
+    _rating_num,
+    extract_equipment_features,
+)
+from bench_entity_matching import _company, _variant  # noqa: E402
+
+
+def _legacy_crm_columns(bcg_df: pd.DataFrame, crm_df: pd.DataFrame) -> pd.DataFrame:
+    """The previous iterrows lookup + per-row linear containment scan."""
+    crm_lookup = {}
+    for _, row in crm_df.iterrows():
+        crm_lookup[_normalise_name(str(row["company_name"]))] = {
+            "rating": _rating_num(str(row["crm_rating"])),
+            "fte": _parse_int(row["fte"]),
+            "proj_count": _parse_int(row["project_count"]),
+        }
+
+    def _crm_info(raw_name: str) -> dict:
+        n = _normalise_name(raw_name)
+        if n in crm_lookup:
+            return crm_lookup[n]
+        for k, v in crm_lookup.items():
+            if (len(n) >= 4 and n in k) or (len(k) >= 4 and k in n):
+                return v
+        return {"rating": 3, "fte": 0, "proj_count": 0}
+
+    crm_info = bcg_df["company_internal"].fillna("").map(_crm_info)
+    return pd.DataFrame({
+        "crm_rating_num": crm_info.map(lambda x: x["rating"]),
+        "log_fte": crm_info.map(lambda x: np.log1p(x["fte"])),
+        "crm_projects_count": crm_info.map(lambda x: x["proj_count"]),
+    })
+
+
+def _frames(rng: random.Random, crm_size: int, bcg_size: int):
+    crm_names = [_company(rng) for _ in range(crm_size)]
+    crm_df = pd.DataFrame({
+        "company_name": crm_names,
+        "crm_rating": [rng.choice(["A", "B", "C", "D", "E", "", None]) for _ in crm_names],
+        "fte": [rng.choice([str(rng.randint(10, 90000)), "1,250", None, "n/a"]) for _ in crm_names],
+        "project_count": [rng.choice([rng.randint(0, 40), 3.0, None]) for _ in crm_names],
+    })
+    companies = [_variant(rng, rng.choice(crm_names)) if rng.random() < 0.5 else _company(rng)
+                 for _ in range(max(1, bcg_size // 4))]
+    bcg_df = pd.DataFrame({
+        "company_internal": [rng.choice(companies) for _ in range(bcg_size)],
+        "equipment_type": [rng.choice(["EAF", "Hot Strip Mill", "Caster", None]) for _ in range(bcg_size)],
+        "country_internal": [rng.choice(["Germany", "Italy", "India", None]) for _ in range(bcg_size)],
+        "start_year_internal": [rng.choice([rng.randint(1960, 2024), "1998.0", None]) for _ in range(bcg_size)],
+    })
+    return bcg_df, crm_df
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--crm", type=int, default=2000, help="CRM rows at scale 1")
+    parser.add_argument("--bcg", type=int, default=10000, help="BCG equipment rows at scale 1")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10], help="data size multipliers")
+    parser.add_argument("--legacy-sample", type=int, default=1000, help="BCG rows timed on the row-loop path")
+    args = parser.parse_args()
+
+    internal_knowledge_service.build_training_feature_frame = lambda *a, **kw: pd.DataFrame()
+
+    print(f"{'scale':>6}{'crm':>8}{'bcg rows':>10}{'features s':>12}{'legacy crm s':>14}{'speedup':>9}")
+    for scale in args.scales:
+        rng = random.Random(scale)
+        bcg_df, crm_df = _frames(rng, args.crm * scale, args.bcg * scale)
+
+        start = time.perf_counter()
+        extract_equipment_features(bcg_df, crm_df)
+        features_s = time.perf_counter() - start
+
+        # The row loop is timed on a sample and extrapolated to every row
+        sample = bcg_df.head(args.legacy_sample)
+        start = time.perf_counter()
+        _legacy_crm_columns(sample, crm_df)
+        legacy_s = (time.perf_counter() - start) * len(bcg_df) / max(1, len(sample))
+
+        print(f"{scale:>6}{len(crm_df):>8}{len(bcg_df):>10}{features_s:>12.2f}{legacy_s:>14.1f}"
+              f"{legacy_s / features_s if features_s else 0:>8.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+BCG → CRM entity matching benchmark.
+
+Generates synthetic steel-industry company names (1k / 10k / 100k CRM names)
+plus BCG-style query variants (legal-suffix changes, typos, reordered words,
+unrelated names) and times MappingService.find_best_match with a prebuilt
+MatchIndex. The unindexed per-call scan that create_unified_view used before
+is timed on a small query sample and extrapolated.
+
+Run from the backend folder:
+    python benchmarks/bench_entity_matching.py [--queries 1000] [--sizes 1000 10000 100000]
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from thefuzz import fuzz, process  # noqa: E402
+
+from app.services.mapping_service import _normalize, mapping_service  # noqa: E402
+
+_ROOTS = [
+    "acciaierie", "stahl", "hutten", "walzwerk", "metal", "forge", "tube", "wire", "rolling",
+    "siderurgica", "ferro", "iron", "alloy", "steelworks", "coil", "plate", "strip", "foundry",
+    "nordic", "baltic", "alpine", "rhein", "danube", "iberia", "adria", "celtic", "atlas", "vulcan",
+]
+_SUFFIXES = ["GmbH", "AG", "S.p.A.", "SA", "Ltd", "Oy", "AB", "B.V.", "GmbH & Co. KG", "PLC", ""]
+
+
+def _company(rng: random.Random) -> str:
+    words = [rng.choice(_ROOTS).capitalize() for _ in range(rng.randint(1, 3))]
+    words.append(f"{rng.randint(1, 999)}")
+    return " ".join(words + [rng.choice(_SUFFIXES)]).strip()
+
+
+def _variant(rng: random.Random, name: str) -> str:
+    kind = rng.random()
+    words = name.split()
+    if kind < 0.3:
+        words[-1] = rng.choice(_SUFFIXES)  # legal-form change
+    elif kind < 0.55 and len(words) > 2:
+        rng.shuffle(words)  # reordered words
+    elif kind < 0.8:
+        w = rng.randrange(len(words))
+        if len(words[w]) > 3:
+            i = rng.randrange(len(words[w]) - 1)
+            words[w] = words[w][:i] + words[w][i + 1] + words[w][i] + words[w][i + 2:]  # typo
+    else:
+        return _company(rng)  # unrelated name
+    return " ".join(w for w in words if w)
+
+
+def _legacy_find_best_match(name, choices, threshold=75):
+    """The previous per-call scan (fuzzy tiers only, no LLM)."""
+    choices_lower = {str(c).lower(): c for c in choices}
+    if str(name).lower() in choices_lower:
+        return choices_lower[str(name).lower()], 100.0
+    norm_name = _normalize(name)
+    norm_map = {_normalize(c): c for c in choices}
+    if norm_name and norm_name in norm_map:
+        return norm_map[norm_name], 97.0
+    best_match, score = process.extractOne(name, choices, scorer=fuzz.token_sort_ratio)
+    if score >= 95:
+        return best_match, float(score)
+    best_set_match, set_score = process.extractOne(name, choices, scorer=fuzz.token_set_ratio)
+    if set_score >= 90:
+        return best_set_match, float(set_score)
+    if norm_name and norm_map:
+        best_norm, norm_score = process.extractOne(norm_name, list(norm_map), scorer=fuzz.token_sort_ratio)
+        if norm_score >= 90:
+            return norm_map[best_norm], float(norm_score)
+    best = (best_match, score) if score >= set_score else (best_set_match, set_score)
+    return (best[0], float(best[1])) if best[1] >= threshold else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=1000, help="BCG names matched per size")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000], help="CRM name counts")
+    parser.add_argument("--legacy-sample", type=int, default=20, help="queries timed on the unindexed path")
+    args = parser.parse_args()
+
+    mapping_service.resolver = None  # fuzzy tiers only; keep the LLM out of timings
+
+    print(f"{'crm names':>10}{'index s':>10}{'match s':>10}{'ms/query':>10}{'legacy ms/q':>13}{'speedup':>9}{'agree':>8}")
+    for size in args.sizes:
+        rng = random.Random(size)
+        crm = list(dict.fromkeys(_company(rng) for _ in range(size)))
+        queries = [_variant(rng, rng.choice(crm)) for _ in range(args.queries)]
+
+        start = time.perf_counter()
+        index = mapping_service.build_index(crm)
+        build_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        results = [mapping_service.find_best_match(q, crm, index=index) for q in queries]
+        match_s = time.perf_counter() - start
+
+        sample = queries[: args.legacy_sample]
+        start = time.perf_counter()
+        legacy = [_legacy_find_best_match(q, crm) for q in sample]
+        legacy_ms = (time.perf_counter() - start) * 1000.0 / max(1, len(sample))
+
+        agree = sum(a == b for a, b in zip(results, legacy)) / max(1, len(sample))
+        per_query = match_s * 1000.0 / max(1, len(queries))
+        print(f"{len(crm):>10}{build_s:>10.2f}{match_s:>10.2f}{per_query:>10.2f}{legacy_ms:>13.1f}"
+              f"{legacy_ms / per_query if per_query else 0:>8.0f}x{agree:>8.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Feature-engineering micro-benchmarks.
+
+Times the column-level steps of src/features/feature_engineering.py on
+synthetic columns of 10k / 100k / 1M values against the per-value Python
+path it replaced (tests/test_feature_engineering.py asserts both agree):
+
+  parse/<column>   _parse_int_series vs .map(_parse_int) on the year, FTE and
+                   project-count column shapes seen in BCG / CRM exports
+  equipment_age    the vectorised age column vs .apply(max(0, year - _parse_int))
+
+Run from the backend folder:
+    python benchmarks/bench_feature_engineering.py [--sizes 10000 100000 1000000]
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from src.features.feature_engineering import CURRENT_YEAR, _parse_int, _parse_int_series  # noqa: E402
+
+
+def _columns(rng: random.Random, size: int) -> dict:
+    """Year / FTE / project-count shapes: float64, mixed text and int64 columns."""
+    return {
+        "year_float": pd.Series([rng.choice([float(rng.randint(1950, 2025)), np.nan]) for _ in range(size)]),
+        "year_text": pd.Series([rng.choice([str(rng.randint(1950, 2025)), f"{rng.randint(1950, 2025)}.0", None, "unknown"])
+                                for _ in range(size)]),
+        "fte_text": pd.Series([rng.choice([f"{rng.randint(1, 90):,}", str(rng.randint(10, 90000)), None, "n/a"])
+                               for _ in range(size)]),
+        "projects_int": pd.Series([rng.randint(0, 40) for _ in range(size)], dtype="int64"),
+    }
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    out = fn()
+    return out, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000], help="values per column")
+    args = parser.parse_args()
+
+    print(f"{'rows':>9}  {'step':<20}{'vector ms':>11}{'python ms':>11}{'speedup':>9}")
+    for size in args.sizes:
+        rng = random.Random(size)
+        for name, values in _columns(rng, size).items():
+            default = CURRENT_YEAR if name.startswith("year") else 0
+            _, fast_s = _timed(lambda: _parse_int_series(values, default))
+            _, slow_s = _timed(lambda: values.map(lambda v: _parse_int(v, default)))
+            print(f"{size:>9}  {'parse/' + name:<20}{fast_s * 1e3:>11.1f}{slow_s * 1e3:>11.1f}"
+                  f"{slow_s / fast_s if fast_s else 0:>8.0f}x")
+
+        years = _columns(rng, size)["year_text"]
+        _, fast_s = _timed(lambda: (CURRENT_YEAR - _parse_int_series(years, CURRENT_YEAR)).clip(lower=0))
+        _, slow_s = _timed(lambda: years.apply(lambda v: max(0, CURRENT_YEAR - _parse_int(v, CURRENT_YEAR))))
+        print(f"{size:>9}  {'equipment_age':<20}{fast_s * 1e3:>11.1f}{slow_s * 1e3:>11.1f}"
+              f"{slow_s / fast_s if fast_s else 0:>8.0f}x")
+
+
+if __name__ == "__main__":
+    main()
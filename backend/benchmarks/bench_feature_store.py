@@ -0,0 +1,95 @@
+"""
+Ranking feature store benchmark: cold build vs snapshot load vs partial rebuild.
+
+MLRankingService._get_features used to rebuild the whole feature matrix on the
+first call after every process start or clear_cache(). It now persists the
+matrix (plus per-group input fingerprints and encoder metadata) to Parquet,
+memory-maps it in new processes and rebuilds only the feature groups whose
+inputs changed. This benchmark feeds the service synthetic BCG / CRM frames
+and fixed fingerprints, then times:
+
+  cold build      no snapshot: every group is computed and the snapshot written
+  store load      a fresh service instance with unchanged fingerprints
+  crm rebuild     a fresh instance after the CRM fingerprint changed
+
+tests/test_feature_store.py checks the partial rebuild matches a full
+extract_equipment_features run. Internal-knowledge enrichment, the IB list and the recent-signal reranker are
+kept out of the timings.
+
+Run from the backend folder:
+    python benchmarks/bench_feature_store.py [--crm 2000] [--bcg 10000] [--scales 1 10]
+"""
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pandas as pd  # noqa: E402
+
+from app.services.internal_knowledge_service import internal_knowledge_service  # noqa: E402
+from app.services.ml_ranking_service import MLRankingService  # noqa: E402
+from bench_crm_join import _frames  # noqa: E402
+
+
+class _SyntheticRankingService(MLRankingService):
+    """Serves fixed frames and fingerprints instead of reading DuckDB."""
+
+    def __init__(self, store_path: Path, inputs: dict):
+        super().__init__(db_path=store_path.parent / "unused.db", feature_store_path=store_path)
+        self.inputs = inputs
+
+    def _input_fingerprints(self):
+        return dict(self.inputs["fingerprints"])
+
+    def _load_feature_inputs(self):
+        return self.inputs["bcg"], self.inputs["crm"], pd.DataFrame(), pd.DataFrame()
+
+    def _enrich_with_ib(self, feat_df):
+        return feat_df
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    out = fn()
+    return out, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--crm", type=int, default=2000, help="CRM rows at scale 1")
+    parser.add_argument("--bcg", type=int, default=10000, help="BCG equipment rows at scale 1")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10], help="data size multipliers")
+    args = parser.parse_args()
+
+    internal_knowledge_service.build_training_feature_frame = lambda *a, **kw: pd.DataFrame()
+
+    print(f"{'scale':>6}{'bcg rows':>10}{'cold s':>9}{'load s':>9}{'crm rebuild s':>15}")
+    for scale in args.scales:
+        rng = random.Random(scale)
+        bcg_df, crm_df = _frames(rng, args.crm * scale, args.bcg * scale)
+        inputs = {
+            "bcg": bcg_df,
+            "crm": crm_df,
+            "fingerprints": {"base": "b1", "crm": "c1", "knowledge": "", "external": "e1", "site": ""},
+        }
+        with tempfile.TemporaryDirectory() as tmp:
+            store_path = Path(tmp) / "ranking_features.parquet"
+
+            _, cold_s = _timed(lambda: _SyntheticRankingService(store_path, inputs)._get_features())
+            _, load_s = _timed(lambda: _SyntheticRankingService(store_path, inputs)._get_features())
+
+            changed = crm_df.copy()
+            changed["crm_rating"] = changed["crm_rating"].sample(frac=1.0, random_state=scale).to_numpy()
+            inputs["crm"] = changed
+            inputs["fingerprints"]["crm"] = "c2"
+            _, rebuild_s = _timed(lambda: _SyntheticRankingService(store_path, inputs)._get_features())
+
+        print(f"{scale:>6}{len(bcg_df):>10}{cold_s:>9.2f}{load_s:>9.2f}{rebuild_s:>15.2f}")
+
+
+if __name__ == "__main__":
+    main()
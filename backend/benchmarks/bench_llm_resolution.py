@@ -0,0 +1,157 @@
+"""
+Batched LLM entity resolution benchmark against a local fake OpenAI server.
+
+Starts an OpenAI-compatible /v1/chat/completions endpoint on localhost that
+answers BatchEntityResolver prompts (JSON mode) after a simulated latency, and
+can fail whole requests, leave single items out of an answer or answer them with a
+name outside their candidates to exercise the per-item validation and retry
+(tests/test_entity_resolver.py reuses it). Times one-name-per-request serial resolution (what _verify_with_llm
+and /rematch-poor did per BCG name) against packed, concurrent batches and
+checks both resolve every name the same way.
+
+Run from the backend folder:
+    python benchmarks/bench_llm_resolution.py [--names 300] [--batch-size 20] [--concurrency 4]
+        [--latency-ms 400] [--fail-rate 0.1] [--drop-rate 0.05] [--invalid-rate 0.0]
+"""
+import argparse
+import json
+import random
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from openai import OpenAI  # noqa: E402
+
+from app.services.mapping_service import BatchEntityResolver, _normalize  # noqa: E402
+
+_ROOTS = ["acciaierie", "stahl", "hutten", "walzwerk", "ferro", "iron", "alloy", "nordic", "alpine", "vulcan"]
+_SUFFIXES = ["GmbH", "AG", "S.p.A.", "Ltd", "Oy", "AB", ""]
+
+
+def _oracle(item):
+    """The fake model's answer: the candidate with the same suffix-stripped name, if any."""
+    target = _normalize(item["target"])
+    for candidate in item["candidates"]:
+        if _normalize(candidate) == target:
+            return {"id": item["id"], "match_found": True, "matched_name": candidate, "confidence": 90}
+    return {"id": item["id"], "match_found": False, "matched_name": None, "confidence": 0}
+
+
+def _fake_server(latency_s: float, per_item_s: float, fail_rate: float, drop_rate: float, seed: int,
+                 invalid_rate: float = 0.0):
+    rng = random.Random(seed)
+    lock = threading.Lock()
+    stats = {"requests": 0, "failed": 0, "dropped": 0, "invalid": 0}
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            prompt = body["messages"][-1]["content"]
+            items = json.loads(re.search(r"Items:\n(.*?)\n\nRespond", prompt, re.S).group(1))
+            with lock:
+                stats["requests"] += 1
+                fail = rng.random() < fail_rate
+                drops = {item["id"] for item in items if rng.random() < drop_rate}
+                invalid = {item["id"] for item in items if rng.random() < invalid_rate} - drops
+                stats["failed"] += fail
+                stats["dropped"] += len(drops) if not fail else 0
+                stats["invalid"] += len(invalid) if not fail else 0
+            time.sleep(latency_s + per_item_s * len(items))
+            if fail:
+                self.send_response(500)
+                self.end_headers()
+                return
+            results = []
+            for item in items:
+                if item["id"] in drops:
+                    continue  # the model "forgot" this item; the resolver must retry it
+                if item["id"] in invalid:
+                    # A confident match on a name from no candidate list; the resolver must reject it
+                    results.append({"id": item["id"], "match_found": True, "matched_name": "Invented Steel AG", "confidence": 95})
+                    continue
+                results.append(_oracle(item))
+            message = {"role": "assistant", "content": json.dumps({"results": results})}
+            payload = json.dumps({
+                "id": "chatcmpl-fake",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": body.get("model", "fake"),
+                "choices": [{"index": 0, "message": message, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+            }).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, stats
+
+
+def _items(count: int, seed: int):
+    rng = random.Random(seed)
+    items = []
+    for i in range(count):
+        base = f"{rng.choice(_ROOTS).capitalize()} {rng.choice(_ROOTS).capitalize()} {i}"
+        candidates = [f"{base} {rng.choice(_SUFFIXES)}".strip()] if rng.random() < 0.7 else []
+        candidates += [f"{rng.choice(_ROOTS).capitalize()} {rng.randint(1000, 9999)}" for _ in range(9)]
+        rng.shuffle(candidates)
+        items.append((f"{base} {rng.choice(_SUFFIXES)}".strip(), candidates))
+    return items
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--names", type=int, default=300, help="target names to resolve")
+    parser.add_argument("--batch-size", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--latency-ms", type=float, default=400.0, help="fake latency per request")
+    parser.add_argument("--item-ms", type=float, default=20.0, help="fake extra latency per packed item")
+    parser.add_argument("--fail-rate", type=float, default=0.1, help="share of requests answered with HTTP 500")
+    parser.add_argument("--drop-rate", type=float, default=0.05, help="share of items left out of an answer")
+    parser.add_argument("--invalid-rate", type=float, default=0.0, help="share of items answered with a non-candidate")
+    parser.add_argument("--serial-sample", type=int, default=30, help="names timed one request at a time")
+    args = parser.parse_args()
+
+    items = _items(args.names, seed=7)
+    expected = {target: _oracle({"id": "", "target": target, "candidates": cands}) for target, cands in items}
+    expected = {t: (a["matched_name"], 90.0) if a["match_found"] else None for t, a in expected.items()}
+
+    server, stats = _fake_server(args.latency_ms / 1000.0, args.item_ms / 1000.0, args.fail_rate, args.drop_rate, seed=11,
+                                 invalid_rate=args.invalid_rate)
+    client = OpenAI(api_key="fake", base_url=f"http://127.0.0.1:{server.server_port}/v1", max_retries=0)
+    try:
+        serial = BatchEntityResolver(client, "fake", batch_size=1, max_concurrency=1, max_attempts=1)
+        sample = items[: args.serial_sample]
+        start = time.perf_counter()
+        serial.resolve(sample)
+        serial_s = (time.perf_counter() - start) * len(items) / max(1, len(sample))
+
+        batched = BatchEntityResolver(
+            client, "fake", batch_size=args.batch_size, max_concurrency=args.concurrency, max_attempts=5
+        )
+        stats.update(requests=0, failed=0, dropped=0, invalid=0)
+        start = time.perf_counter()
+        results = batched.resolve(items)
+        batched_s = time.perf_counter() - start
+    finally:
+        server.shutdown()
+
+    agree = sum(results[t] == expected[t] for t, _ in items) / max(1, len(items))
+    print(f"{'names':>6}{'serial s (est)':>16}{'batched s':>11}{'speedup':>9}{'requests':>10}{'failed':>8}{'dropped':>9}{'agree':>7}")
+    print(f"{len(items):>6}{serial_s:>16.1f}{batched_s:>11.2f}{serial_s / batched_s if batched_s else 0:>8.0f}x"
+          f"{stats['requests']:>10}{stats['failed']:>8}{stats['dropped']:>9}{agree:>7.0%}")
+
+
+if __name__ == "__main__":
+    main()
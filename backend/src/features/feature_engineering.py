@@ -69,6 +69,46 @@ def _parse_int(val, default: int = 0) -> int:
         return default
 
 
+def _parse_int_series(values: pd.Series, default: int = 0) -> pd.Series:
+    """
+    Column-wise :func:`_parse_int`: same results, parsed with pandas / NumPy.
+
+    Integer columns pass through; floats are truncated toward zero, except
+    those ``str()`` writes in exponent form, which go through ``_parse_int``
+    itself. Anything else is parsed as text with ``pd.to_numeric``, once per
+    distinct value.
+    """
+    if pd.api.types.is_bool_dtype(values.dtype):
+        return pd.Series(default, index=values.index, dtype="int64")
+    if pd.api.types.is_integer_dtype(values.dtype):
+        return values.fillna(default).astype("int64")
+
+    if pd.api.types.is_float_dtype(values.dtype):
+        numbers = values.astype("float64")
+        # repr() switches to exponent notation outside [1e-4, 1e16)
+        plain = numbers.abs().between(1e-4, 1e16, inclusive="left") | (numbers == 0)
+        result = pd.Series(default, index=values.index, dtype="int64")
+        result[plain] = np.trunc(numbers[plain]).astype("int64")
+        odd = ~plain & numbers.notna()
+        if odd.any():
+            result[odd] = values[odd].map(lambda v: _parse_int(v, default))
+        return result
+
+    # Text columns repeat a handful of values: parse each distinct str() once
+    codes, uniques = pd.factorize(values.astype(str))
+    text = pd.Series(uniques, dtype=object).str.replace(",", "", regex=False).str.split(".", n=1).str[0]
+    numbers = pd.to_numeric(text, errors="coerce").to_numpy(dtype="float64")
+    # to_numeric is only exact below 2**53; larger values go through float() like _parse_int
+    exact = np.isfinite(numbers) & (np.abs(numbers) < 2**53)
+    parsed = np.full(len(uniques), default, dtype="int64")
+    parsed[exact] = np.trunc(numbers[exact]).astype("int64")
+    large = np.isfinite(numbers) & ~exact
+    if large.any():
+        parsed[large] = [_parse_int(u, default) for u in uniques[large]]
+    result = np.where(codes >= 0, parsed[codes] if len(parsed) else default, default)
+    return pd.Series(result, index=values.index, dtype="int64")
+
+
 def _normalise_name(name: str) -> str:
     """Lowercase, strip legal suffixes, collapse whitespace."""
     name = str(name).lower()
@@ -77,12 +117,69 @@ def _normalise_name(name: str) -> str:
     return re.sub(r"\s+", " ", name).strip()
 
 
+class _NameContainmentIndex:
+    """
+    Substring lookups over a fixed list of normalised CRM names.
+
+    ``first_match(n)`` returns the position of the first name ``k`` with
+    ``(len(n) >= 4 and n in k) or (len(k) >= 4 and k in n)`` – the fallback
+    rule of the label / CRM-enrichment joins – without scanning every name:
+
+    * ``n in k``: candidates are the names holding the rarest 4-gram of ``n``
+    * ``k in n``: the substrings of ``n`` with a CRM name's length are looked
+      up directly
+
+    Candidates are confirmed with a plain ``in`` check, so results are exact.
+    """
+
+    GRAM = 4
+
+    def __init__(self, names: list[str]):
+        self.names = names
+        self._grams: dict[str, list[int]] = {}
+        self._positions: dict[str, int] = {}
+        for i, name in enumerate(names):
+            if len(name) < self.GRAM:
+                continue
+            for gram in {name[j:j + self.GRAM] for j in range(len(name) - self.GRAM + 1)}:
+                self._grams.setdefault(gram, []).append(i)
+            self._positions.setdefault(name, i)
+        self._lengths = sorted({len(name) for name in self._positions})
+
+    def first_match(self, n: str) -> int:
+        """Position of the first containing / contained name, or -1."""
+        if len(n) < self.GRAM:
+            return -1
+        best = -1
+
+        # CRM name contains n: every such name holds each 4-gram of n
+        postings = [self._grams.get(n[j:j + self.GRAM]) for j in range(len(n) - self.GRAM + 1)]
+        if all(postings):
+            for i in min(postings, key=len):
+                if n in self.names[i]:
+                    best = i
+                    break
+
+        # n contains a CRM name: look each same-length substring of n up
+        for length in self._lengths:
+            if length > len(n):
+                break
+            for j in range(len(n) - length + 1):
+                i = self._positions.get(n[j:j + length], -1)
+                if i != -1 and (best == -1 or i < best):
+                    best = i
+        return best
+
+
 def _normalise_country(value: str) -> str:
     return re.sub(r"\s+", " ", str(value or "").strip().lower())
 
 
+_RATING_SCORES = {"A": 5, "B": 4, "C": 3, "D": 2, "E": 1}
+
+
 def _rating_num(rating: str) -> int:
-    return {"A": 5, "B": 4, "C": 3, "D": 2, "E": 1}.get(str(rating).strip().upper(), 3)
+    return _RATING_SCORES.get(str(rating).strip().upper(), 3)
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -273,20 +370,21 @@ def build_labels(bcg_df: pd.DataFrame, crm_df: pd.DataFrame) -> pd.Series:
         logger.warning("Could not find company columns – all labels 0")
         return pd.Series(0, index=bcg_df.index)
 
-    # Build set of normalised CRM names
-    crm_names: set[str] = set(crm_df[crm_company_col].dropna().map(_normalise_name))
+    # Normalised CRM names, in first-seen order, and a substring index over them
+    crm_names = list(dict.fromkeys(crm_df[crm_company_col].dropna().map(_normalise_name)))
+    crm_name_set = set(crm_names)
+    containment = _NameContainmentIndex(crm_names)
 
-    def _is_match(raw_name: str) -> int:
-        n = _normalise_name(raw_name)
-        if n in crm_names:
+    def _is_match(n: str) -> int:
+        if n in crm_name_set:
             return 1
         # substring: if any CRM name contains the BCG name or vice-versa
-        for cn in crm_names:
-            if (len(n) >= 4 and n in cn) or (len(cn) >= 4 and cn in n):
-                return 1
-        return 0
+        return int(containment.first_match(n) != -1)
 
-    labels = bcg_df[bcg_company_col].fillna("").map(_is_match)
+    # Label each distinct company once, then broadcast to its equipment rows
+    raw_names = bcg_df[bcg_company_col].fillna("")
+    label_by_name = {raw: _is_match(_normalise_name(raw)) for raw in raw_names.unique()}
+    labels = raw_names.map(label_by_name).astype(int)
     pos = labels.sum()
     logger.info(
         "Label distribution: %d positive (%.1f%%) / %d negative",
@@ -299,120 +397,155 @@ def build_labels(bcg_df: pd.DataFrame, crm_df: pd.DataFrame) -> pd.Series:
 # Feature extraction  (equipment-level)
 # ─────────────────────────────────────────────────────────────────────────────
 
-def extract_equipment_features(
-    bcg_df: pd.DataFrame,
-    crm_df: pd.DataFrame,
-    external_company_df: Optional[pd.DataFrame] = None,
-    external_country_df: Optional[pd.DataFrame] = None,
-) -> pd.DataFrame:
-    """
-    Build the feature matrix X (one row per BCG equipment row).
+KNOWLEDGE_FEATURE_COLS = [
+    "knowledge_doc_count",
+    "knowledge_best_match_score",
+    "knowledge_avg_match_score",
+    "knowledge_service_signal",
+    "knowledge_inspection_signal",
+    "knowledge_modernization_signal",
+    "knowledge_digital_signal",
+    "knowledge_decarbonization_signal",
+    "knowledge_project_signal",
+    "knowledge_quality_signal",
+]
+
+# Model columns grouped by the inputs they are derived from. Every group also
+# reads the BCG rows; "crm", "knowledge" and "external" each add one source, so
+# a change to that source only invalidates the group's own columns.
+FEATURE_GROUPS: dict[str, list[str]] = {
+    "base": ["equipment_age", "is_sms_oem", "equipment_type_enc", "country_enc"],
+    "crm": ["crm_rating_num", "log_fte", "crm_projects_count"],
+    "knowledge": KNOWLEDGE_FEATURE_COLS,
+    "external": [*COMPANY_EXTERNAL_FEATURE_COLS, *COUNTRY_MARKET_FEATURE_COLS],
+}
+
+# Metadata columns kept alongside the model columns (not fed to the model)
+META_COLS = ["_company", "_equipment_type", "_country", "_equipment_age"]
+
+
+def _equipment_type_raw(df: pd.DataFrame) -> pd.Series:
+    eq_col = _first_col(df, _EQ_TYPE_COLS)
+    if eq_col:
+        return df[eq_col].fillna("Unknown").str.strip()
+    return pd.Series("Unknown", index=df.index)
 
-    Numeric features
-    ----------------
-    equipment_age           years since installation / commission
-    is_sms_oem              1 if SMS is the OEM / manufacturer
-    crm_rating_num          0-5 rating from CRM match (3 = unknown)
-    crm_projects_count      # projects in CRM for this company (0 = no match)
-    log_fte                 log1p(employees from CRM)
 
-    Encoded categoricals
-    --------------------
-    equipment_type_enc      LabelEncoder on EquipmentType
-    country_enc             LabelEncoder on country / region
-    """
-    df = bcg_df.copy()
+def _country_raw(df: pd.DataFrame) -> pd.Series:
+    country_col = _first_col(df, _COUNTRY_COLS)
+    if country_col:
+        return df[country_col].fillna("Unknown").str.strip()
+    return pd.Series("Unknown", index=df.index)
+
+
+def _base_features(df: pd.DataFrame) -> Tuple[pd.DataFrame, dict]:
+    """Age, OEM flag, encoded equipment type / country and the metadata columns."""
+    out = pd.DataFrame(index=df.index)
 
     # ── Equipment age ─────────────────────────────────────────────────────────
     year_col = _first_col(df, _YEAR_COLS)
     if year_col:
-        df["equipment_age"] = df[year_col].apply(
-            lambda v: max(0, CURRENT_YEAR - _parse_int(v, CURRENT_YEAR))
-        )
+        out["equipment_age"] = (CURRENT_YEAR - _parse_int_series(df[year_col], CURRENT_YEAR)).clip(lower=0)
     else:
-        df["equipment_age"] = 10  # median fallback
+        out["equipment_age"] = 10  # median fallback
 
     # ── OEM flag ─────────────────────────────────────────────────────────────
     oem_col = _first_col(df, _OEM_COLS)
     if oem_col:
-        df["is_sms_oem"] = df[oem_col].fillna("").str.lower().str.contains("sms").astype(int)
+        out["is_sms_oem"] = df[oem_col].fillna("").str.lower().str.contains("sms").astype(int)
     else:
-        df["is_sms_oem"] = 0
-
-    # ── Equipment type (encoded) ──────────────────────────────────────────────
-    eq_col = _first_col(df, _EQ_TYPE_COLS)
-    if eq_col:
-        df["equipment_type_raw"] = df[eq_col].fillna("Unknown").str.strip()
-    else:
-        df["equipment_type_raw"] = "Unknown"
+        out["is_sms_oem"] = 0
 
+    # ── Equipment type / country (encoded) ───────────────────────────────────
+    equipment_type_raw = _equipment_type_raw(df)
     le_eq = LabelEncoder()
-    df["equipment_type_enc"] = le_eq.fit_transform(df["equipment_type_raw"].astype(str))
-
-    # ── Country / region (encoded) ────────────────────────────────────────────
-    country_col = _first_col(df, _COUNTRY_COLS)
-    if country_col:
-        df["country_raw"] = df[country_col].fillna("Unknown").str.strip()
-    else:
-        df["country_raw"] = "Unknown"
+    out["equipment_type_enc"] = le_eq.fit_transform(equipment_type_raw.astype(str))
 
+    country_raw = _country_raw(df)
     le_country = LabelEncoder()
-    df["country_enc"] = le_country.fit_transform(df["country_raw"].astype(str))
+    out["country_enc"] = le_country.fit_transform(country_raw.astype(str))
+
+    company_col = _first_col(df, _COMPANY_COLS)
+    out["_company"]        = df[company_col].fillna("Unknown") if company_col else "Unknown"
+    out["_equipment_type"] = equipment_type_raw
+    out["_country"]        = country_raw
+    out["_equipment_age"]  = out["equipment_age"]
+
+    meta = {
+        "le_equipment_type":  le_eq,
+        "le_country":         le_country,
+        "equipment_type_raw_col": _first_col(df, _EQ_TYPE_COLS),
+        "country_raw_col":    _first_col(df, _COUNTRY_COLS),
+        "company_col":        company_col,
+    }
+    return out, meta
 
-    # ── CRM enrichment (join by normalised name) ──────────────────────────────
+
+def _crm_features(df: pd.DataFrame, crm_df: pd.DataFrame) -> pd.DataFrame:
+    """CRM rating / FTE / project count, joined by normalised company name."""
+    out = pd.DataFrame(index=df.index)
     company_col = _first_col(df, _COMPANY_COLS)
 
-    crm_lookup: dict[str, dict] = {}
+    # One row per normalised CRM name; the last CRM row for a name wins
+    crm_lookup = pd.DataFrame(columns=["rating", "fte", "proj_count"])
+    crm_names: list[str] = []
     if not crm_df.empty:
         crm_company_col = _first_col(crm_df, _COMPANY_COLS)
         crm_rating_col = _first_col(crm_df, _RATING_COLS)
         fte_col = _first_col(crm_df, ["fte", "employees", "headcount"])
         proj_col = _first_col(crm_df, ["project_count", "projects_count", "num_projects"])
 
-        for _, row in crm_df.iterrows():
-            key = _normalise_name(str(row[crm_company_col]) if crm_company_col else "")
-            crm_lookup[key] = {
-                "rating": _rating_num(str(row[crm_rating_col])) if crm_rating_col else 3,
-                "fte": _parse_int(row[fte_col]) if fte_col else 0,
-                "proj_count": _parse_int(row[proj_col]) if proj_col else 0,
-            }
-
-    def _crm_info(raw_name: str) -> dict:
-        n = _normalise_name(raw_name)
-        if n in crm_lookup:
-            return crm_lookup[n]
-        for k, v in crm_lookup.items():
-            if (len(n) >= 4 and n in k) or (len(k) >= 4 and k in n):
-                return v
-        return {"rating": 3, "fte": 0, "proj_count": 0}
+        crm = pd.DataFrame(index=crm_df.index)
+        crm["key"] = (
+            crm_df[crm_company_col].astype(str).map(_normalise_name) if crm_company_col else ""
+        )
+        crm["rating"] = (
+            crm_df[crm_rating_col].astype(str).str.strip().str.upper()
+            .map(_RATING_SCORES).fillna(3).astype(int)
+            if crm_rating_col else 3
+        )
+        crm["fte"] = _parse_int_series(crm_df[fte_col]) if fte_col else 0
+        crm["proj_count"] = _parse_int_series(crm_df[proj_col]) if proj_col else 0
+
+        crm_names = list(crm["key"].unique())
+        crm_lookup = crm.drop_duplicates(subset=["key"], keep="last").set_index("key")
 
     if company_col:
-        crm_info = df[company_col].fillna("").map(_crm_info)
-        df["crm_rating_num"]      = crm_info.map(lambda x: x["rating"])
-        df["log_fte"]             = crm_info.map(lambda x: np.log1p(x["fte"]))
-        df["crm_projects_count"]  = crm_info.map(lambda x: x["proj_count"])
+        # Resolve each distinct company once: exact name, else first containment
+        crm_name_set = set(crm_names)
+        containment = _NameContainmentIndex(crm_names)
+
+        def _crm_key(raw_name: str) -> Optional[str]:
+            n = _normalise_name(raw_name)
+            if n in crm_name_set:
+                return n
+            i = containment.first_match(n)
+            return crm_names[i] if i != -1 else None
+
+        companies = df[company_col].fillna("")
+        key_by_name = {raw: _crm_key(raw) for raw in companies.unique()}
+        crm_info = companies.map(key_by_name).to_frame("_crm_key").merge(
+            crm_lookup, how="left", left_on="_crm_key", right_index=True,
+        )
+        out["crm_rating_num"]      = crm_info["rating"].fillna(3).astype(int).to_numpy()
+        out["log_fte"]             = np.log1p(crm_info["fte"].fillna(0).astype(int).to_numpy())
+        out["crm_projects_count"]  = crm_info["proj_count"].fillna(0).astype(int).to_numpy()
     else:
-        df["crm_rating_num"]     = 3
-        df["log_fte"]            = 0.0
-        df["crm_projects_count"] = 0
-
-    knowledge_feature_cols = [
-        "knowledge_doc_count",
-        "knowledge_best_match_score",
-        "knowledge_avg_match_score",
-        "knowledge_service_signal",
-        "knowledge_inspection_signal",
-        "knowledge_modernization_signal",
-        "knowledge_digital_signal",
-        "knowledge_decarbonization_signal",
-        "knowledge_project_signal",
-        "knowledge_quality_signal",
-    ]
+        out["crm_rating_num"]     = 3
+        out["log_fte"]            = 0.0
+        out["crm_projects_count"] = 0
+    return out
+
+
+def _knowledge_features(df: pd.DataFrame) -> pd.DataFrame:
+    """Internal-knowledge (document manifest) signals per company."""
+    out = pd.DataFrame(0.0, index=df.index, columns=KNOWLEDGE_FEATURE_COLS)
+    company_col = _first_col(df, _COMPANY_COLS)
     try:
         knowledge_input = pd.DataFrame({
             "company": df[company_col].fillna("") if company_col else "",
-            "equipment_type": df["equipment_type_raw"],
-            "country": df["country_raw"],
+            "equipment_type": _equipment_type_raw(df),
+            "country": _country_raw(df),
         })
         knowledge_features = internal_knowledge_service.build_training_feature_frame(
             knowledge_input,
@@ -420,97 +553,118 @@ def extract_equipment_features(
             equipment_col="equipment_type",
             country_col="country",
         )
-        if not knowledge_features.empty:
-            for col in knowledge_feature_cols:
-                df[col] = knowledge_features.get(col, 0.0).astype(float)
-        else:
-            for col in knowledge_feature_cols:
-                df[col] = 0.0
+        for col in KNOWLEDGE_FEATURE_COLS:
+            if col in knowledge_features.columns:
+                out[col] = knowledge_features[col].astype(float).to_numpy()
     except Exception as exc:
         logger.warning("Internal knowledge feature enrichment failed: %s", exc)
-        for col in knowledge_feature_cols:
-            df[col] = 0.0
+        out[:] = 0.0
+    return out
 
-    # ── Stable external enrichment (cached company + country snapshots) ─────
+
+def _external_features(
+    df: pd.DataFrame,
+    external_company_df: Optional[pd.DataFrame],
+    external_country_df: Optional[pd.DataFrame],
+) -> pd.DataFrame:
+    """Stable external enrichment (cached company + country snapshots)."""
+    out = pd.DataFrame(0.0, index=df.index, columns=FEATURE_GROUPS["external"])
     external_company_df = external_company_df if external_company_df is not None else pd.DataFrame()
     external_country_df = external_country_df if external_country_df is not None else pd.DataFrame()
-
-    for col in COMPANY_EXTERNAL_FEATURE_COLS:
-        df[col] = 0.0
-    for col in COUNTRY_MARKET_FEATURE_COLS:
-        df[col] = 0.0
+    company_col = _first_col(df, _COMPANY_COLS)
 
     if company_col and not external_company_df.empty:
         ext_company = external_company_df.copy()
         if "company_name_normalized" not in ext_company.columns and "company_name" in ext_company.columns:
             ext_company["company_name_normalized"] = ext_company["company_name"].map(_normalise_name)
         ext_company = ext_company.drop_duplicates(subset=["company_name_normalized"], keep="first")
-        df["_company_normalized"] = df[company_col].fillna("").map(_normalise_name)
         available_company_cols = [col for col in COMPANY_EXTERNAL_FEATURE_COLS if col in ext_company.columns]
-        renamed_company_cols = {col: f"__{col}" for col in available_company_cols}
-        merge_cols = ["company_name_normalized", *available_company_cols]
-        df = df.merge(
-            ext_company[merge_cols].rename(columns=renamed_company_cols),
-            how="left",
-            left_on="_company_normalized",
-            right_on="company_name_normalized",
+        joined = (
+            df[company_col].fillna("").map(_normalise_name).to_frame("company_name_normalized")
+            .merge(ext_company[["company_name_normalized", *available_company_cols]],
+                   how="left", on="company_name_normalized")
         )
-        for col in COMPANY_EXTERNAL_FEATURE_COLS:
-            temp_col = f"__{col}"
-            if temp_col in df.columns:
-                df[col] = pd.to_numeric(df[temp_col], errors="coerce").fillna(df[col])
-                df = df.drop(columns=[temp_col])
+        for col in available_company_cols:
+            out[col] = pd.to_numeric(joined[col], errors="coerce").fillna(0.0).to_numpy()
 
     if not external_country_df.empty:
         ext_country = external_country_df.copy()
         if "country_normalized" not in ext_country.columns and "country" in ext_country.columns:
             ext_country["country_normalized"] = ext_country["country"].map(_normalise_country)
         ext_country = ext_country.drop_duplicates(subset=["country_normalized"], keep="first")
-        df["_country_normalized"] = df["country_raw"].map(_normalise_country)
         available_country_cols = [col for col in COUNTRY_MARKET_FEATURE_COLS if col in ext_country.columns]
-        renamed_country_cols = {col: f"__{col}" for col in available_country_cols}
-        merge_cols = ["country_normalized", *available_country_cols]
-        df = df.merge(
-            ext_country[merge_cols].rename(columns=renamed_country_cols),
-            how="left",
-            left_on="_country_normalized",
-            right_on="country_normalized",
+        joined = (
+            _country_raw(df).map(_normalise_country).to_frame("country_normalized")
+            .merge(ext_country[["country_normalized", *available_country_cols]],
+                   how="left", on="country_normalized")
         )
-        for col in COUNTRY_MARKET_FEATURE_COLS:
-            temp_col = f"__{col}"
-            if temp_col in df.columns:
-                df[col] = pd.to_numeric(df[temp_col], errors="coerce").fillna(df[col])
-                df = df.drop(columns=[temp_col])
+        for col in available_country_cols:
+            out[col] = pd.to_numeric(joined[col], errors="coerce").fillna(0.0).to_numpy()
 
-    # ── Final feature columns ────────────────────────────────────────────────
-    FEATURE_COLS = [
-        "equipment_age",
-        "is_sms_oem",
-        "equipment_type_enc",
-        "country_enc",
-        "crm_rating_num",
-        "log_fte",
-        "crm_projects_count",
-        *knowledge_feature_cols,
-        *COMPANY_EXTERNAL_FEATURE_COLS,
-        *COUNTRY_MARKET_FEATURE_COLS,
-    ]
-
-    feat_df = df[FEATURE_COLS].copy()
-
-    # Keep metadata columns alongside (not fed to the model)
-    feat_df["_company"]        = df[company_col].fillna("Unknown") if company_col else "Unknown"
-    feat_df["_equipment_type"] = df["equipment_type_raw"]
-    feat_df["_country"]        = df["country_raw"]
-    feat_df["_equipment_age"]  = df["equipment_age"]
+    return out
 
-    meta = {
-        "feature_columns":    FEATURE_COLS,
-        "le_equipment_type":  le_eq,
-        "le_country":         le_country,
-        "equipment_type_raw_col": eq_col,
-        "country_raw_col":    country_col,
-        "company_col":        company_col,
+
+def build_feature_group(
+    group: str,
+    bcg_df: pd.DataFrame,
+    crm_df: Optional[pd.DataFrame] = None,
+    external_company_df: Optional[pd.DataFrame] = None,
+    external_country_df: Optional[pd.DataFrame] = None,
+) -> pd.DataFrame:
+    """
+    Rebuild the columns of one ``FEATURE_GROUPS`` entry for *bcg_df*.
+
+    Used by the feature store to refresh only the groups whose inputs changed;
+    the "base" group also returns the metadata columns (``META_COLS``).
+    """
+    if group == "base":
+        return _base_features(bcg_df)[0]
+    if group == "crm":
+        return _crm_features(bcg_df, crm_df if crm_df is not None else pd.DataFrame())
+    if group == "knowledge":
+        return _knowledge_features(bcg_df)
+    if group == "external":
+        return _external_features(bcg_df, external_company_df, external_country_df)
+    raise ValueError(f"Unknown feature group: {group}")
+
+
+def extract_equipment_features(
+    bcg_df: pd.DataFrame,
+    crm_df: pd.DataFrame,
+    external_company_df: Optional[pd.DataFrame] = None,
+    external_country_df: Optional[pd.DataFrame] = None,
+) -> pd.DataFrame:
+    """
+    Build the feature matrix X (one row per BCG equipment row).
+
+    Numeric features
+    ----------------
+    equipment_age           years since installation / commission
+    is_sms_oem              1 if SMS is the OEM / manufacturer
+    crm_rating_num          0-5 rating from CRM match (3 = unknown)
+    crm_projects_count      # projects in CRM for this company (0 = no match)
+    log_fte                 log1p(employees from CRM)
+
+    Encoded categoricals
+    --------------------
+    equipment_type_enc      LabelEncoder on EquipmentType
+    country_enc             LabelEncoder on country / region
+    """
+    base, meta = _base_features(bcg_df)
+    groups = {
+        "base": base,
+        "crm": _crm_features(bcg_df, crm_df),
+        "knowledge": _knowledge_features(bcg_df),
+        "external": _external_features(bcg_df, external_company_df, external_country_df),
     }
 
+    # ── Final feature columns ────────────────────────────────────────────────
+    FEATURE_COLS = [col for group in FEATURE_GROUPS.values() for col in group]
+
+    feat_df = pd.concat(
+        [groups[name][cols] for name, cols in FEATURE_GROUPS.items()] + [base[META_COLS]],
+        axis=1,
+    )
+    meta = {"feature_columns": FEATURE_COLS, **meta}
+
     return feat_df, meta
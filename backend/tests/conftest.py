@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Run from the backend folder: make `app` / `src` importable without installing.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,103 @@
+"""
+End-to-end data load: run_data_load builds a staged dataset version from
+workbooks cut from the shipped data/processed exports and publishes it.
+"""
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from app.services import data_load_worker
+from app.services.data_service import DataIngestionService
+from app.utils import db_versions
+from app.utils.ingest_cache import ExcelParquetCache
+
+PROCESSED = Path(__file__).resolve().parent.parent / "data" / "processed"
+# Rows taken from each export: enough companies for the matcher to map some CRM names
+SAMPLE_ROWS = 300
+
+
+def _service(tmp_path: Path, data_dir: Path) -> DataIngestionService:
+    svc = DataIngestionService()
+    svc.db_path = tmp_path / "sales_app.db"
+    svc.data_dir = data_dir
+    svc.ingest_cache = ExcelParquetCache(tmp_path / "ingest_cache", max_workers=1)
+    return svc
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    for source, target in (("bcg_export.csv", "bcg_data.xlsx"), ("crm_export.csv", "crm_export.xlsx")):
+        sample = pd.read_csv(PROCESSED / source, nrows=SAMPLE_ROWS, low_memory=False)
+        sample.to_excel(data_dir / target, index=False)
+
+    svc = _service(tmp_path, data_dir)
+    monkeypatch.setattr(data_load_worker, "data_service", svc)
+    yield svc
+    svc.close()
+
+
+def _run(monkeypatch, job_id="job"):
+    progress = {}
+    monkeypatch.setattr(data_load_worker, "save_progress", lambda _job, payload: progress.update(payload))
+    data_load_worker.run_data_load(job_id)
+    return progress
+
+
+def _writable(svc) -> bool:
+    svc._next_version_check = 0.0  # follow the pointer on the next call
+    try:
+        svc.execute_write("CREATE OR REPLACE TABLE _write_probe AS SELECT 1 AS x")
+    except Exception:
+        return False
+    return True
+
+
+def test_full_load_publishes_a_version(service, monkeypatch):
+    progress = _run(monkeypatch)
+
+    assert progress["error"] is None, progress.get("logs")
+    assert progress["step"] == "Complete!"
+    published = db_versions.current_db_path(service.db_path)
+    assert published.exists() and published != service.db_path
+
+    count = service.execute("SELECT COUNT(*) FROM unified_companies").fetchone()[0]
+    assert count > 0
+
+
+@pytest.mark.parametrize("running, writable", [(True, False), (False, True)])
+def test_api_is_writable_again_once_a_failed_load_ends(service, tmp_path, monkeypatch, running, writable):
+    assert _run(monkeypatch, "first")["error"] is None
+    published = db_versions.current_version(service.db_path)
+
+    # The API releases its handle; a loader with no input files discards its staged version
+    service.release_write_access()
+    empty = tmp_path / "empty"
+    empty.mkdir()
+    worker = _service(tmp_path, empty)
+    monkeypatch.setattr(data_load_worker, "data_service", worker)
+    progress = _run(monkeypatch, "failed")
+    worker.close()
+
+    assert progress["error"] and not progress["running"]
+    assert db_versions.current_version(service.db_path) == published
+    monkeypatch.setattr(sys.modules[DataIngestionService.__module__], "get_latest_progress",
+                        lambda: {**progress, "running": running})
+    assert _writable(service) is writable
+
+
+def test_reload_publishes_again_over_a_populated_match_cache(service, monkeypatch):
+    assert _run(monkeypatch, "first")["error"] is None
+    first = db_versions.current_version(service.db_path)
+
+    # Reads on this thread's cursor before the next load, as the API does
+    service.execute("SELECT COUNT(*) FROM unified_companies").fetchone()
+    service.release_write_access()
+
+    progress = _run(monkeypatch, "second")
+    assert progress["error"] is None, progress.get("logs")
+    assert db_versions.current_version(service.db_path) != first
+    assert service.execute("SELECT COUNT(*) FROM unified_companies").fetchone()[0] > 0
@@ -0,0 +1,44 @@
+"""
+DataIngestionService connection handling: per-thread read cursors on one DuckDB file.
+"""
+import pytest
+
+from app.services.data_service import DataIngestionService
+
+
+@pytest.fixture
+def service(tmp_path):
+    svc = DataIngestionService()
+    svc.db_path = tmp_path / "sales_app.db"
+    svc.execute_write("CREATE TABLE t AS SELECT range AS x FROM range(10)")
+    yield svc
+    svc.close()
+
+
+def test_read_retries_on_a_fresh_cursor_after_its_cursor_is_closed(service):
+    assert service.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 10
+
+    # Closed under this thread without bumping the generation it was cached under
+    service._cursor_local.cursor.close()
+    assert service.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 10
+
+
+def test_failed_derived_table_build_is_tried_once_per_connection(service):
+    service.close()
+    service.initialize_database(read_only=True)
+    builds = []
+
+    def build(conn):
+        builds.append(conn)
+        conn.execute("CREATE TABLE derived AS SELECT 1 AS x")
+
+    assert not service._ensure_derived_table("derived", build)
+    assert not service._ensure_derived_table("derived", build)
+    assert len(builds) == 1
+    assert sum("Could not build derived" in line for line in service.get_logs()) == 1
+
+    # A reopened (read-write) handle gets another attempt
+    service.close()
+    service.initialize_database()
+    assert service._ensure_derived_table("derived", build)
+    assert len(builds) == 2
@@ -0,0 +1,80 @@
+"""
+Enrichment queue bookkeeping: only lookups that ran and found nothing use up attempts,
+and failed entries are queued again once ENRICHMENT_FAILED_RETRY_DAYS have passed.
+"""
+import pytest
+
+from app.core.config import settings
+from app.services.data_service import DataIngestionService
+from app.services.enrichment_service import enrichment_service
+
+NAMES = ["Stahl Nord GmbH", "Acciaierie Sud S.p.A.", "Ferro Ost AG"]
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "ENRICHMENT_MAX_ATTEMPTS", 3)
+    svc = DataIngestionService()
+    svc.db_path = tmp_path / "sales_app.db"
+    svc.execute_write("""
+        CREATE TABLE unified_companies AS
+        SELECT unnest(?) AS name, NULL::DOUBLE AS map_latitude, NULL::DOUBLE AS map_longitude,
+               NULL::VARCHAR AS country, NULL::VARCHAR AS company_ceo, NULL::DOUBLE AS fte_count
+    """, [NAMES])
+    yield svc
+    svc.close()
+
+
+def _lookup(monkeypatch, found=None, raises=False):
+    """Stand-in for enrich_locations with a configured client."""
+    def enrich_locations(names, failed=None):
+        if raises:
+            failed.update(names)
+            return {}
+        return {name: data for name, data in (found or {}).items() if name in names}
+    monkeypatch.setattr(enrichment_service, "client", object())
+    monkeypatch.setattr(enrichment_service, "enrich_locations", enrich_locations)
+
+
+def _queue(svc):
+    return dict(
+        (name, (status, attempts)) for name, status, attempts in
+        svc.execute("SELECT name, status, attempts FROM enrichment_queue WHERE kind = 'geo'").fetchall()
+    )
+
+
+def test_queue_is_untouched_without_an_llm_client(service, monkeypatch):
+    monkeypatch.setattr(enrichment_service, "client", None)
+    assert service.enqueue_enrichment("geo") == len(NAMES)
+
+    for _ in range(settings.ENRICHMENT_MAX_ATTEMPTS + 1):
+        assert service.process_enrichment_queue("geo") == 0
+    assert set(_queue(service).values()) == {("pending", 0)}
+
+
+def test_lookup_errors_do_not_use_up_attempts(service, monkeypatch):
+    _lookup(monkeypatch, raises=True)
+    service.enqueue_enrichment("geo")
+
+    for _ in range(settings.ENRICHMENT_MAX_ATTEMPTS + 1):
+        service.process_enrichment_queue("geo")
+    assert set(_queue(service).values()) == {("pending", 0)}
+
+
+def test_not_found_fails_after_max_attempts_and_is_requeued_after_the_ttl(service, monkeypatch):
+    _lookup(monkeypatch, found={NAMES[0]: {"latitude": 51.2, "longitude": 6.8, "country": "Germany"}})
+    service.enqueue_enrichment("geo")
+
+    for _ in range(settings.ENRICHMENT_MAX_ATTEMPTS):
+        service.process_enrichment_queue("geo")
+    queue = _queue(service)
+    assert queue[NAMES[0]] == ("done", 1)
+    assert queue[NAMES[1]] == queue[NAMES[2]] == ("failed", settings.ENRICHMENT_MAX_ATTEMPTS)
+
+    monkeypatch.setattr(settings, "ENRICHMENT_FAILED_RETRY_DAYS", 30)
+    assert service.enqueue_enrichment("geo") == 0
+    service.execute_write("UPDATE enrichment_queue SET updated_at = updated_at - INTERVAL 31 DAY")
+    assert service.enqueue_enrichment("geo") == 2
+    queue = _queue(service)
+    assert queue[NAMES[1]] == queue[NAMES[2]] == ("pending", 0)
+    assert queue[NAMES[0]] == ("done", 1)
@@ -0,0 +1,153 @@
+"""
+MappingService BCG -> CRM matching over a prebuilt MatchIndex returns what the
+unindexed thefuzz scan it replaced returns, on a few hundred synthetic names,
+and sends the same tier-4 (LLM) candidate lists.
+"""
+import random
+import re
+
+import pytest
+from thefuzz import fuzz, process
+
+from app.services.mapping_service import _normalize, mapping_service
+
+_ROOTS = [
+    "acciaierie", "stahl", "hutten", "walzwerk", "metal", "forge", "tube", "wire", "rolling",
+    "siderurgica", "ferro", "iron", "alloy", "steelworks", "coil", "plate", "strip", "foundry",
+]
+_SUFFIXES = ["GmbH", "AG", "S.p.A.", "SA", "Ltd", "Oy", "B.V.", "GmbH & Co. KG", "PLC", ""]
+
+
+def _company(rng: random.Random) -> str:
+    words = [rng.choice(_ROOTS).capitalize() for _ in range(rng.randint(1, 3))]
+    words.append(f"{rng.randint(1, 999)}")
+    return " ".join(words + [rng.choice(_SUFFIXES)]).strip()
+
+
+def _variant(rng: random.Random, name: str) -> str:
+    """A BCG-style spelling of a CRM name: legal-form change, reordering, typo or unrelated name."""
+    kind = rng.random()
+    words = name.split()
+    if kind < 0.3:
+        words[-1] = rng.choice(_SUFFIXES)
+    elif kind < 0.55 and len(words) > 2:
+        rng.shuffle(words)
+    elif kind < 0.8:
+        w = rng.randrange(len(words))
+        if len(words[w]) > 3:
+            i = rng.randrange(len(words[w]) - 1)
+            words[w] = words[w][:i] + words[w][i + 1] + words[w][i] + words[w][i + 2:]
+    else:
+        return _company(rng)
+    return " ".join(w for w in words if w)
+
+
+def _names(seed: int, crm_size: int = 400, queries: int = 300):
+    rng = random.Random(seed)
+    crm = list(dict.fromkeys(_company(rng) for _ in range(crm_size)))
+    return crm, [_variant(rng, rng.choice(crm)) for _ in range(queries)]
+
+
+def _acronym(rng: random.Random, name: str) -> str:
+    words = re.sub(r'[^a-zA-Z0-9 ]', ' ', name).split()
+    initials = "".join(w[0].upper() for w in words)
+    return initials[: rng.randint(2, max(2, len(initials)))]
+
+
+def _legacy_find_best_match(name, choices, threshold=75):
+    """The previous per-call scan (fuzzy tiers only, no LLM)."""
+    choices_lower = {str(c).lower(): c for c in choices}
+    if str(name).lower() in choices_lower:
+        return choices_lower[str(name).lower()], 100.0
+    norm_name = _normalize(name)
+    norm_map = {_normalize(c): c for c in choices}
+    if norm_name and norm_name in norm_map:
+        return norm_map[norm_name], 97.0
+    best_match, score = process.extractOne(name, choices, scorer=fuzz.token_sort_ratio)
+    if score >= 95:
+        return best_match, float(score)
+    best_set_match, set_score = process.extractOne(name, choices, scorer=fuzz.token_set_ratio)
+    if set_score >= 90:
+        return best_set_match, float(set_score)
+    if norm_name and norm_map:
+        best_norm, norm_score = process.extractOne(norm_name, list(norm_map), scorer=fuzz.token_sort_ratio)
+        if norm_score >= 90:
+            return norm_map[best_norm], float(norm_score)
+    best = (best_match, score) if score >= set_score else (best_set_match, set_score)
+    return (best[0], float(best[1])) if best[1] >= threshold else None
+
+
+@pytest.mark.parametrize("seed", [1, 2])
+@pytest.mark.parametrize("threshold", [75, 60])
+def test_indexed_find_best_match_matches_the_full_scan(monkeypatch, seed, threshold):
+    monkeypatch.setattr(mapping_service, "resolver", None)  # fuzzy tiers only
+    crm, queries = _names(seed)
+    index = mapping_service.build_index(crm)
+
+    for query in queries:
+        expected = _legacy_find_best_match(query, crm, threshold)
+        assert mapping_service.find_best_match(query, crm, threshold=threshold, index=index) == expected, query
+
+
+class _RecordingResolver:
+    """Stands in for BatchEntityResolver: records each name's candidates, matches nothing."""
+
+    def __init__(self):
+        self.candidates = {}
+
+    def resolve(self, items, rules=None, contexts=None):
+        self.candidates.update({target: set(candidates) for target, candidates in items})
+        return {}
+
+
+def _legacy_tier4_candidates(name, choices):
+    """The previous per-call tier-4 candidate list: top fuzzy choices plus initials matches."""
+    if str(name).lower() in {str(c).lower() for c in choices}:
+        return set()
+    norm_name = _normalize(name)
+    norm_map = {_normalize(c): c for c in choices}
+    if norm_name and norm_name in norm_map:
+        return set()
+    score = process.extractOne(name, choices, scorer=fuzz.token_sort_ratio)[1]
+    if score >= 95:
+        return set()
+    set_score = process.extractOne(name, choices, scorer=fuzz.token_set_ratio)[1]
+    if set_score >= 90:
+        return set()
+    if norm_name and norm_map and process.extractOne(norm_name, list(norm_map), scorer=fuzz.token_sort_ratio)[1] >= 90:
+        return set()
+    candidate_names = set()
+    if max(score, set_score) >= 45:
+        candidates = process.extract(name, choices, scorer=fuzz.token_sort_ratio, limit=10)
+        candidates += process.extract(name, choices, scorer=fuzz.token_set_ratio, limit=5)
+        candidate_names = {c[0] for c in candidates if c[1] >= 35}
+        if not candidate_names or len(name.replace(' ', '')) <= 6:
+            name_up = name.strip().upper().replace(' ', '').replace('.', '')
+            acronyms = []
+            if len(name_up) >= 2:
+                for choice in choices:
+                    words = re.sub(r'[^a-zA-Z0-9 ]', ' ', choice).split()
+                    initials = ''.join(w[0].upper() for w in words if w)
+                    if initials == name_up or initials.startswith(name_up) or name_up.startswith(initials):
+                        acronyms.append(choice)
+            candidate_names |= set(acronyms[:5])
+    return candidate_names
+
+
+@pytest.mark.parametrize("seed", [1, 2])
+def test_match_many_sends_the_same_tier4_candidates(monkeypatch, seed):
+    rng = random.Random(seed)
+    crm = list(dict.fromkeys(_company(rng) for _ in range(400)))
+    queries = list(dict.fromkeys(
+        _acronym(rng, rng.choice(crm)) if rng.random() < 0.3 else _variant(rng, rng.choice(crm))
+        for _ in range(300)
+    ))
+    recorder = _RecordingResolver()
+    monkeypatch.setattr(mapping_service, "resolver", recorder)
+
+    results = mapping_service.match_many(queries, crm, index=mapping_service.build_index(crm))
+
+    assert recorder.candidates, "no name reached tier 4"
+    for query in queries:
+        assert results[query] == _legacy_find_best_match(query, crm), query
+        assert recorder.candidates.get(query, set()) == _legacy_tier4_candidates(query, crm), query
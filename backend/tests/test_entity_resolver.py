@@ -0,0 +1,79 @@
+"""
+BatchEntityResolver against the local fake OpenAI server from
+benchmarks/bench_llm_resolution.py: per-item validation, per-item retry and
+agreement with one-name-per-request resolution.
+"""
+import pytest
+from openai import OpenAI
+
+from app.services.mapping_service import BatchEntityResolver
+from benchmarks.bench_llm_resolution import _fake_server, _items, _oracle
+
+NAMES = 60
+BATCH_SIZE = 20
+
+
+@pytest.fixture
+def serve():
+    servers = []
+
+    def start(fail_rate=0.0, drop_rate=0.0, invalid_rate=0.0):
+        server, stats = _fake_server(0.0, 0.0, fail_rate, drop_rate, seed=11, invalid_rate=invalid_rate)
+        servers.append(server)
+        client = OpenAI(api_key="fake", base_url=f"http://127.0.0.1:{server.server_port}/v1", max_retries=0)
+        return client, stats
+
+    yield start
+    for server in servers:
+        server.shutdown()
+
+
+def _expected(items):
+    answers = {target: _oracle({"id": "", "target": target, "candidates": cands}) for target, cands in items}
+    return {t: (a["matched_name"], 90.0) if a["match_found"] else None for t, a in answers.items()}
+
+
+def _resolver(client, max_attempts, batch_size=BATCH_SIZE, max_concurrency=1):
+    return BatchEntityResolver(client, "fake", batch_size=batch_size, max_concurrency=max_concurrency,
+                               max_attempts=max_attempts)
+
+
+def test_answers_outside_the_candidate_list_are_rejected_and_retried(serve):
+    items = _items(NAMES, seed=7)
+    client, stats = serve(invalid_rate=1.0)
+
+    results = _resolver(client, max_attempts=2).resolve(items)
+
+    assert results == {target: None for target, _ in items}
+    assert stats["invalid"] == 2 * NAMES  # every item answered invalidly on both attempts
+    assert stats["requests"] == 2 * (NAMES // BATCH_SIZE)
+
+
+def test_failed_requests_are_retried_up_to_the_limit(serve):
+    items = _items(NAMES, seed=7)
+    client, stats = serve(fail_rate=1.0)
+
+    results = _resolver(client, max_attempts=3).resolve(items)
+
+    assert results == {target: None for target, _ in items}
+    assert stats["requests"] == 3 * (NAMES // BATCH_SIZE)
+
+
+def test_dropped_and_failed_items_resolve_on_retry(serve):
+    items = _items(NAMES, seed=7)
+    client, stats = serve(fail_rate=0.3, drop_rate=0.2, invalid_rate=0.1)
+
+    results = _resolver(client, max_attempts=20).resolve(items)
+
+    assert stats["failed"] and stats["dropped"] and stats["invalid"]
+    assert results == _expected(items)
+
+
+def test_batched_results_match_one_request_per_name(serve):
+    items = _items(NAMES, seed=3)
+    client, _ = serve()
+
+    serial = _resolver(client, max_attempts=1, batch_size=1).resolve(items)
+    batched = _resolver(client, max_attempts=1, max_concurrency=4).resolve(items)
+
+    assert batched == serial == _expected(items)
@@ -0,0 +1,147 @@
+"""
+src/features/feature_engineering.py: the vectorised / indexed paths return what the
+per-row Python paths they replaced returned, on small randomised inputs and edge values.
+"""
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.bench_entity_matching import _company, _variant
+from benchmarks.bench_feature_engineering import _columns
+from app.services.internal_knowledge_service import internal_knowledge_service
+from src.features.feature_engineering import (
+    CURRENT_YEAR,
+    _normalise_name,
+    _parse_int,
+    _parse_int_series,
+    _rating_num,
+    build_labels,
+    extract_equipment_features,
+)
+
+CRM_COLS = ["crm_rating_num", "log_fte", "crm_projects_count"]
+# CRM cells seen in exports, plus the ones _parse_int handles unusually
+_CRM_NUMBERS = [None, np.nan, "", "n/a", "1,250", "1,2.5", " 12 ", "inf", "1e3", 1e-5, 3.0, 17, True]
+
+
+def _names(rng: random.Random, crm_size: int, bcg_size: int):
+    """CRM names and BCG company names: half CRM variants, half unrelated, plus edge values."""
+    crm = list(dict.fromkeys(_company(rng) for _ in range(crm_size)))
+    companies = [_variant(rng, rng.choice(crm)) if rng.random() < 0.5 else _company(rng)
+                 for _ in range(max(1, bcg_size // 4))]
+    companies += [None, np.nan, "", "  ", "AG", "Stahl", crm[0].upper(), f"The {crm[1]} Group"]
+    return crm, [rng.choice(companies) for _ in range(bcg_size)] + companies[-8:]
+
+
+def _legacy_build_labels(bcg_df: pd.DataFrame, crm_df: pd.DataFrame) -> pd.Series:
+    """The previous per-row path: exact lookup, then a scan over every CRM name."""
+    crm_names = set(crm_df["company_name"].dropna().map(_normalise_name))
+
+    def _is_match(raw_name: str) -> int:
+        n = _normalise_name(raw_name)
+        if n in crm_names:
+            return 1
+        for cn in crm_names:
+            if (len(n) >= 4 and n in cn) or (len(cn) >= 4 and cn in n):
+                return 1
+        return 0
+
+    return bcg_df["company_internal"].fillna("").map(_is_match)
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_build_labels_matches_the_per_row_scan(seed):
+    crm, bcg = _names(random.Random(seed), crm_size=300, bcg_size=1000)
+    crm_df = pd.DataFrame({"company_name": crm + [None, "", "AB"]})
+    bcg_df = pd.DataFrame({"company_internal": bcg})
+
+    labels = build_labels(bcg_df, crm_df)
+
+    assert labels.tolist() == _legacy_build_labels(bcg_df, crm_df).tolist()
+    assert labels.index.equals(bcg_df.index)
+
+
+def _legacy_crm_columns(bcg_df: pd.DataFrame, crm_df: pd.DataFrame) -> pd.DataFrame:
+    """The previous iterrows lookup + per-row linear containment scan."""
+    crm_lookup = {}
+    for _, row in crm_df.iterrows():
+        crm_lookup[_normalise_name(str(row["company_name"]))] = {
+            "rating": _rating_num(str(row["crm_rating"])),
+            "fte": _parse_int(row["fte"]),
+            "proj_count": _parse_int(row["project_count"]),
+        }
+
+    def _crm_info(raw_name: str) -> dict:
+        n = _normalise_name(raw_name)
+        if n in crm_lookup:
+            return crm_lookup[n]
+        for k, v in crm_lookup.items():
+            if (len(n) >= 4 and n in k) or (len(k) >= 4 and k in n):
+                return v
+        return {"rating": 3, "fte": 0, "proj_count": 0}
+
+    crm_info = bcg_df["company_internal"].fillna("").map(_crm_info)
+    return pd.DataFrame({
+        "crm_rating_num": crm_info.map(lambda x: x["rating"]),
+        "log_fte": crm_info.map(lambda x: np.log1p(x["fte"])),
+        "crm_projects_count": crm_info.map(lambda x: x["proj_count"]),
+    })
+
+
+@pytest.mark.parametrize("seed", [1, 2])
+def test_crm_columns_match_the_row_loop(monkeypatch, seed):
+    monkeypatch.setattr(internal_knowledge_service, "build_training_feature_frame",
+                        lambda *a, **kw: pd.DataFrame())
+    rng = random.Random(seed)
+    crm, bcg = _names(rng, crm_size=300, bcg_size=1000)
+    crm = crm + crm[:20]  # repeated CRM names: the last row wins
+    crm_df = pd.DataFrame({
+        "company_name": crm,
+        "crm_rating": [rng.choice(["A", "b", " C ", "D", "E", "", None, "X"]) for _ in crm],
+        "fte": [rng.choice(_CRM_NUMBERS + [str(rng.randint(10, 90000))]) for _ in crm],
+        "project_count": [rng.choice(_CRM_NUMBERS + [rng.randint(0, 40)]) for _ in crm],
+    })
+    bcg_df = pd.DataFrame({
+        "company_internal": bcg,
+        "equipment_type": [rng.choice(["EAF", "Hot Strip Mill", "Caster", None]) for _ in bcg],
+        "country_internal": [rng.choice(["Germany", "Italy", "India", None]) for _ in bcg],
+        "start_year_internal": [rng.choice([rng.randint(1960, 2024), "1998.0", None]) for _ in bcg],
+    })
+
+    feat_df, _ = extract_equipment_features(bcg_df, crm_df)
+
+    expected = _legacy_crm_columns(bcg_df, crm_df)
+    pd.testing.assert_frame_equal(feat_df.loc[bcg_df.index, CRM_COLS].reset_index(drop=True),
+                                  expected[CRM_COLS].reset_index(drop=True), check_dtype=False)
+
+
+# Values the parser must treat exactly like _parse_int, whatever the column dtype
+_EDGE_CASES = [
+    None, np.nan, pd.NA, "", " 12 ", "1,250", "1,2.5", "n/a", "nan", "inf", "-inf", "-", ".5", "-0.9",
+    "1.5e3", "1e3", "1e-5", "9" * 18, True, False, 1998.7, -5.5, 1.5e16, 1e-5, float("inf"), 0.0, "2001.0",
+]
+_FLOATS = [1998.7, -5.5, -0.5, 1.5e16, 9.9e15, 1.5e-5, 1e-5, 1e-4, 0.0, np.nan, np.inf, -np.inf]
+
+
+@pytest.mark.parametrize("default", [0, CURRENT_YEAR])
+@pytest.mark.parametrize("values", [
+    pd.Series(_EDGE_CASES, dtype=object),
+    pd.Series(_FLOATS, dtype="float64"),
+    pd.Series([True, False, True]),
+    pd.Series([1998, None, -3], dtype="Int64"),
+    pd.Series([], dtype=object),
+], ids=["object", "float", "bool", "nullable-int", "empty"])
+def test_parse_int_series_matches_parse_int(values, default):
+    expected = values.map(lambda v: _parse_int(v, default)).astype("int64")
+
+    pd.testing.assert_series_equal(_parse_int_series(values, default), expected)
+
+
+@pytest.mark.parametrize("seed", [1, 2])
+def test_parse_int_series_matches_parse_int_on_export_columns(seed):
+    for name, values in _columns(random.Random(seed), 2000).items():
+        default = CURRENT_YEAR if name.startswith("year") else 0
+        expected = values.map(lambda v: _parse_int(v, default)).astype("int64")
+        pd.testing.assert_series_equal(_parse_int_series(values, default), expected, obj=name)
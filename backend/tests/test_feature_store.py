@@ -0,0 +1,122 @@
+"""
+MLRankingService's persisted feature matrix (app/utils/feature_store.py): a
+changed input fingerprint rebuilds only that group's columns, and snapshots
+written by another FeatureStore.VERSION are ignored.
+"""
+import random
+
+import pandas as pd
+import pytest
+
+from app.services.internal_knowledge_service import internal_knowledge_service
+from app.services.ml_ranking_service import MLRankingService
+from app.utils.feature_store import FeatureStore
+from benchmarks.bench_entity_matching import _company, _variant
+from src.features import feature_engineering
+from src.features.feature_engineering import FEATURE_GROUPS, extract_equipment_features
+
+FINGERPRINTS = {"base": "b1", "crm": "c1", "knowledge": "", "external": "e1", "site": ""}
+
+
+class _SyntheticRankingService(MLRankingService):
+    """Serves fixed frames and fingerprints instead of reading DuckDB."""
+
+    def __init__(self, store_path, inputs: dict):
+        super().__init__(db_path=store_path.parent / "unused.db", feature_store_path=store_path)
+        self.inputs = inputs
+
+    def _input_fingerprints(self):
+        return dict(self.inputs["fingerprints"])
+
+    def _load_feature_inputs(self):
+        return self.inputs["bcg"], self.inputs["crm"], pd.DataFrame(), pd.DataFrame()
+
+    def _enrich_with_ib(self, feat_df):
+        return feat_df
+
+
+def _frames(rng: random.Random, crm_size: int = 200, bcg_size: int = 600):
+    crm_names = [_company(rng) for _ in range(crm_size)]
+    crm_df = pd.DataFrame({
+        "company_name": crm_names,
+        "crm_rating": [rng.choice(["A", "B", "C", "D", "E", "", None]) for _ in crm_names],
+        "fte": [rng.choice([str(rng.randint(10, 90000)), "1,250", None, "n/a"]) for _ in crm_names],
+        "project_count": [rng.choice([rng.randint(0, 40), 3.0, None]) for _ in crm_names],
+    })
+    companies = [_variant(rng, rng.choice(crm_names)) if rng.random() < 0.5 else _company(rng)
+                 for _ in range(bcg_size // 4)]
+    bcg_df = pd.DataFrame({
+        "company_internal": [rng.choice(companies) for _ in range(bcg_size)],
+        "equipment_type": [rng.choice(["EAF", "Hot Strip Mill", "Caster", None]) for _ in range(bcg_size)],
+        "country_internal": [rng.choice(["Germany", "Italy", "India", None]) for _ in range(bcg_size)],
+        "start_year_internal": [rng.choice([rng.randint(1960, 2024), "1998.0", None]) for _ in range(bcg_size)],
+    })
+    return bcg_df, crm_df
+
+
+@pytest.fixture
+def inputs(monkeypatch):
+    monkeypatch.setattr(internal_knowledge_service, "build_training_feature_frame",
+                        lambda *a, **kw: pd.DataFrame())
+    bcg_df, crm_df = _frames(random.Random(5))
+    return {"bcg": bcg_df, "crm": crm_df, "fingerprints": dict(FINGERPRINTS)}
+
+
+@pytest.fixture
+def builds(monkeypatch):
+    """Records full extractions ("all") and the single groups rebuilt."""
+    calls = []
+    extract, build_group = feature_engineering.extract_equipment_features, feature_engineering.build_feature_group
+
+    def _extract(*args, **kwargs):
+        calls.append("all")
+        return extract(*args, **kwargs)
+
+    def _build_group(group, *args, **kwargs):
+        calls.append(group)
+        return build_group(group, *args, **kwargs)
+
+    monkeypatch.setattr(feature_engineering, "extract_equipment_features", _extract)
+    monkeypatch.setattr(feature_engineering, "build_feature_group", _build_group)
+    return calls
+
+
+def test_unchanged_fingerprints_load_the_snapshot(tmp_path, inputs, builds):
+    store_path = tmp_path / "ranking_features.parquet"
+    built = _SyntheticRankingService(store_path, inputs)._get_features()
+
+    loaded = _SyntheticRankingService(store_path, inputs)._get_features()
+
+    assert builds == ["all"]
+    pd.testing.assert_frame_equal(loaded, built)
+
+
+def test_changed_crm_fingerprint_rebuilds_only_the_crm_columns(tmp_path, inputs, builds):
+    store_path = tmp_path / "ranking_features.parquet"
+    before = _SyntheticRankingService(store_path, inputs)._get_features()
+
+    changed = inputs["crm"].copy()
+    changed["crm_rating"] = changed["crm_rating"].sample(frac=1.0, random_state=1).to_numpy()
+    changed["fte"] = changed["fte"].sample(frac=1.0, random_state=2).to_numpy()
+    inputs.update(crm=changed, fingerprints={**FINGERPRINTS, "crm": "c2"})
+    rebuilt = _SyntheticRankingService(store_path, inputs)._get_features()
+
+    assert builds == ["all", "crm"]
+    expected, _ = extract_equipment_features(inputs["bcg"], changed)
+    pd.testing.assert_frame_equal(rebuilt[expected.columns], expected, check_dtype=False)
+    others = [c for c in before.columns if c not in FEATURE_GROUPS["crm"]]
+    pd.testing.assert_frame_equal(rebuilt[others], before[others])
+    assert not rebuilt[FEATURE_GROUPS["crm"]].equals(before[FEATURE_GROUPS["crm"]])
+
+
+def test_snapshot_from_another_version_is_ignored(tmp_path, inputs, builds, monkeypatch):
+    store_path = tmp_path / "ranking_features.parquet"
+    _SyntheticRankingService(store_path, inputs)._get_features()
+    assert FeatureStore(store_path).load() is not None
+
+    monkeypatch.setattr(FeatureStore, "VERSION", FeatureStore.VERSION + 1)
+    assert FeatureStore(store_path).load() is None
+
+    _SyntheticRankingService(store_path, inputs)._get_features()
+    assert builds == ["all", "all"]
+    assert FeatureStore(store_path).load() is not None  # rewritten under the new version
@@ -0,0 +1,30 @@
+"""
+Size-based eviction in QueryCache counts the strings a cached frame holds.
+"""
+import pandas as pd
+import pytest
+
+from app.utils.query_cache import QueryCache, estimate_size
+
+
+def _names(rows: int) -> pd.DataFrame:
+    return pd.DataFrame({"name": pd.Series([f"company number {i}" for i in range(rows)], dtype=object)})
+
+
+@pytest.mark.parametrize("rows", [1_000, 100_000])
+def test_estimate_counts_string_payloads(rows):
+    frame = _names(rows)
+    deep = int(frame.memory_usage(index=True, deep=True).sum())
+    assert estimate_size(frame) == pytest.approx(deep, rel=0.01)
+    assert estimate_size(frame["name"]) == pytest.approx(frame["name"].memory_usage(index=True, deep=True), rel=0.01)
+
+
+def test_byte_cap_evicts_frames_by_their_deep_size():
+    frame = _names(100_000)
+    cache = QueryCache(max_bytes=int(estimate_size(frame) * 1.5))
+    cache.set("a", frame)
+    cache.set("b", frame.copy())
+
+    stats = cache.stats()
+    assert stats["entries"] == 1
+    assert stats["bytes"] <= stats["max_bytes"]
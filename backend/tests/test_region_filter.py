@@ -0,0 +1,80 @@
+"""
+The loaders' vectorised Europe/Oceania filter and region backfill keep the same
+rows with the same region values as the per-row df.apply passes they replaced,
+on the shipped data/processed exports plus None/NaN/'nan'/blank edge rows.
+"""
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.data_service import DataIngestionService
+
+PROCESSED = Path(__file__).resolve().parent.parent / "data" / "processed"
+# BCG sheets carry "Region", which the filter ignores; the renamed copy exercises the region path too
+FRAMES = {
+    "crm_export": ("crm_export.csv", {}),
+    "bcg_export": ("bcg_export.csv", {}),
+    "bcg_export/region": ("bcg_export.csv", {"Region": "region"}),
+}
+
+# (region, country) pairs the old str(value or '') coercion treats specially. pd.NA is left out:
+# the apply path raises on it ("boolean value of NA is ambiguous"), so it has no reference result.
+EDGE_ROWS = [
+    (None, None), (np.nan, np.nan), ("", ""), ("  ", "  "), ("nan", "nan"), ("NaN", "Germany"),
+    (None, "germany"), (np.nan, "Australia"), ("", "New Zealand"), ("nan", "Brazil"), (" Europe ", None),
+    ("Western Europe", np.nan), ("LATAM", "Austria"), (None, "nz"), ("oceania", ""), (np.nan, "unknown"),
+]
+
+
+def _legacy_region_scope(svc: DataIngestionService, df: pd.DataFrame) -> pd.DataFrame:
+    """The previous per-row filter and region backfill (load_bcg_installed_base path)."""
+    europe_vars = [r.lower() for r in svc.REGION_MAPPING["Europe"]]
+    aus_vars = ["australia", "oceania", "nz", "new zealand"]
+    target_vars = europe_vars + aus_vars
+    target_regions = ["europe", "oceania"]
+
+    def matches_target(row):
+        reg = str(row.get('region', '') or '').lower()
+        cnt = str(row.get('country', '') or '').lower()
+        if any(v in reg for v in target_vars) or reg in target_vars:
+            return True
+        if any(v in cnt for v in target_vars) or cnt in target_vars:
+            return True
+        mapped_reg = svc.COUNTRY_TO_REGION_MAP.get(cnt, "").lower()
+        if mapped_reg in target_regions:
+            return True
+        return False
+
+    def fill_region(row):
+        reg = str(row.get('region', '') or '').strip()
+        if not reg or reg.lower() == 'nan':
+            cnt = str(row.get('country', '') or '').lower()
+            return svc.COUNTRY_TO_REGION_MAP.get(cnt, reg)
+        return reg
+
+    df = df[df.apply(matches_target, axis=1)].copy()
+    df['region'] = df.apply(fill_region, axis=1)
+    return df
+
+
+def _frame(source: str, rename: dict) -> pd.DataFrame:
+    df = pd.read_csv(PROCESSED / source, low_memory=False).rename(columns=rename)
+    edges = pd.DataFrame({"region": [r for r, _ in EDGE_ROWS], "country": [c for _, c in EDGE_ROWS]}, dtype=object)
+    if "region" not in df.columns:
+        edges = edges.drop(columns="region")
+    return pd.concat([df, edges], ignore_index=True)
+
+
+@pytest.mark.parametrize("name", FRAMES)
+def test_vectorised_region_scope_matches_row_apply(name):
+    svc = DataIngestionService()
+    df = _frame(*FRAMES[name])
+
+    kept = df[svc._target_region_mask(df)].copy()
+    kept['region'] = svc._backfill_region(kept)
+    expected = _legacy_region_scope(svc, df)
+
+    pd.testing.assert_index_equal(kept.index, expected.index)
+    pd.testing.assert_series_equal(kept['region'].astype(object), expected['region'].astype(object))
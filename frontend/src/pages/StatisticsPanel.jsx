@@ -37,27 +37,13 @@ const BoxPlot = ({ data, label, unit = '', color = '#6c63ff' }) => {
     );
 };
 
-// ── Mini histogram / bell curve ───────────────────────────────────────────
-const Histogram = ({ values, label, unit = '', color = '#6c63ff', bins = 20 }) => {
-    const stats = useMemo(() => {
-        if (!values || values.length === 0) return null;
-        const min = Math.min(...values);
-        const max = Math.max(...values);
-        const avg = values.reduce((a, b) => a + b, 0) / values.length;
-        return { min, max, avg };
-    }, [values]);
+// ── Mini histogram / bell curve (bins are computed server-side) ─────────
+const Histogram = ({ data, label, unit = '', color = '#6c63ff' }) => {
+    const histogram = data?.histogram;
 
     const hist = useMemo(() => {
-        if (!values || values.length === 0) return [];
-        const min = Math.min(...values);
-        const max = Math.max(...values);
-        const range = max - min || 1;
-        const binSize = range / bins;
-        const counts = Array(bins).fill(0);
-        values.forEach(v => {
-            const idx = Math.min(Math.floor((v - min) / binSize), bins - 1);
-            counts[idx]++;
-        });
+        if (!histogram || !histogram.counts?.length) return [];
+        const { min, bin_width: binSize, counts } = histogram;
         const maxCount = Math.max(...counts, 1);
         return counts.map((c, i) => ({
             x: i,
@@ -65,10 +51,11 @@ const Histogram = ({ values, label, unit = '', color = '#6c63ff', bins = 20 }) =
             count: c,
             label: `${(min + i * binSize).toFixed(0)}–${(min + (i + 1) * binSize).toFixed(0)}${unit}`,
         }));
-    }, [values, bins, unit]);
+    }, [histogram, unit]);
 
+    const stats = data && data.min !== undefined ? { min: data.min, max: data.max, avg: data.mean } : null;
     if (!hist.length || !stats) return null;
-    const barW = 200 / bins;
+    const barW = 200 / hist.length;
 
     return (
         <div className="histogram-wrap">
@@ -216,9 +203,9 @@ const StatisticsPanel = ({ summary, displayTotal }) => {
 
             {/* Row 2: histograms */}
             <div className="stats-row-3">
-                <Histogram values={capacity.values} label="Nominal Capacity Distribution" unit=" kt/y" color="#6c63ff" />
-                <Histogram values={age.values} label="Equipment Age Distribution" unit=" yrs" color="#06b6d4" />
-                <Histogram values={start_year.values} label="Year of Startup Distribution" unit="" color="#f59e0b" />
+                <Histogram data={capacity} label="Nominal Capacity Distribution" unit=" kt/y" color="#6c63ff" />
+                <Histogram data={age} label="Equipment Age Distribution" unit=" yrs" color="#06b6d4" />
+                <Histogram data={start_year} label="Year of Startup Distribution" unit="" color="#f59e0b" />
             </div>
 
             {/* Row 3: box plots */}